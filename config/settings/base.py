@@ -321,6 +321,11 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-soft-time-limit
 # TODO: set to whatever value is adequate in your circumstances
 CELERY_TASK_SOFT_TIME_LIMIT = 60
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-routes
+# PDF parsing gets its own queue so large documents cannot hold up other tasks
+CELERY_TASK_ROUTES = {
+    'kquires.articles.tasks.extract_pdf_text_task': {'queue': 'extraction'},
+}
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
@@ -335,6 +340,46 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'kquires.articles.tasks.cleanup_inactive_users',
         'schedule': 60.0 * 60.0 * 24.0,  # Run daily
     },
+    'requeue-stale-translation-jobs': {
+        'task': 'kquires.articles.tasks.requeue_stale_translation_jobs',
+        'schedule': 60.0 * 5,  # Every 5 minutes
+    },
+    'flush-article-view-counts': {
+        'task': 'kquires.articles.tasks.flush_article_view_counts',
+        'schedule': 60.0,  # Every minute
+    },
+    'process-article-view-events': {
+        'task': 'kquires.articles.tasks.process_article_view_events',
+        'schedule': 60.0 * 5,  # Every 5 minutes
+    },
+    'refresh-dashboard-stats': {
+        'task': 'kquires.dashboard.tasks.refresh_dashboard_stats_task',
+        'schedule': 60.0 * 10,  # Every 10 minutes
+    },
+    'rollup-daily-metrics': {
+        'task': 'kquires.dashboard.tasks.rollup_daily_metrics_task',
+        'schedule': 60.0 * 15,  # Every 15 minutes
+    },
+    'reconcile-file-catalog': {
+        'task': 'kquires.articles.tasks.reconcile_file_catalog_task',
+        'schedule': 60.0 * 30,  # Every 30 minutes
+    },
+    'requeue-stale-pdf-extractions': {
+        'task': 'kquires.articles.tasks.requeue_stale_pdf_extractions',
+        'schedule': 60.0 * 10,  # Every 10 minutes
+    },
+    'delete-unclaimed-blobs': {
+        'task': 'kquires.articles.tasks.delete_unclaimed_blobs_task',
+        'schedule': 60.0 * 60,  # Hourly
+    },
+    'expire-upload-sessions': {
+        'task': 'kquires.articles.tasks.expire_upload_sessions',
+        'schedule': 60.0 * 60,  # Hourly
+    },
+    'requeue-drive-sync-jobs': {
+        'task': 'kquires.articles.tasks.requeue_drive_sync_jobs',
+        'schedule': 60.0 * 5,  # Every 5 minutes
+    },
 }
 
 # django-allauth
@@ -412,5 +457,43 @@ OPENAI_API_KEY = env("OPENAI_API_KEY", default="")
 OPENAI_MODEL = env("OPENAI_MODEL", default="gpt-4o-mini")
 OPENAI_MAX_TOKENS = env.int("OPENAI_MAX_TOKENS", default=4000)
 OPENAI_TEMPERATURE = env.float("OPENAI_TEMPERATURE", default=0.3)
+# Consecutive failures before OpenAI calls are short-circuited, and for how long (seconds)
+OPENAI_CIRCUIT_FAILURE_THRESHOLD = env.int("OPENAI_CIRCUIT_FAILURE_THRESHOLD", default=5)
+OPENAI_CIRCUIT_RECOVERY_TIMEOUT = env.int("OPENAI_CIRCUIT_RECOVERY_TIMEOUT", default=60)
+# Simultaneous OpenAI requests per process, and the size of one translation request
+OPENAI_MAX_CONCURRENCY = env.int("OPENAI_MAX_CONCURRENCY", default=4)
+OPENAI_TRANSLATION_CHUNK_TOKENS = env.int("OPENAI_TRANSLATION_CHUNK_TOKENS", default=1200)
+# Requests per minute shared by all processes (0 disables the limit), and how long
+# a call may wait for a free slot before failing (seconds)
+OPENAI_REQUESTS_PER_MINUTE = env.int("OPENAI_REQUESTS_PER_MINUTE", default=500)
+OPENAI_RATE_LIMIT_WAIT = env.int("OPENAI_RATE_LIMIT_WAIT", default=30)
+
+# PDF text extraction
+# ------------------------------------------------------------------------------
+# Wall clock limit for one document (seconds) and address space of each worker
+# process (MB); pages are split across up to PDF_EXTRACTION_WORKERS processes
+PDF_EXTRACTION_TIMEOUT = env.int("PDF_EXTRACTION_TIMEOUT", default=120)
+PDF_EXTRACTION_MEMORY_MB = env.int("PDF_EXTRACTION_MEMORY_MB", default=512)
+PDF_EXTRACTION_WORKERS = env.int("PDF_EXTRACTION_WORKERS", default=4)
+PDF_EXTRACTION_MIN_PAGES_PER_WORKER = env.int("PDF_EXTRACTION_MIN_PAGES_PER_WORKER", default=10)
+
+# Resumable uploads
+# ------------------------------------------------------------------------------
+# Largest file, largest chunk per request and the chunk size suggested to clients
+# (bytes); unfinished uploads are removed after RESUMABLE_UPLOAD_EXPIRY seconds
+RESUMABLE_UPLOAD_MAX_SIZE = env.int("RESUMABLE_UPLOAD_MAX_SIZE", default=2 * 1024 * 1024 * 1024)
+RESUMABLE_UPLOAD_MAX_CHUNK = env.int("RESUMABLE_UPLOAD_MAX_CHUNK", default=16 * 1024 * 1024)
+RESUMABLE_UPLOAD_CHUNK_SIZE = env.int("RESUMABLE_UPLOAD_CHUNK_SIZE", default=8 * 1024 * 1024)
+RESUMABLE_UPLOAD_EXPIRY = env.int("RESUMABLE_UPLOAD_EXPIRY", default=60 * 60 * 24)
+
+# Google Drive sync
+# ------------------------------------------------------------------------------
+# Bytes per resumable upload request (a multiple of 256 KiB); failed attempts
+# wait a random time of up to BASE * 2^(attempt - 1) seconds, capped at MAX
+GOOGLE_DRIVE_UPLOAD_URL = env("GOOGLE_DRIVE_UPLOAD_URL", default="https://www.googleapis.com/upload/drive/v3/files")
+DRIVE_SYNC_CHUNK_SIZE = env.int("DRIVE_SYNC_CHUNK_SIZE", default=8 * 1024 * 1024)
+DRIVE_SYNC_MAX_ATTEMPTS = env.int("DRIVE_SYNC_MAX_ATTEMPTS", default=8)
+DRIVE_SYNC_BACKOFF_BASE = env.int("DRIVE_SYNC_BACKOFF_BASE", default=30)
+DRIVE_SYNC_BACKOFF_MAX = env.int("DRIVE_SYNC_BACKOFF_MAX", default=60 * 60)
 # Your stuff...
 # ------------------------------------------------------------------------------
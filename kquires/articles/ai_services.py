@@ -1,15 +1,21 @@
 """AI Services for content analysis, translation, and article generation"""
 
 import os
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 from django.conf import settings
 from django.utils.translation import gettext as _
 import openai
-from langdetect import detect, LangDetectException
-import PyPDF2
 import docx
 from io import BytesIO
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.language_detection import detect_language
+from ..utils.pdf_extraction import extract_pdf_pages
+from ..utils.rate_limiter import RateLimiter
+from ..utils.html_segments import chunk_segments, mask_tags, split_sentences, unmask_tags
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +26,17 @@ class AIService:
         self.model = getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini')
         self.max_tokens = getattr(settings, 'OPENAI_MAX_TOKENS', 4000)
         self.temperature = getattr(settings, 'OPENAI_TEMPERATURE', 0.3)
-        
+        self.breaker = CircuitBreaker(
+            'openai',
+            failure_threshold=getattr(settings, 'OPENAI_CIRCUIT_FAILURE_THRESHOLD', 5),
+            recovery_timeout=getattr(settings, 'OPENAI_CIRCUIT_RECOVERY_TIMEOUT', 60),
+        )
+        # Upper bound of simultaneous requests from this process
+        self.max_concurrency = getattr(settings, 'OPENAI_MAX_CONCURRENCY', 4)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.chunk_tokens = getattr(settings, 'OPENAI_TRANSLATION_CHUNK_TOKENS', 1200)
+        self.rate_limiter = RateLimiter('openai', getattr(settings, 'OPENAI_REQUESTS_PER_MINUTE', 0))
+        self.rate_limit_wait = getattr(settings, 'OPENAI_RATE_LIMIT_WAIT', 30)
         
         # Initialize client only if API key is available
         if self.api_key:
@@ -62,6 +78,44 @@ class AIService:
             logger.warning("OpenAI API key not configured")
             self.client = None
     
+    def is_available(self) -> bool:
+        """Check if the AI service can be called without probing it"""
+        return self.client is not None and self.breaker.allow_request()
+    
+    def _chat(self, messages: List[Dict], max_tokens: int = None, temperature: float = None,
+              json_mode: bool = False) -> str:
+        """Send a chat completion request and return the message content.
+        
+        Every call goes through the circuit breaker so repeated failures stop
+        further requests for a while instead of blocking each caller. Calls
+        are also held back by the shared per-minute rate limit and wait for one
+        of the process-wide concurrency slots.
+        """
+        if not self.client:
+            raise RuntimeError("OpenAI client not configured")
+        if not self.breaker.allow_request():
+            raise RuntimeError("OpenAI circuit breaker is open")
+        if not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+            raise RuntimeError("OpenAI rate limit reached")
+        
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature if temperature is None else temperature,
+        }
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        
+        try:
+            with self._slots:
+                response = self.client.chat.completions.create(**kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response.choices[0].message.content.strip()
+    
     def _extract_text_from_file(self, file_path: str) -> str:
         """Extract text content from various file types"""
         try:
@@ -84,12 +138,8 @@ class AIService:
     def _extract_pdf_text(self, file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            # Parsed in limited worker processes, never in this one
+            return ''.join(page + "\n" for page in extract_pdf_pages(file_path))
         except Exception as e:
             logger.error(f"Error extracting PDF text: {str(e)}")
             return ""
@@ -107,57 +157,22 @@ class AIService:
             return ""
     
     def detect_language(self, text: str) -> str:
-        """Detect the language of the given text"""
-        try:
-            if not text or len(text.strip()) < 10:
-                return 'unknown'
-            
-            # Use langdetect for initial detection
-            detected_lang = detect(text)
-            
-            # Map common language codes to our supported languages
-            lang_mapping = {
-                'en': 'english',
-                'ar': 'arabic',
-            }
-            
-            return lang_mapping.get(detected_lang, detected_lang)
-        except LangDetectException:
-            # Fallback to OpenAI for language detection if client is available
-            if self.client:
-                try:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a language detection expert. Identify the language of the given text and respond with only the language name in English (e.g., 'english', 'arabic')."
-                            },
-                            {
-                                "role": "user",
-                                "content": f"Detect the language of this text: {text[:500]}"
-                            }
-                        ],
-                        max_tokens=10,
-                        temperature=0.1
-                    )
-                    return response.choices[0].message.content.strip().lower()
-                except Exception as e:
-                    logger.error(f"Error in AI language detection: {str(e)}")
-                    return 'unknown'
-            else:
-                logger.warning("OpenAI client not available for language detection")
-                return 'unknown'
+        """Detect the language of the given text locally, without calling the API"""
+        return detect_language(text, default='unknown')
     
-    def analyze_content(self, file_path: str) -> Dict:
-        """Analyze uploaded file content and extract key information"""
+    def analyze_content(self, file_path: str, language: str = None) -> Dict:
+        """Analyze uploaded file content and extract key information
+        
+        Callers that already know the language of the file can pass it in to
+        skip detection.
+        """
         try:
             text = self._extract_text_from_file(file_path)
             if not text:
                 return {"error": "Could not extract text from file"}
             
             # Detect language
-            language = self.detect_language(text)
+            language = language or self.detect_language(text)
             
             # Check if AI client is available
             if not self.client:
@@ -189,18 +204,18 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            ai_analysis = self._chat(
                 messages=[
                     {"role": "system", "content": "You are a content analysis expert. Analyze the provided content and extract key information in the requested JSON format."},
                     {"role": "user", "content": analysis_prompt}
                 ],
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                json_mode=True
             )
-            
-            # Parse AI response
-            ai_analysis = response.choices[0].message.content.strip()
+            ai_analysis = json.loads(ai_analysis)
+            if not isinstance(ai_analysis, dict):
+                raise ValueError("Content analysis response is not a JSON object")
             
             return {
                 "language": language,
@@ -215,74 +230,166 @@ class AIService:
     
     def translate_content(self, text: str, source_lang: str, target_lang: str, 
                          technical_terms: List[str] = None) -> Dict:
-        """Translate content between languages with technical term preservation"""
+        """Translate content between languages with technical term preservation
+        
+        The text goes through the structured JSON request of ``translate_fields``,
+        so ``translated_text`` is always validated plain text, ready to store.
+        """
+        if not text or len(text.strip()) < 1:
+            return {"error": "No content to translate"}
+        
+        result = self.translate_fields({"text": text}, source_lang, target_lang, technical_terms)
+        if "error" in result:
+            return result
+        
+        return {
+            "original_text": text,
+            "translated_text": result["translated_fields"]["text"],
+            "source_language": source_lang,
+            "target_language": target_lang,
+            "technical_terms_preserved": technical_terms or []
+        }
+
+    def translate_fields(self, fields: Dict[str, str], source_lang: str, target_lang: str,
+                         technical_terms: List[str] = None) -> Dict:
+        """Translate several named fields in a single structured request.
+
+        ``fields`` maps a field name to its text (e.g. title, short description
+        and body of an article). The model receives them as one JSON object and
+        must answer with a JSON object using the same keys, so a whole article
+        costs one round trip instead of one per field.
+        """
+        # Empty fields are passed through untouched and never sent to the model
+        pending = {key: value for key, value in fields.items() if value and value.strip()}
+        translated = {key: value for key, value in fields.items() if key not in pending}
+
+        if not pending or source_lang == target_lang:
+            return {
+                "translated_fields": dict(fields),
+                "source_language": source_lang,
+                "target_language": target_lang,
+            }
+
         try:
-            
-            if not text or len(text.strip()) < 1:
-                return {"error": "No content to translate"}
-            
-            # Prepare technical terms preservation instruction
-            terms_instruction = ""
-            if technical_terms:
-                terms_list = ", ".join(technical_terms)
-                terms_instruction = f"""
-                IMPORTANT: Preserve these technical terms exactly as they are: {terms_list}
-                Do not translate these terms, keep them in their original form.
-                """
-            
-            # Language mapping
             lang_mapping = {
                 'english': 'English',
                 'arabic': 'Arabic',
             }
-            
             source_lang_name = lang_mapping.get(source_lang, source_lang)
             target_lang_name = lang_mapping.get(target_lang, target_lang)
-            
-            translation_prompt = f"""
-            Translate the following text from {source_lang_name} to {target_lang_name}.
-            {terms_instruction}
-            
-            Guidelines:
-            1. Maintain the original meaning and tone
-            2. Preserve technical terms and proper nouns
-            3. Keep formatting and structure intact
-            4. Ensure the translation is natural and fluent
-            5. For Arabic translations, use proper Arabic grammar and terminology
-            
-            Text to translate:
-            {text}
-            
-            Provide only the translated text without any additional commentary.
-            """
-            
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
+
+            terms_instruction = ""
+            if technical_terms:
+                terms_instruction = (
+                    f"Preserve these technical terms exactly as they are: {', '.join(technical_terms)}. "
+                )
+
+            system_prompt = (
+                f"You are a professional translator specializing in {source_lang_name} to "
+                f"{target_lang_name} translation. You receive a JSON object whose values must be "
+                f"translated. Reply with a JSON object that has exactly the same keys, where each "
+                f"value is the translated text only. Keep HTML tags, attributes and placeholders "
+                f"such as ⟦0⟧ unchanged and in place. {terms_instruction}"
+                f"For Arabic translations, use proper Arabic grammar and terminology."
+            )
+
+            content = self._chat(
                 messages=[
-                    {
-                        "role": "system", 
-                        "content": f"You are a professional translator specializing in {source_lang_name} to {target_lang_name} translation. Provide accurate, natural translations while preserving technical terms."
-                    },
-                    {"role": "user", "content": translation_prompt}
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": json.dumps(pending, ensure_ascii=False)},
                 ],
                 max_tokens=self.max_tokens,
-                temperature=0.2
+                temperature=0.2,
+                json_mode=True,
             )
-            
-            translated_text = response.choices[0].message.content.strip()
-            
+
+            data = json.loads(content)
+            if not isinstance(data, dict):
+                raise ValueError("Translation response is not a JSON object")
+
+            missing = [key for key in pending if not isinstance(data.get(key), str)]
+            if missing:
+                raise ValueError(f"Translation response is missing fields: {', '.join(missing)}")
+
+            for key in pending:
+                translated[key] = data[key].strip()
+
             return {
-                "original_text": text,
-                "translated_text": translated_text,
+                "translated_fields": {key: translated[key] for key in fields},
                 "source_language": source_lang,
                 "target_language": target_lang,
-                "technical_terms_preserved": technical_terms or []
+                "technical_terms_preserved": technical_terms or [],
             }
-            
+
         except Exception as e:
-            logger.error(f"Error translating content: {str(e)}")
+            logger.error(f"Error translating fields: {str(e)}")
             return {"error": f"Translation failed: {str(e)}"}
+
+    def translate_segments(self, segments: Dict[str, str], source_lang: str, target_lang: str,
+                           technical_terms: List[str] = None, progress=None) -> Dict:
+        """Translate HTML segments in token-bounded chunks, concurrently.
+
+        Inline tags are masked before sending and restored afterwards, segments
+        too large for one chunk are split on sentence boundaries, and chunks are
+        translated in parallel within the concurrency limit, so a long article
+        takes about as long as its slowest chunk. ``progress`` is an optional
+        callable receiving (chunks done, chunks total).
+        """
+        masked = {}
+        tags = {}
+        pieces = {}
+        separators = {}
+        for key, text in segments.items():
+            masked_text, tags[key] = mask_tags(text)
+            parts = split_sentences(masked_text, self.chunk_tokens)
+            pieces[key] = [f"{key}.{index}" for index in range(len(parts))]
+            # The whitespace between pieces is put back as it was, not sent to the model
+            masked.update(zip(pieces[key], (part.rstrip() for part in parts)))
+            separators[key] = [part[len(part.rstrip()):] for part in parts]
+
+        chunks = chunk_segments(masked, self.chunk_tokens)
+        translated = {}
+        errors = []
+
+        def translate_chunk(chunk):
+            return self.translate_fields(chunk, source_lang, target_lang, technical_terms)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks)) or 1) as executor:
+            futures = [executor.submit(translate_chunk, chunk) for chunk in chunks]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                if 'error' in result:
+                    errors.append(result['error'])
+                else:
+                    translated.update(result['translated_fields'])
+                if progress:
+                    progress(done, len(chunks))
+
+        if errors:
+            return {"error": errors[0]}
+
+        output = {}
+        for key in segments:
+            joined = ''.join(translated[piece] + gap for piece, gap in zip(pieces[key], separators[key]))
+            try:
+                output[key] = unmask_tags(joined, tags[key])
+            except ValueError:
+                # The model damaged the markup: retry this segment on its own once
+                source = ''.join(masked[piece] + gap for piece, gap in zip(pieces[key], separators[key]))
+                retry = self.translate_fields({key: source}, source_lang, target_lang, technical_terms)
+                if 'error' in retry:
+                    return retry
+                try:
+                    output[key] = unmask_tags(retry['translated_fields'][key], tags[key])
+                except ValueError as e:
+                    logger.error(f"Error restoring segment markup: {str(e)}")
+                    return {"error": f"Translation failed: {str(e)}"}
+
+        return {
+            "translated_fields": output,
+            "source_language": source_lang,
+            "target_language": target_lang,
+        }
     
     def generate_article_draft(self, content_analysis: Dict, category_suggestions: List[str] = None) -> Dict:
         """Generate an article draft from analyzed content"""
@@ -328,8 +435,7 @@ class AIService:
             Use markdown formatting for headings and structure.
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            article_draft = self._chat(
                 messages=[
                     {
                         "role": "system",
@@ -341,8 +447,6 @@ class AIService:
                 temperature=0.4
             )
             
-            article_draft = response.choices[0].message.content.strip()
-            
             return {
                 "title": suggested_title,
                 "content": article_draft,
@@ -394,8 +498,7 @@ class AIService:
             4. Logical hierarchy and organization
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            suggestions = self._chat(
                 messages=[
                     {
                         "role": "system",
@@ -404,10 +507,12 @@ class AIService:
                     {"role": "user", "content": suggestion_prompt}
                 ],
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                json_mode=True
             )
-            
-            suggestions = response.choices[0].message.content.strip()
+            suggestions = json.loads(suggestions)
+            if not isinstance(suggestions, dict) or not suggestions.get("main_category"):
+                raise ValueError("Category suggestion response is missing main_category")
             
             return {
                 "suggestions": suggestions,
@@ -454,8 +559,7 @@ class AIService:
             4. User intent and context
             """
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            enhancements = self._chat(
                 messages=[
                     {
                         "role": "system",
@@ -464,10 +568,12 @@ class AIService:
                     {"role": "user", "content": enhancement_prompt}
                 ],
                 max_tokens=600,
-                temperature=0.3
+                temperature=0.3,
+                json_mode=True
             )
-            
-            enhancements = response.choices[0].message.content.strip()
+            enhancements = json.loads(enhancements)
+            if not isinstance(enhancements, dict):
+                raise ValueError("Search enhancement response is not a JSON object")
             
             return {
                 "original_query": query,
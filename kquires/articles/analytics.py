@@ -0,0 +1,140 @@
+"""
+Article view analytics.
+
+Views are appended to a Redis stream by ``counters.record_view`` and drained
+here in batches into ``ArticleViewEvent`` rows. Rollups into hourly and daily
+``ArticleViewRollup`` rows are built incrementally: a ``Checkpoint`` holds the
+id of the last event already counted, so each run only aggregates new events
+and dashboards read the small rollup table instead of the raw events.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from ..utils.redis_client import get_redis
+from .counters import VIEW_EVENTS_STREAM
+from .models import Article, ArticleViewEvent, ArticleViewRollup, Checkpoint
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_CHECKPOINT = 'article-view-rollup'
+PERIODS = {
+    ArticleViewRollup.PERIOD_HOUR: TruncHour,
+    ArticleViewRollup.PERIOD_DAY: TruncDay,
+}
+GROUP_FIELDS = ('article_id', 'category_id', 'department_id', 'language')
+
+
+def drain_view_events(batch_size=1000, max_batches=100):
+    """Move buffered view events from the Redis stream into the database"""
+    redis = get_redis()
+    if redis is None:
+        return 0
+
+    drained = 0
+    for _ in range(max_batches):
+        entries = redis.xrange(VIEW_EVENTS_STREAM, min='-', max='+', count=batch_size)
+        if not entries:
+            break
+        views = [
+            {key.decode(): value.decode() for key, value in fields.items()}
+            for _, fields in entries
+        ]
+        # Category and language are those of the article when the batch is drained
+        articles = {
+            article['pk']: article
+            for article in Article.objects.filter(
+                pk__in={int(view['article']) for view in views}
+            ).values('pk', 'category_id', 'language')
+        }
+        events = []
+        for view in views:
+            article = articles.get(int(view['article']))
+            if article is None:
+                # The article was deleted in the meantime
+                continue
+            events.append(ArticleViewEvent(
+                article_id=article['pk'],
+                category_id=article['category_id'],
+                department_id=int(view['department']) if view.get('department') else None,
+                language=article['language'],
+                viewed_at=datetime.fromtimestamp(float(view['ts']), tz=dt_timezone.utc),
+            ))
+        ArticleViewEvent.objects.bulk_create(events)
+        redis.xdel(VIEW_EVENTS_STREAM, *[entry_id for entry_id, _ in entries])
+        drained += len(events)
+    return drained
+
+
+def rollup_view_events(lag_seconds=60):
+    """
+    Add the events recorded since the watermark to the hourly and daily rollups.
+
+    Events younger than ``lag_seconds`` are left for the next run, so rows from
+    transactions that commit slightly out of id order are not skipped.
+    Returns the number of events rolled up.
+    """
+    Checkpoint.objects.get_or_create(name=ROLLUP_CHECKPOINT)
+    total = 0
+    with transaction.atomic():
+        # Runs are serialized on the checkpoint row, so no event is counted twice
+        checkpoint = Checkpoint.objects.select_for_update().get(name=ROLLUP_CHECKPOINT)
+        pending = ArticleViewEvent.objects.filter(id__gt=checkpoint.position)
+        upper = pending.filter(
+            viewed_at__lt=timezone.now() - timedelta(seconds=lag_seconds)
+        ).aggregate(upper=Max('id'))['upper']
+        if upper is None:
+            return 0
+
+        events = pending.filter(id__lte=upper)
+        for period, trunc in PERIODS.items():
+            groups = (
+                events.annotate(bucket=trunc('viewed_at'))
+                .values('bucket', *GROUP_FIELDS)
+                .annotate(views=Count('id'))
+                .order_by()
+            )
+            for group in groups:
+                views = group.pop('views')
+                ArticleViewRollup.objects.update_or_create(
+                    period=period, **group,
+                    defaults={'views': F('views') + views},
+                    create_defaults={'views': views},
+                )
+                if period == ArticleViewRollup.PERIOD_HOUR:
+                    total += views
+        checkpoint.position = upper
+        checkpoint.stats = {'events': checkpoint.stats.get('events', 0) + total}
+        checkpoint.save()
+    return total
+
+
+def prune_view_events(days=30):
+    """Delete raw events that are rolled up and older than ``days``"""
+    checkpoint = Checkpoint.objects.filter(name=ROLLUP_CHECKPOINT).first()
+    if checkpoint is None:
+        return 0
+    deleted, _ = ArticleViewEvent.objects.filter(
+        id__lte=checkpoint.position,
+        viewed_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+def view_totals(start, end, group_by=('article',), period=ArticleViewRollup.PERIOD_DAY, **filters):
+    """
+    Views between ``start`` and ``end`` from the rollups, grouped by the given
+    fields, most viewed first. Filters such as ``department=...`` or
+    ``language='arabic'`` narrow the rows, e.g. what department X read this week.
+    """
+    return (
+        ArticleViewRollup.objects.filter(period=period, bucket__gte=start, bucket__lt=end, **filters)
+        .values(*group_by)
+        .annotate(views=Sum('views'))
+        .order_by('-views')
+    )
@@ -4,11 +4,13 @@ API views for article translation operations
 
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .models import Article
-from .ai_services import ai_service
+from celery.result import AsyncResult
+from .models import Article, TranslationJob
+from .translation import enqueue_translation
 import json
 
 
@@ -16,7 +18,7 @@ import json
 @login_required
 @require_http_methods(["POST"])
 def translate_article_view(request, article_id):
-    """Translate an article to the target language"""
+    """Queue a translation of an article to the target language"""
     try:
         article = get_object_or_404(Article, id=article_id)
         data = json.loads(request.body)
@@ -24,6 +26,8 @@ def translate_article_view(request, article_id):
         
         if not target_language:
             return JsonResponse({'error': 'Target language is required'}, status=400)
+        if target_language not in dict(Article.LANGUAGE_CHOICES):
+            return JsonResponse({'error': f'Unsupported target language: {target_language}'}, status=400)
         
         # Check if translation already exists
         existing_translation = article.translations.filter(language=target_language).first()
@@ -35,48 +39,18 @@ def translate_article_view(request, article_id):
         
         # Get the main article (parent or self)
         main_article = article.parent_article if article.parent_article else article
+        if target_language == main_article.language:
+            return JsonResponse({'error': 'The article is already in the target language'}, status=400)
         
-        # Detect language of the main article
-        combined_content = f"{main_article.title} {main_article.short_description} {main_article.brief_description}"
-        detected_language = ai_service.detect_language(combined_content)
-        
-        # Translate content
-        title_translation = ai_service.translate_content(main_article.title, detected_language, target_language)
-        short_desc_translation = ai_service.translate_content(main_article.short_description, detected_language, target_language)
-        brief_desc_translation = ai_service.translate_content(main_article.brief_description, detected_language, target_language)
-        
-        # Extract translated text from responses
-        translated_title = title_translation.get('translated_text', main_article.title) if isinstance(title_translation, dict) else main_article.title
-        translated_short_desc = short_desc_translation.get('translated_text', main_article.short_description) if isinstance(short_desc_translation, dict) else main_article.short_description
-        translated_brief_desc = brief_desc_translation.get('translated_text', main_article.brief_description) if isinstance(brief_desc_translation, dict) else main_article.brief_description
-        
-        # Create translation
-        translated_article = Article(
-            title=translated_title,
-            short_description=translated_short_desc,
-            brief_description=translated_brief_desc,
-            user=main_article.user,
-            language=target_language,
-            original_language=detected_language,
-            parent_article=main_article,
-            ai_translated=True,
-            translation_status='translated',
-            category=main_article.category,
-            subcategory=main_article.subcategory,
-            status=main_article.status,
-            visibility=main_article.visibility,
-        )
-        translated_article.save()
+        job = enqueue_translation(main_article, target_language)
+        if job is None:
+            return JsonResponse({'error': 'AI service not available'}, status=503)
         
         return JsonResponse({
-            'message': 'Translation completed successfully',
-            'translation_id': translated_article.id,
-            'translation_preview': {
-                'title': translated_title,
-                'short_description': translated_short_desc,
-                'brief_description': translated_brief_desc
-            }
-        })
+            'message': 'Translation queued',
+            'task_id': job.task_id,
+            'status_url': reverse('articles:get_task_status', args=[job.task_id]),
+        }, status=202)
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -86,8 +60,14 @@ def translate_article_view(request, article_id):
 @require_http_methods(["GET"])
 def get_task_status(request, task_id):
     """Get the status of a background task"""
-    # For now, return a simple success status since we're doing synchronous translation
+    job = TranslationJob.objects.filter(task_id=task_id).first()
+    if job:
+        return JsonResponse(job.as_status())
+    
+    # Not a translation job: fall back to the Celery result backend
+    result = AsyncResult(task_id)
     return JsonResponse({
-        'status': 'SUCCESS',
-        'result': 'Translation completed'
+        'task_id': task_id,
+        'status': result.state,
+        'result': str(result.result) if result.ready() else None,
     })
@@ -0,0 +1,298 @@
+"""
+Content-addressed media store.
+
+Uploads are streamed to a temporary name while they are hashed, then either
+moved to ``blobs/<aa>/<bb>/<sha256><ext>`` or, when a blob with the same hash
+already exists, discarded: a duplicate upload costs one row update. Records
+that point at a blob (PDFFiles, video upload sessions) call
+``acquire_blob``/``release_blob`` through ``store_blob`` and their delete
+signals; the file goes with the last reference. Media dropped into the
+editor has no owning record: it is stored with ``reference=False`` and is
+pinned when an article embedding it is saved. Drops no article claimed are
+deleted by ``delete_unclaimed_blobs`` once they are old enough.
+"""
+
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Blob
+from ..utils.pdf_extraction import PDFExtractionError, extract_pdf_pages
+from ..utils.uploads import open_stored, store_upload
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIR = 'blobs'
+INCOMING_DIR = 'blobs/incoming'
+# Extracted pages are written when this many arrived or this many seconds passed
+PAGE_BATCH_SIZE = 50
+PROGRESS_INTERVAL = 1.0
+# Editor drops not embedded in a saved article by then are abandoned
+UNCLAIMED_BLOB_TTL = timedelta(days=1)
+
+
+def blob_path(sha256, filename=''):
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{BLOBS_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def _move(source, target, storage):
+    """Move a stored file within the storage, keeping an existing target"""
+    if storage.exists(target):
+        storage.delete(source)
+        return
+    try:
+        source_path, target_path = storage.path(source), storage.path(target)
+    except NotImplementedError:
+        with storage.open(source, 'rb') as handle:
+            storage.save(target, handle)
+        storage.delete(source)
+        return
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    os.replace(source_path, target_path)
+
+
+def store_blob(uploaded_file, max_size=None, storage=default_storage, reference=True):
+    """
+    Store an upload by content and take a reference to it.
+
+    Without ``reference`` nothing is counted, for content that no record owns
+    yet. Returns ``(blob, created)``; ``created`` is False when the same bytes
+    were stored before and the upload was dropped.
+    """
+    stored = store_upload(uploaded_file, INCOMING_DIR, storage=storage, max_size=max_size)
+    return adopt_stored(stored, storage, reference=reference)
+
+
+def adopt_stored(stored, storage=default_storage, reference=True):
+    """
+    Move an already stored and hashed file into the blob store and take a reference.
+
+    The file at ``stored.path`` is moved, or deleted when the blob exists.
+    Returns ``(blob, created)`` like ``store_blob``.
+    """
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(sha256=stored.sha256).first()
+        if blob is not None:
+            storage.delete(stored.path)
+            if reference:
+                acquire_blob(blob)
+            return blob, False
+
+        path = blob_path(stored.sha256, stored.name)
+        try:
+            with transaction.atomic():
+                blob = Blob.objects.create(
+                    sha256=stored.sha256, size=stored.size, path=path,
+                    content_type=stored.content_type, ref_count=1 if reference else 0,
+                )
+        except IntegrityError:
+            # The same content was stored concurrently
+            storage.delete(stored.path)
+            blob = Blob.objects.select_for_update().get(sha256=stored.sha256)
+            if reference:
+                acquire_blob(blob)
+            return blob, False
+        _move(stored.path, path, storage)
+    return blob, True
+
+
+def acquire_blob(blob):
+    Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+    blob.ref_count += 1
+
+
+def release_blob(blob_id, storage=default_storage):
+    """Drop a reference; the last one deletes the row and, after commit, the file, unless the blob is pinned"""
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        if blob.pinned or blob.ref_count > 1:
+            if blob.ref_count:
+                Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+        path = blob.path
+        blob.delete()
+    transaction.on_commit(lambda: storage.delete(path))
+
+
+def _delete_files(paths, storage):
+    for path in paths:
+        storage.delete(path)
+
+
+def unclaimed_blobs():
+    return Blob.objects.filter(ref_count=0, pinned=False, pdf_files__isnull=True, upload_sessions__isnull=True)
+
+
+def delete_unclaimed_blobs(storage=default_storage):
+    """
+    Delete editor drops that no saved article embedded and no record references.
+
+    Images go with their responsive variants. Returns the number of blobs
+    deleted.
+    """
+    from .models import ImageAsset
+
+    count = 0
+    stale = unclaimed_blobs().filter(created_at__lt=timezone.now() - UNCLAIMED_BLOB_TTL)
+    for blob_id in stale.values_list('pk', flat=True):
+        with transaction.atomic():
+            # Claimed since the listing: pinned by an article save, or referenced
+            blob = unclaimed_blobs().select_for_update(of=('self',)).filter(pk=blob_id).first()
+            if blob is None:
+                continue
+            paths = [blob.path]
+            for asset in ImageAsset.objects.filter(source=blob.path):
+                paths += [variant['path'] for variant in asset.variants]
+                asset.delete()
+            blob.delete()
+            transaction.on_commit(lambda paths=paths: _delete_files(paths, storage))
+        count += 1
+    return count
+
+
+def extraction_stale_before():
+    """Pending or running extractions not heard from since then were lost with their worker"""
+    # Twice the task's hard time limit, which also leaves a queued task time to start
+    return timezone.now() - timedelta(seconds=2 * (settings.PDF_EXTRACTION_TIMEOUT + 60))
+
+
+def reclaimable_extractions():
+    return Q(extraction_status__in=[Blob.EXTRACTION_NONE, Blob.EXTRACTION_FAILED]) | Q(
+        extraction_status__in=[Blob.EXTRACTION_PENDING, Blob.EXTRACTION_PROCESSING],
+        extraction_updated_at__lt=extraction_stale_before(),
+    )
+
+
+def queue_blob_extraction(blob):
+    """
+    Queue the text extraction of a PDF blob unless it is done or under way.
+
+    Returns the blob's extraction status. The claim is a conditional update,
+    so concurrent uploads of the same content queue one task; an extraction
+    whose worker died is claimed again once it is stale.
+    """
+    from .tasks import extract_pdf_text_task
+
+    claimed = Blob.objects.filter(reclaimable_extractions(), pk=blob.pk).update(
+        extraction_status=Blob.EXTRACTION_PENDING, pages_extracted=0, extraction_error=None,
+        extraction_updated_at=timezone.now(),
+    )
+    if claimed:
+        transaction.on_commit(lambda: extract_pdf_text_task.delay(blob.pk))
+    else:
+        # An extraction already under way may finish before this transaction commits
+        transaction.on_commit(lambda: sync_pdf_files(blob.pk))
+    blob.refresh_from_db(fields=['extraction_status', 'pages_extracted', 'extraction_error'])
+    return blob.extraction_status
+
+
+def requeue_stale_extractions():
+    """Queue again the extractions of blobs that PDFFiles wait for but whose worker died"""
+    from .models import PDFFile
+
+    stale = Blob.objects.filter(
+        extraction_status__in=[Blob.EXTRACTION_PENDING, Blob.EXTRACTION_PROCESSING],
+        extraction_updated_at__lt=extraction_stale_before(),
+    )
+    count = 0
+    for blob in stale.filter(pk__in=PDFFile.objects.filter(status='processing').values('blob')):
+        queue_blob_extraction(blob)
+        count += 1
+    return count
+
+
+def mark_extraction_failed(blob, error):
+    """Record a failed extraction on the blob and every PDFFile using it"""
+    from .models import PDFFile
+
+    blob.extraction_status = Blob.EXTRACTION_FAILED
+    blob.extraction_error = str(error)
+    blob.extraction_updated_at = timezone.now()
+    blob.save(update_fields=['extraction_status', 'extraction_error', 'extraction_updated_at'])
+    PDFFile.objects.filter(blob=blob).update(status='error', error_message=str(error))
+
+
+def sync_pdf_files(blob_id):
+    """Copy the outcome of a finished extraction to the PDFFiles still waiting for it"""
+    from .models import PDFFile
+
+    blob = Blob.objects.filter(pk=blob_id).first()
+    if blob is None:
+        return
+    waiting = PDFFile.objects.filter(blob=blob, status='processing')
+    if blob.extraction_status == Blob.EXTRACTION_READY:
+        waiting.update(page_count=blob.page_count, status='ready', error_message=None)
+    elif blob.extraction_status == Blob.EXTRACTION_FAILED:
+        waiting.update(status='error', error_message=blob.extraction_error)
+
+
+def extract_blob_pages(blob, storage=default_storage, limits=None):
+    """
+    Extract the pages of a PDF blob once and share them with every PDFFile using it.
+
+    Parsing runs in limited worker processes. Pages are written to PDFPage
+    in batches while they arrive, together with ``pages_extracted``. Returns
+    the page count. Any error is recorded as a failed extraction and raised
+    again; pages that arrived before it are kept.
+    """
+    from .models import PDFFile, PDFPage
+
+    claimed = Blob.objects.filter(
+        Q(extraction_status=Blob.EXTRACTION_PENDING) | reclaimable_extractions(), pk=blob.pk,
+    ).update(extraction_status=Blob.EXTRACTION_PROCESSING, pages_extracted=0, extraction_updated_at=timezone.now())
+    if not claimed:
+        # Done, or running in another worker
+        blob.refresh_from_db(fields=['extraction_status', 'page_count'])
+        return blob.page_count
+
+    PDFPage.objects.filter(blob=blob).delete()
+    progress = {'pages': [], 'written': 0, 'saved_at': time.monotonic()}
+
+    def flush():
+        PDFPage.objects.bulk_create(progress['pages'])
+        progress['written'] += len(progress['pages'])
+        progress['pages'] = []
+        progress['saved_at'] = time.monotonic()
+        Blob.objects.filter(pk=blob.pk).update(pages_extracted=progress['written'], extraction_updated_at=timezone.now())
+
+    def on_page(number, text):
+        progress['pages'].append(PDFPage.build(blob.pk, number, text))
+        if len(progress['pages']) >= PAGE_BATCH_SIZE or time.monotonic() - progress['saved_at'] >= PROGRESS_INTERVAL:
+            flush()
+
+    try:
+        try:
+            texts = extract_pdf_pages(storage.path(blob.path), limits=limits, on_page=on_page)
+        except NotImplementedError:
+            # Remote storage: the workers read a local copy
+            with open_stored(blob.path, storage) as stream:
+                texts = extract_pdf_pages(stream, limits=limits, on_page=on_page)
+        flush()
+    except Exception as exc:
+        # Includes the soft time limit and database errors; the blob must not stay claimed
+        try:
+            if isinstance(exc, PDFExtractionError):
+                flush()
+            mark_extraction_failed(blob, exc)
+        except Exception as record_error:
+            logger.error("Could not record the failed extraction of blob %s: %s", blob.pk, record_error)
+        raise
+
+    blob.page_count = len(texts)
+    blob.pages_extracted = progress['written']
+    blob.extraction_status = Blob.EXTRACTION_READY
+    blob.extraction_error = None
+    blob.extraction_updated_at = timezone.now()
+    blob.save(update_fields=['page_count', 'pages_extracted', 'extraction_status', 'extraction_error', 'extraction_updated_at'])
+    PDFFile.objects.filter(blob=blob).update(page_count=blob.page_count, status='ready', error_message=None)
+    return blob.page_count
@@ -0,0 +1,193 @@
+"""
+File catalog.
+
+``FileCatalogEntry`` lists every stored file with its size and status: media
+files on local storage and files uploaded to Google Drive, linked to the
+PDFFile or Article they belong to. Uploads are recorded as they happen by
+signal receivers; ``reconcile_file_catalog`` runs in the background, walks
+MEDIA_ROOT with ``os.scandir`` and the Drive records in batches, upserts what
+it finds and marks entries it did not see as missing. The file manager only
+reads the table, with aggregates and pagination.
+"""
+
+import logging
+import mimetypes
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..utils.images import DERIVATIVES_DIR
+from .blobs import INCOMING_DIR
+from .models import Article, FileCatalogEntry, PDFFile
+from .resumable import SESSIONS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Temporary and derived files are not part of the catalog
+SKIPPED_DIRS = {INCOMING_DIR, DERIVATIVES_DIR, SESSIONS_DIR}
+UPSERT_FIELDS = ['name', 'kind', 'size', 'status', 'modified_at', 'last_seen_at', 'pdf_file', 'article']
+
+
+def scan_media(root, skipped=SKIPPED_DIRS):
+    """Yield ``(path, size, mtime)`` of every file under ``root``, paths relative with '/'"""
+    pending = ['']
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, directory)) as entries:
+                for entry in entries:
+                    path = f"{directory}/{entry.name}" if directory else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if path not in skipped:
+                            pending.append(path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        yield path, stat.st_size, stat.st_mtime
+        except FileNotFoundError:
+            continue
+
+
+def guess_kind(name):
+    if name.lower().endswith('.pdf'):
+        return FileCatalogEntry.KIND_PDF
+    content_type = mimetypes.guess_type(name)[0] or ''
+    if content_type.startswith('image/'):
+        return FileCatalogEntry.KIND_IMAGE
+    if content_type.startswith('video/'):
+        return FileCatalogEntry.KIND_VIDEO
+    return FileCatalogEntry.KIND_OTHER
+
+
+def upsert_entries(entries):
+    if entries:
+        FileCatalogEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['source', 'key'], update_fields=UPSERT_FIELDS,
+        )
+
+
+def _local_links():
+    """Media path -> (pdf_file_id, article_id) of the records that own the file"""
+    links = {}
+    for path, pdf_file_id in PDFFile.objects.filter(blob__isnull=False).order_by('-id').values_list('blob__path', 'id'):
+        links[path] = (pdf_file_id, None)
+    for name, pdf_file_id in PDFFile.objects.filter(blob__isnull=True).order_by('-id').values_list('original_filename', 'id'):
+        links.setdefault(f"pdfs/{name}", (pdf_file_id, None))
+    for path, article_id in Article.objects.exclude(attachment='').exclude(attachment__isnull=True).values_list('attachment', 'id'):
+        links[path] = (None, article_id)
+    return links
+
+
+def local_entry(path, size, modified_at, seen_at, pdf_file_id=None, article_id=None):
+    return FileCatalogEntry(
+        source=FileCatalogEntry.SOURCE_LOCAL, key=path, name=os.path.basename(path),
+        kind=FileCatalogEntry.KIND_ATTACHMENT if article_id else guess_kind(path),
+        size=size, status=FileCatalogEntry.STATUS_PRESENT, modified_at=modified_at, last_seen_at=seen_at,
+        pdf_file_id=pdf_file_id, article_id=article_id,
+    )
+
+
+def drive_entry(file_id, name, size, seen_at, pdf_file_id=None, article_id=None, modified_at=None):
+    return FileCatalogEntry(
+        source=FileCatalogEntry.SOURCE_DRIVE, key=file_id, name=name or file_id,
+        kind=FileCatalogEntry.KIND_ATTACHMENT if article_id else guess_kind(name or ''),
+        size=size or 0, status=FileCatalogEntry.STATUS_PRESENT, modified_at=modified_at, last_seen_at=seen_at,
+        pdf_file_id=pdf_file_id, article_id=article_id,
+    )
+
+
+def _mark_missing(source, started):
+    return FileCatalogEntry.objects.filter(source=source, last_seen_at__lt=started).exclude(
+        status=FileCatalogEntry.STATUS_MISSING,
+    ).update(status=FileCatalogEntry.STATUS_MISSING)
+
+
+def reconcile_local_files(root=None, batch_size=500):
+    """Bring the local entries in line with the files under MEDIA_ROOT"""
+    root = root or settings.MEDIA_ROOT
+    started = timezone.now()
+    links = _local_links()
+    batch, seen = [], 0
+    for path, size, mtime in scan_media(root):
+        pdf_file_id, article_id = links.get(path, (None, None))
+        modified_at = datetime.fromtimestamp(mtime, tz=dt_timezone.utc)
+        batch.append(local_entry(path, size, modified_at, started, pdf_file_id, article_id))
+        if len(batch) >= batch_size:
+            upsert_entries(batch)
+            seen += len(batch)
+            batch = []
+    upsert_entries(batch)
+    seen += len(batch)
+    return {'seen': seen, 'missing': _mark_missing(FileCatalogEntry.SOURCE_LOCAL, started)}
+
+
+def reconcile_drive_files(batch_size=500):
+    """Bring the Drive entries in line with the Drive ids recorded on PDFFiles and Articles"""
+    started = timezone.now()
+    batch, seen = [], 0
+    records = [
+        (
+            PDFFile.objects.exclude(google_drive_file_id__isnull=True).exclude(google_drive_file_id='').values_list(
+                'google_drive_file_id', 'google_drive_filename', 'original_filename', 'google_drive_file_size', 'id', 'upload_date',
+            ),
+            'pdf',
+        ),
+        (
+            Article.objects.exclude(google_drive_file_id__isnull=True).exclude(google_drive_file_id='').values_list(
+                'google_drive_file_id', 'google_drive_filename', 'title', 'google_drive_file_size', 'id', 'created_at',
+            ),
+            'article',
+        ),
+    ]
+    for queryset, owner in records:
+        for file_id, drive_name, fallback_name, size, owner_id, created_at in queryset.iterator(chunk_size=batch_size):
+            batch.append(drive_entry(
+                file_id, drive_name or fallback_name, size, started, modified_at=created_at,
+                pdf_file_id=owner_id if owner == 'pdf' else None,
+                article_id=owner_id if owner == 'article' else None,
+            ))
+            if len(batch) >= batch_size:
+                upsert_entries(batch)
+                seen += len(batch)
+                batch = []
+    upsert_entries(batch)
+    seen += len(batch)
+    return {'seen': seen, 'missing': _mark_missing(FileCatalogEntry.SOURCE_DRIVE, started)}
+
+
+def reconcile_file_catalog():
+    return {'local': reconcile_local_files(), 'drive': reconcile_drive_files()}
+
+
+def catalog_pdf_file(pdf_file):
+    """Record the files of a PDFFile right away, ahead of the next reconcile"""
+    now = timezone.now()
+    entries = []
+    if pdf_file.blob_id:
+        blob = pdf_file.blob
+        entries.append(local_entry(blob.path, blob.size, now, now, pdf_file_id=pdf_file.pk))
+    if pdf_file.google_drive_file_id:
+        entries.append(drive_entry(
+            pdf_file.google_drive_file_id, pdf_file.google_drive_filename or pdf_file.original_filename,
+            pdf_file.google_drive_file_size, now, pdf_file_id=pdf_file.pk, modified_at=now,
+        ))
+    upsert_entries(entries)
+
+
+def catalog_article_files(article):
+    """Record the attachment of an article and its Drive copy right away"""
+    now = timezone.now()
+    entries = []
+    if article.attachment:
+        try:
+            size = article.attachment.size
+        except OSError:
+            size = 0
+        entries.append(local_entry(article.attachment.name, size, now, now, article_id=article.pk))
+    if article.google_drive_file_id:
+        entries.append(drive_entry(
+            article.google_drive_file_id, article.google_drive_filename or article.title,
+            article.google_drive_file_size, now, article_id=article.pk, modified_at=now,
+        ))
+    upsert_entries(entries)
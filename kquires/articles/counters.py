@@ -0,0 +1,128 @@
+"""
+Buffered article view counting.
+
+A view is one HINCRBY on a Redis hash; the ``flush_view_counts`` beat task
+moves the buffered counts into ``Article.click_count`` with a few batched
+``F('click_count') + n`` updates, so reads never lock article rows. Without
+Redis every view is applied directly with an atomic ``F()`` update.
+
+The same pipeline appends the view to a Redis stream for analytics, which
+``kquires.articles.analytics`` drains into ``ArticleViewEvent`` rows. Only
+the article id is needed to count a view, so cached pages can count theirs.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from redis.exceptions import LockError, ResponseError
+
+from ..utils.redis_client import get_redis
+from .models import Article, ArticleViewEvent, Checkpoint
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNTS_KEY = 'articles:views'
+FLUSHING_KEY = 'articles:views:flushing'
+FLUSH_BATCH_KEY = 'articles:views:flushing:batch'
+FLUSH_LOCK_KEY = 'articles:views:flush-lock'
+# Longer than any flush; the lock of a flusher that died expires after it
+FLUSH_LOCK_TIMEOUT = 300
+FLUSH_CHECKPOINT = 'article-view-counts'
+VIEW_EVENTS_STREAM = 'articles:view-events'
+# Upper bound of undrained events kept in the stream
+VIEW_EVENTS_MAXLEN = 1000000
+
+
+def record_view(article_id, user=None):
+    """Count one view of an article and record it for analytics"""
+    department_id = getattr(user, 'department_id', None)
+    redis = get_redis()
+    if redis is not None:
+        try:
+            event = {'article': article_id, 'department': department_id or '', 'ts': timezone.now().timestamp()}
+            pipeline = redis.pipeline(transaction=False)
+            pipeline.hincrby(VIEW_COUNTS_KEY, article_id, 1)
+            pipeline.xadd(VIEW_EVENTS_STREAM, event, maxlen=VIEW_EVENTS_MAXLEN, approximate=True)
+            pipeline.execute()
+            return
+        except Exception as e:
+            logger.warning("Could not buffer view of article %s: %s", article_id, e)
+    Article.objects.filter(pk=article_id).update(click_count=F('click_count') + 1)
+    article = Article.objects.filter(pk=article_id).values('category_id', 'language').first()
+    if article:
+        ArticleViewEvent.objects.create(
+            article_id=article_id,
+            department_id=department_id,
+            viewed_at=timezone.now(),
+            **article,
+        )
+
+
+def apply_view_counts(counts):
+    """Add ``{article_id: views}`` to the click counts, one UPDATE per distinct increment"""
+    by_increment = defaultdict(list)
+    for article_id, views in counts.items():
+        if int(views) > 0:
+            by_increment[int(views)].append(int(article_id))
+    with transaction.atomic():
+        for views, article_ids in by_increment.items():
+            Article.objects.filter(pk__in=article_ids).update(click_count=F('click_count') + views)
+    return sum(views * len(ids) for views, ids in by_increment.items())
+
+
+def _flush_batch(redis):
+    # A previous flush that died after taking the buffer is finished first
+    if not redis.exists(FLUSHING_KEY):
+        try:
+            redis.rename(VIEW_COUNTS_KEY, FLUSHING_KEY)
+        except ResponseError:
+            # Nothing was viewed since the last flush
+            return 0
+    token = redis.get(FLUSH_BATCH_KEY)
+    if token is None:
+        token = uuid.uuid4().hex
+        redis.set(FLUSH_BATCH_KEY, token)
+    elif isinstance(token, bytes):
+        token = token.decode()
+
+    counts = redis.hgetall(FLUSHING_KEY)
+    applied = 0
+    with transaction.atomic():
+        checkpoint, _ = Checkpoint.objects.select_for_update().get_or_create(name=FLUSH_CHECKPOINT)
+        # A batch whose counts were committed before a crash is only deleted
+        if checkpoint.stats.get('batch') != token:
+            applied = apply_view_counts(counts)
+            checkpoint.stats = {'batch': token, 'views': applied}
+            checkpoint.save(update_fields=['stats', 'updated_at'])
+        transaction.on_commit(lambda: redis.delete(FLUSHING_KEY, FLUSH_BATCH_KEY))
+    return applied
+
+
+def flush_view_counts():
+    """
+    Move the buffered view counts into the database; returns the number of views applied.
+
+    Flushes run one at a time under a Redis lock. Each buffered batch gets a
+    token that is stored in a Checkpoint in the transaction that applies its
+    counts, and the batch is deleted once that transaction commits, so a
+    batch left over by a crash after the commit is dropped, not counted twice.
+    """
+    redis = get_redis()
+    if redis is None:
+        return 0
+
+    lock = redis.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT, blocking=False)
+    if not lock.acquire():
+        # Another flush is running
+        return 0
+    try:
+        return _flush_batch(redis)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning("View count flush outlived its lock")
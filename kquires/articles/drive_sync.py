@@ -0,0 +1,215 @@
+"""
+Google Drive sync.
+
+Requests never talk to Drive: ``enqueue_drive_upload`` records a
+``DriveSyncJob`` (the outbox) in the request's transaction and the Celery
+worker picks it up after commit. The worker reads the stored file from local
+storage one chunk at a time and sends it through a Drive resumable upload
+session, recording the bytes Drive confirmed after every chunk. A failed
+attempt keeps the session, so the next one asks Drive for its offset and
+continues from there; transient failures are retried with exponential
+backoff and full jitter up to DRIVE_SYNC_MAX_ATTEMPTS. The ``google_drive_*``
+fields of the article or PDF are written when the upload completes.
+"""
+
+import logging
+import os
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..utils.google_drive_service import DriveUploadError, drive_upload_client
+from .catalog import catalog_article_files, catalog_pdf_file
+from .models import Article, DriveSyncJob, PDFFile
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch_drive_job(job, countdown=None):
+    from .tasks import sync_drive_file_task
+
+    sync_drive_file_task.apply_async((job.pk,), countdown=countdown)
+
+
+def enqueue_drive_upload(target, path, filename, mime_type='', storage=default_storage):
+    """
+    Queue the upload of the stored file at ``path`` to Drive for an Article or PDFFile.
+
+    A job that is already uploading is told to run again for the new file
+    once it finishes. The task is only dispatched after the surrounding
+    transaction commits. Returns the job.
+    """
+    field = 'article' if isinstance(target, Article) else 'pdf_file'
+    now = timezone.now()
+    details = {
+        'path': path,
+        'filename': filename or os.path.basename(path),
+        'mime_type': mime_type or '',
+        'size': storage.size(path),
+        'requested_at': now,
+    }
+    with transaction.atomic():
+        job, created = DriveSyncJob.objects.select_for_update().get_or_create(
+            **{field: target}, defaults={**details, 'next_attempt_at': now},
+        )
+        if not created:
+            if job.status != DriveSyncJob.STATUS_UPLOADING:
+                details.update(
+                    status=DriveSyncJob.STATUS_PENDING, attempts=0, bytes_uploaded=0, session_uri='',
+                    error_message=None, next_attempt_at=now, started_at=None, finished_at=None,
+                )
+            # An upload under way keeps its own columns; it sees requested_at and runs again
+            DriveSyncJob.objects.filter(pk=job.pk).update(**details, updated_at=now)
+            job.refresh_from_db()
+    if job.status == DriveSyncJob.STATUS_PENDING:
+        transaction.on_commit(lambda: dispatch_drive_job(job))
+    return job
+
+
+def backoff_delay(attempts):
+    """Seconds before the next attempt: full jitter over an exponentially growing window"""
+    window = min(settings.DRIVE_SYNC_BACKOFF_MAX, settings.DRIVE_SYNC_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return random.uniform(0, window)
+
+
+def upload_job_file(job, client, storage=default_storage):
+    """Send the job's file to Drive from where the last attempt stopped; returns the Drive file"""
+    chunk_size = settings.DRIVE_SYNC_CHUNK_SIZE
+    offset, drive_file = 0, None
+    if job.session_uri:
+        try:
+            offset, drive_file = client.query(job.session_uri, job.size)
+        except DriveUploadError as exc:
+            if not exc.session_expired:
+                raise
+            job.session_uri = ''
+    if not job.session_uri:
+        job.session_uri = client.start(job.filename, job.mime_type, job.size)
+        DriveSyncJob.objects.filter(pk=job.pk).update(session_uri=job.session_uri)
+        offset = 0
+
+    with storage.open(job.path, 'rb') as handle:
+        while drive_file is None:
+            job.set_progress(offset)
+            handle.seek(offset)
+            sent_from = offset
+            offset, drive_file = client.send_chunk(job.session_uri, handle.read(chunk_size), offset, job.size)
+            if drive_file is None and offset <= sent_from:
+                # Sending the same chunk again would loop forever; let the retry ask Drive where it is
+                raise DriveUploadError(f"Drive stored none of the chunk sent at byte {sent_from}")
+    job.set_progress(job.size)
+    return drive_file
+
+
+def apply_drive_file(job, drive_file):
+    """Write the uploaded Drive file to its article or PDF and the file catalog"""
+    model = Article if job.article_id else PDFFile
+    model.objects.filter(pk=job.article_id or job.pdf_file_id).update(
+        google_drive_file_id=drive_file.get('id'),
+        google_drive_filename=drive_file.get('name') or job.filename,
+        google_drive_web_view_link=drive_file.get('webViewLink'),
+        google_drive_web_content_link=drive_file.get('webContentLink'),
+        google_drive_file_size=int(drive_file.get('size') or job.size),
+    )
+    if job.article_id:
+        catalog_article_files(Article.objects.only(
+            'id', 'title', 'attachment', 'google_drive_file_id', 'google_drive_filename', 'google_drive_file_size',
+        ).get(pk=job.article_id))
+    else:
+        catalog_pdf_file(PDFFile.objects.select_related('blob').get(pk=job.pdf_file_id))
+
+
+def _restart_for_new_file(job):
+    """Reset a job whose file was replaced while it was uploading; the old Drive session is for the old file"""
+    job.status = DriveSyncJob.STATUS_PENDING
+    job.attempts = 0
+    job.session_uri = ''
+    job.bytes_uploaded = 0
+    job.next_attempt_at = timezone.now()
+    transaction.on_commit(lambda: dispatch_drive_job(job))
+
+
+def _retry_or_fail(job, exc):
+    job.error_message = str(exc)
+    job.refresh_from_db(fields=['requested_at', 'path', 'filename', 'mime_type', 'size'])
+    if job.requested_at > job.started_at:
+        # A new file was queued while this attempt was uploading the old one
+        _restart_for_new_file(job)
+        job.save(update_fields=[
+            'status', 'attempts', 'session_uri', 'bytes_uploaded', 'error_message', 'next_attempt_at', 'updated_at',
+        ])
+        logger.warning("Drive upload %s failed, starting again with its new file: %s", job.pk, exc)
+        return
+    if exc.session_expired:
+        job.session_uri = ''
+        job.bytes_uploaded = 0
+    if exc.transient and job.attempts < settings.DRIVE_SYNC_MAX_ATTEMPTS:
+        delay = backoff_delay(job.attempts)
+        job.status = DriveSyncJob.STATUS_PENDING
+        job.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        job.save(update_fields=['status', 'error_message', 'session_uri', 'bytes_uploaded', 'next_attempt_at', 'updated_at'])
+        logger.warning("Drive upload %s failed (attempt %s), retrying in %.0fs: %s", job.pk, job.attempts, delay, exc)
+        transaction.on_commit(lambda: dispatch_drive_job(job, countdown=delay))
+        return
+    job.status = DriveSyncJob.STATUS_FAILED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'session_uri', 'bytes_uploaded', 'finished_at', 'updated_at'])
+    logger.error("Drive upload %s failed after %s attempts: %s", job.pk, job.attempts, exc)
+
+
+def run_drive_job(job_id, client=None):
+    """
+    Run one attempt of a due DriveSyncJob.
+
+    The job is claimed with a conditional update, so a job dispatched twice
+    is uploaded once. Returns the job's status, or None when it was not due.
+    """
+    now = timezone.now()
+    claimed = DriveSyncJob.objects.filter(
+        pk=job_id, status=DriveSyncJob.STATUS_PENDING, next_attempt_at__lte=now,
+    ).update(status=DriveSyncJob.STATUS_UPLOADING, attempts=F('attempts') + 1, started_at=now, updated_at=now)
+    if not claimed:
+        return None
+    job = DriveSyncJob.objects.get(pk=job_id)
+
+    try:
+        drive_file = upload_job_file(job, client or drive_upload_client())
+    except DriveUploadError as exc:
+        _retry_or_fail(job, exc)
+        return job.status
+    except OSError as exc:
+        # The stored file is gone; retrying cannot help
+        _retry_or_fail(job, DriveUploadError(f"Could not read {job.path}: {exc}", transient=False))
+        return job.status
+
+    apply_drive_file(job, drive_file)
+    job.refresh_from_db(fields=['requested_at', 'path', 'filename', 'mime_type', 'size'])
+    job.error_message = None
+    job.finished_at = timezone.now()
+    job.status = DriveSyncJob.STATUS_SUCCEEDED
+    if job.requested_at > job.started_at:
+        # A new file was queued while this one was uploading
+        _restart_for_new_file(job)
+    job.save(update_fields=[
+        'status', 'attempts', 'session_uri', 'bytes_uploaded', 'error_message', 'next_attempt_at',
+        'finished_at', 'updated_at',
+    ])
+    return job.status
+
+
+def requeue_drive_jobs(stale_minutes=15):
+    """Dispatch due jobs whose task was lost and release uploads whose worker died"""
+    now = timezone.now()
+    DriveSyncJob.objects.filter(
+        status=DriveSyncJob.STATUS_UPLOADING, updated_at__lt=now - timedelta(minutes=stale_minutes),
+    ).update(status=DriveSyncJob.STATUS_PENDING, next_attempt_at=now, updated_at=now)
+    count = 0
+    for job in DriveSyncJob.objects.filter(status=DriveSyncJob.STATUS_PENDING, next_attempt_at__lte=now).only('pk'):
+        dispatch_drive_job(job)
+        count += 1
+    return count
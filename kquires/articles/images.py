@@ -0,0 +1,91 @@
+"""
+Background processing of uploaded images.
+
+``register_image`` records an upload and queues ``generate_image_variants``
+once the transaction commits. The task stores the variants, caches them for
+the ``responsive_image`` template tag and rewrites the articles that were
+saved with the image before it was ready (``ImageAsset.articles``); articles
+saved later pick the variants up in ``save``.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article, ImageAsset
+from ..utils.images import build_variants
+from ..utils.response_cache import purge_tags
+
+logger = logging.getLogger(__name__)
+
+
+def asset_cache_key(source):
+    return f"image-asset:{source}"
+
+
+def register_image(source):
+    """Record an uploaded image and queue its variants; returns the ImageAsset"""
+    from .tasks import generate_image_variants
+
+    asset, created = ImageAsset.objects.get_or_create(source=source)
+    if not created and asset.status == ImageAsset.STATUS_READY:
+        return asset
+    transaction.on_commit(lambda: generate_image_variants.delay(asset.pk))
+    return asset
+
+
+def process_image_asset(asset):
+    try:
+        result = build_variants(asset.source)
+    except Exception as exc:
+        logger.warning("Could not build variants of %s: %s", asset.source, exc)
+        asset.status = ImageAsset.STATUS_FAILED
+        asset.error_message = str(exc)
+        asset.save(update_fields=['status', 'error_message', 'updated_at'])
+        return asset
+
+    asset.width = result['width']
+    asset.height = result['height']
+    asset.placeholder = result['placeholder']
+    asset.variants = result['variants']
+    asset.status = ImageAsset.STATUS_READY
+    asset.error_message = None
+    asset.save()
+    cache.set(asset_cache_key(asset.source), asset, timeout=None)
+
+    rewrite_pending_articles(asset)
+    return asset
+
+
+def rewrite_pending_articles(asset):
+    """
+    Add the new variants to the articles saved while they were being built.
+
+    Only the body column is written, so none of ``Article.save`` or its
+    receivers run again; the cached pages of the rewritten articles are purged
+    here instead. A body edited in the meantime is left alone, since its save
+    applied the variants already.
+    """
+    rewritten = False
+    for article in asset.articles.only('pk', 'parent_article_id', 'brief_description'):
+        body = ImageAsset.apply_to_html(article.brief_description)
+        if body == article.brief_description:
+            continue
+        if Article.objects.filter(pk=article.pk, brief_description=article.brief_description).update(
+            brief_description=body, updated_at=timezone.now(),
+        ):
+            rewritten = True
+            purge_tags(
+                f"article:{article.pk}",
+                f"article:{article.parent_article_id}" if article.parent_article_id else None,
+            )
+    if rewritten:
+        purge_tags("articles")
+    asset.articles.clear()
+
+
+def cached_asset(source):
+    """Ready asset of ``source`` from the cache, without touching the database"""
+    return cache.get(asset_cache_key(source)) if source else None
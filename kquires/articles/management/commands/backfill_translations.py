@@ -0,0 +1,79 @@
+"""
+Management command to translate articles that are missing their counterpart language
+"""
+
+from django.core.management.base import BaseCommand
+
+from kquires.articles.models import Checkpoint
+from kquires.articles.translation import BACKFILL_CHECKPOINT, backfill_translations
+
+
+class Command(BaseCommand):
+    help = 'Translate articles that have no translation yet, resuming from the last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of articles scanned per batch (default: 50)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Number of articles translated at the same time (default: 4)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Start again from the first article, retrying earlier failures'
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Run the backfill on the Celery workers instead of in this process'
+        )
+
+    def handle(self, *args, **options):
+        if options['queue']:
+            from kquires.articles.tasks import backfill_translations_task
+
+            if options['reset']:
+                Checkpoint.objects.filter(name=BACKFILL_CHECKPOINT).update(position=0, stats={})
+            backfill_translations_task.delay(
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+            )
+            self.stdout.write(self.style.SUCCESS('Translation backfill queued.'))
+            return
+
+        def report(stats):
+            self.stdout.write(
+                f"Batch {stats['batches']}: {stats['processed']} processed, "
+                f"{stats['translated']} translated, {stats['failed']} failed, "
+                f"{stats['per_minute']} articles/min"
+            )
+
+        stats = backfill_translations(
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            max_batches=options['max_batches'],
+            reset=options['reset'],
+            report=report,
+        )
+
+        message = (
+            f"{stats['translated']} articles translated, {stats['failed']} failed "
+            f"in {stats['elapsed']}s."
+        )
+        if stats['done']:
+            self.stdout.write(self.style.SUCCESS(f'Backfill complete. {message}'))
+        else:
+            self.stdout.write(self.style.WARNING(f'Backfill paused, run again to resume. {message}'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_pdffile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_language', models.CharField(choices=[('english', 'English'), ('arabic', 'Arabic')], max_length=20, verbose_name='Target Language')),
+                ('task_id', models.CharField(max_length=255, unique=True, verbose_name='Task ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progress')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='Error Message')),
+                ('requested_at', models.DateTimeField(verbose_name='Requested At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translation_jobs', to='articles.article', verbose_name='Source Article')),
+                ('translation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='articles.article', verbose_name='Translation')),
+            ],
+            options={
+                'ordering': ['-requested_at'],
+                'unique_together': {('article', 'target_language')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_translationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_language', models.CharField(choices=[('english', 'English'), ('arabic', 'Arabic')], max_length=20, verbose_name='Target Language')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='Source Hash')),
+                ('translated_text', models.TextField(verbose_name='Translated Text')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_translations', to='articles.article', verbose_name='Source Article')),
+            ],
+            options={
+                'unique_together': {('article', 'target_language', 'source_hash')},
+            },
+        ),
+    ]
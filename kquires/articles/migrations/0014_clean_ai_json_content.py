@@ -0,0 +1,41 @@
+from django.db import migrations
+
+from kquires.utils.translation_service import clean_ai_json
+
+CONTENT_FIELDS = (
+    'title', 'short_description', 'brief_description',
+    'title_ar', 'short_description_ar', 'brief_description_ar',
+    'title_arabic', 'short_description_arabic', 'brief_description_arabic',
+)
+
+
+def clean_article_content(apps, schema_editor):
+    """Unwrap AI responses that were stored as raw JSON, replacing the cleanup commands"""
+    Article = apps.get_model('articles', 'Article')
+    changed = []
+    for article in Article.objects.only('pk', *CONTENT_FIELDS).iterator(chunk_size=500):
+        dirty = False
+        for name in CONTENT_FIELDS:
+            value = getattr(article, name)
+            cleaned = clean_ai_json(value)
+            if cleaned != value:
+                setattr(article, name, cleaned)
+                dirty = True
+        if dirty:
+            changed.append(article)
+        if len(changed) >= 500:
+            Article.objects.bulk_update(changed, CONTENT_FIELDS)
+            changed = []
+    if changed:
+        Article.objects.bulk_update(changed, CONTENT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_article_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0014_clean_ai_json_content'),
+        ('categories', '0003_category_updated_at'),
+        ('departments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleViewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('english', 'English'), ('arabic', 'Arabic')], max_length=20, verbose_name='Language')),
+                ('viewed_at', models.DateTimeField(db_index=True, verbose_name='Viewed At')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_events', to='articles.article', verbose_name='Article')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='categories.category', verbose_name='Category')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArticleViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=10, verbose_name='Period')),
+                ('bucket', models.DateTimeField(verbose_name='Bucket Start')),
+                ('language', models.CharField(choices=[('english', 'English'), ('arabic', 'Arabic')], max_length=20, verbose_name='Language')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Views')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='articles.article', verbose_name='Article')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='categories.category', verbose_name='Category')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'bucket'], name='articles_ar_period_6fd619_idx'), models.Index(fields=['period', 'department', 'bucket'], name='articles_ar_period_9a7e33_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+from kquires.utils.html_headings import build_toc
+
+
+def build_article_tocs(apps, schema_editor):
+    """Anchor the headings of existing articles and store their table of contents"""
+    Article = apps.get_model('articles', 'Article')
+    changed = []
+    for article in Article.objects.only('pk', 'brief_description').iterator(chunk_size=500):
+        article.brief_description, article.toc = build_toc(article.brief_description)
+        changed.append(article)
+        if len(changed) >= 500:
+            Article.objects.bulk_update(changed, ['brief_description', 'toc'])
+            changed = []
+    if changed:
+        Article.objects.bulk_update(changed, ['brief_description', 'toc'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_article_view_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, verbose_name='Table of Contents'),
+        ),
+        migrations.RunPython(build_article_tocs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_status_history(apps, schema_editor):
+    """Start the history with the current status of every article at its creation time"""
+    Article = apps.get_model('articles', 'Article')
+    ArticleStatusChange = apps.get_model('articles', 'ArticleStatusChange')
+    changes = []
+    for article in Article.objects.only('pk', 'category_id', 'user_id', 'language', 'status', 'created_at').iterator(chunk_size=500):
+        changes.append(ArticleStatusChange(
+            article_id=article.pk,
+            category_id=article.category_id,
+            user_id=article.user_id,
+            language=article.language,
+            to_status=article.status,
+            changed_at=article.created_at,
+        ))
+        if len(changes) >= 500:
+            ArticleStatusChange.objects.bulk_create(changes)
+            changes = []
+    ArticleStatusChange.objects.bulk_create(changes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0016_article_toc'),
+        ('categories', '0003_category_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('english', 'English'), ('arabic', 'Arabic')], max_length=20, verbose_name='Language')),
+                ('from_status', models.CharField(blank=True, default='', max_length=20, verbose_name='From Status')),
+                ('to_status', models.CharField(max_length=20, verbose_name='To Status')),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Changed At')),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_changes', to='articles.article', verbose_name='Article')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='categories.category', verbose_name='Category')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Author')),
+            ],
+        ),
+        migrations.RunPython(seed_status_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0018_imageasset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('path', models.CharField(max_length=255, verbose_name='Storage Path')),
+                ('content_type', models.CharField(blank=True, default='', max_length=100, verbose_name='Content Type')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='Page Count')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pdffile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='pdf_files', to='articles.blob', verbose_name='Blob'),
+        ),
+    ]
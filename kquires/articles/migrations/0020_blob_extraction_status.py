@@ -0,0 +1,28 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0019_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='extraction_error',
+            field=models.TextField(blank=True, null=True, verbose_name='Extraction Error'),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='extraction_status',
+            field=models.CharField(blank=True, choices=[('', 'Not Requested'), ('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=20, verbose_name='Extraction Status'),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='pages_extracted',
+            field=models.PositiveIntegerField(default=0, verbose_name='Pages Extracted'),
+        ),
+    ]
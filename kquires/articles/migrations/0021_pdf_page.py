@@ -0,0 +1,34 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0020_blob_extraction_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Page Number')),
+                ('text', models.TextField(blank=True, default='', verbose_name='Text')),
+                ('char_count', models.PositiveIntegerField(default=0, verbose_name='Characters')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Checksum')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='articles.blob', verbose_name='Blob')),
+            ],
+            options={
+                'verbose_name': 'PDF Page',
+                'verbose_name_plural': 'PDF Pages',
+                'ordering': ['blob', 'number'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pdfpage',
+            constraint=models.UniqueConstraint(fields=('blob', 'number'), name='unique_pdf_page_number'),
+        ),
+    ]
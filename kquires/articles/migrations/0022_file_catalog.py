@@ -0,0 +1,40 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0021_pdf_page'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('local', 'Local Media'), ('drive', 'Google Drive')], max_length=10, verbose_name='Source')),
+                ('key', models.CharField(max_length=255, verbose_name='Path or Drive File ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('kind', models.CharField(choices=[('pdf', 'PDF'), ('attachment', 'Article Attachment'), ('image', 'Image'), ('video', 'Video'), ('other', 'Other')], default='other', max_length=20, verbose_name='Kind')),
+                ('size', models.BigIntegerField(default=0, verbose_name='Size')),
+                ('status', models.CharField(choices=[('present', 'Present'), ('missing', 'Missing')], default='present', max_length=10, verbose_name='Status')),
+                ('modified_at', models.DateTimeField(blank=True, null=True, verbose_name='Modified At')),
+                ('last_seen_at', models.DateTimeField(verbose_name='Last Seen At')),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='catalog_entries', to='articles.article', verbose_name='Article')),
+                ('pdf_file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='catalog_entries', to='articles.pdffile', verbose_name='PDF File')),
+            ],
+            options={
+                'verbose_name': 'File Catalog Entry',
+                'verbose_name_plural': 'File Catalog',
+                'ordering': ['-modified_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'kind'], name='articles_fi_status_1507d9_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='filecatalogentry',
+            constraint=models.UniqueConstraint(fields=('source', 'key'), name='unique_catalog_entry'),
+        ),
+    ]
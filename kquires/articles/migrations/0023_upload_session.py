@@ -0,0 +1,42 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:28
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0022_file_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Filename')),
+                ('content_type', models.CharField(blank=True, default='', max_length=100, verbose_name='Content Type')),
+                ('kind', models.CharField(choices=[('pdf', 'PDF'), ('video', 'Video')], max_length=10, verbose_name='Kind')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Bytes Received')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('processing', 'Processing'), ('complete', 'Complete'), ('failed', 'Failed')], default='open', max_length=20, verbose_name='Status')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='Error Message')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+                ('blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='articles.blob', verbose_name='Blob')),
+                ('pdf_file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='articles.pdffile', verbose_name='PDF File')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='articles_up_status_fab142_idx')],
+            },
+        ),
+    ]
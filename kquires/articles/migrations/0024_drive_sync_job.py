@@ -0,0 +1,51 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0023_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriveSyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, verbose_name='Storage Path')),
+                ('filename', models.CharField(max_length=255, verbose_name='Filename')),
+                ('mime_type', models.CharField(blank=True, default='', max_length=100, verbose_name='MIME Type')),
+                ('size', models.BigIntegerField(default=0, verbose_name='Size')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('uploading', 'Uploading'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('bytes_uploaded', models.BigIntegerField(default=0, verbose_name='Bytes Uploaded')),
+                ('session_uri', models.TextField(blank=True, default='', verbose_name='Drive Upload Session')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='Error Message')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Next Attempt At')),
+                ('requested_at', models.DateTimeField(verbose_name='Requested At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='drive_sync_jobs', to='articles.article', verbose_name='Article')),
+                ('pdf_file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='drive_sync_jobs', to='articles.pdffile', verbose_name='PDF File')),
+            ],
+            options={
+                'verbose_name': 'Drive Sync Job',
+                'verbose_name_plural': 'Drive Sync Jobs',
+                'ordering': ['-requested_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='articles_dr_status_ca3e96_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='drivesyncjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('article__isnull', False)), fields=('article',), name='unique_drive_sync_article'),
+        ),
+        migrations.AddConstraint(
+            model_name='drivesyncjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('pdf_file__isnull', False)), fields=('pdf_file',), name='unique_drive_sync_pdf_file'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:45
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def pin_embedded_blobs(apps, schema_editor):
+    # References beyond the PDFFiles and video sessions pointing at a blob were
+    # taken by editor drops, which have no owner to release them. Those that an
+    # article embeds are pinned; the others are left to the unclaimed blob sweep
+    Article = apps.get_model('articles', 'Article')
+    Blob = apps.get_model('articles', 'Blob')
+    blobs = Blob.objects.annotate(
+        owners=Count('pdf_files', distinct=True)
+        + Count('upload_sessions', filter=Q(upload_sessions__kind='video'), distinct=True),
+    )
+    for blob in blobs:
+        if blob.ref_count > blob.owners:
+            embedded = Article.objects.filter(
+                Q(brief_description__contains=blob.path)
+                | Q(brief_description_ar__contains=blob.path)
+                | Q(brief_description_arabic__contains=blob.path),
+            ).exists()
+            Blob.objects.filter(pk=blob.pk).update(pinned=embedded, ref_count=blob.owners)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0024_drive_sync_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='pinned',
+            field=models.BooleanField(default=False, verbose_name='Pinned'),
+        ),
+        migrations.RunPython(pin_embedded_blobs, migrations.RunPython.noop),
+    ]
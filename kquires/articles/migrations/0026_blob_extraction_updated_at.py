@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0025_blob_pinned'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='extraction_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Extraction Updated At'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:48
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+ROLLUP_KEY = ('period', 'bucket', 'article', 'category', 'department', 'language')
+
+
+def merge_duplicate_rollups(apps, schema_editor):
+    # Concurrent rollups could create the same row twice; keep the first with the sum
+    ArticleViewRollup = apps.get_model('articles', 'ArticleViewRollup')
+    duplicates = (
+        ArticleViewRollup.objects.values(*ROLLUP_KEY)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('views'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in duplicates:
+        rows = ArticleViewRollup.objects.filter(**{field: group[field] for field in ROLLUP_KEY})
+        rows.exclude(pk=group['keep']).delete()
+        rows.filter(pk=group['keep']).update(views=group['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0026_blob_extraction_updated_at'),
+        ('categories', '0003_category_updated_at'),
+        ('departments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rollups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='articleviewrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'article', 'category', 'department', 'language'), name='unique_article_view_rollup', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.10 on 2026-10-19 18:06
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def link_pending_images(apps, schema_editor):
+    # Once, for the images still being processed; new saves record the link themselves
+    Article = apps.get_model('articles', 'Article')
+    ImageAsset = apps.get_model('articles', 'ImageAsset')
+    for asset in ImageAsset.objects.filter(status='pending'):
+        asset.articles.add(*Article.objects.filter(brief_description__contains=default_storage.url(asset.source)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0027_unique_article_view_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='articles',
+            field=models.ManyToManyField(blank=True, related_name='pending_images', to='articles.article', verbose_name='Articles'),
+        ),
+        migrations.RunPython(link_pending_images, migrations.RunPython.noop),
+    ]
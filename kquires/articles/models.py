@@ -1,11 +1,74 @@
-from django.db import models
+import hashlib
+import re
+import uuid
+from urllib.parse import unquote
+
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils import timezone
 from ..categories.models import Category
 from ..users.models import User
+from ..utils.change_tracking import FieldTrackerMixin
+from ..utils.html_headings import build_toc
+from ..utils.images import apply_srcset, img_sources
+from ..utils.translation_service import clean_ai_json
 from datetime import datetime
-import json
+
+# Storage path of a blob, as built by ``blobs.blob_path``, anywhere in article HTML
+BLOB_PATH_RE = re.compile(r'blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:\.\w+)?')
+
+
+class ArticleQuerySet(models.QuerySet):
+    """Article queryset that can resolve translations for a whole page at once"""
+    
+    _with_translations = False
+    
+    def with_translations(self):
+        """Load every translation of the fetched articles' groups in one extra query.
+        
+        Each article gets a ``{language: article}`` map of its group, which the
+        ``get_*_for_language`` methods and template filters use instead of
+        querying per article and field.
+        """
+        clone = self._chain()
+        clone._with_translations = True
+        return clone
+    
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_translations = self._with_translations
+        return clone
+    
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super()._fetch_all()
+        if fetching and self._with_translations and self._iterable_class is models.query.ModelIterable:
+            attach_translation_maps(self._result_cache)
+
+
+def attach_translation_maps(articles):
+    """Attach the ``{language: article}`` map of its group to every article, in one query"""
+    articles = [article for article in articles if article is not None]
+    main_ids = {article.parent_article_id or article.pk for article in articles}
+    if not main_ids:
+        return articles
+    
+    groups = {main_id: {} for main_id in main_ids}
+    members = Article.objects.filter(
+        models.Q(pk__in=main_ids) | models.Q(parent_article_id__in=main_ids)
+    ).order_by('pk')
+    for member in members:
+        group = groups[member.parent_article_id or member.pk]
+        # The main article wins over a translation in the same language
+        if member.parent_article_id is None or member.language not in group:
+            group[member.language] = member
+    
+    for article in articles:
+        article._translation_map = groups[article.parent_article_id or article.pk]
+    return articles
 
 
-class Article(models.Model):
+class Article(FieldTrackerMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -48,6 +111,7 @@ class Article(models.Model):
     )
     short_description = models.CharField(max_length=255, verbose_name='Short Description', null=True, blank=True)
     brief_description = models.TextField(verbose_name='Brief Description', null=True, blank=True)
+    toc = models.JSONField(default=list, blank=True, verbose_name='Table of Contents')
     status = models.CharField(default='pending', choices=STATUS_CHOICES, max_length=255, verbose_name='Status')
     comment = models.CharField(default='', blank=True, max_length=255, verbose_name='Comment')
     visibility = models.BooleanField(default=False, blank=True, verbose_name='Visibility')
@@ -101,28 +165,27 @@ class Article(models.Model):
     brief_description_arabic = models.TextField(blank=True, null=True, verbose_name='Brief Description (Arabic)')
     manually_edited = models.BooleanField(default=False, verbose_name='Manually Edited')
     
+    objects = ArticleQuerySet.as_manager()
+
+    # Fields whose previous values signal handlers can read without a query
+    tracked_fields = ('status', 'title', 'category', 'subcategory', 'visibility', 'language', 'user')
+    
+    # Text fields that may be filled from AI output
+    CONTENT_FIELDS = (
+        'title', 'short_description', 'brief_description',
+        'title_ar', 'short_description_ar', 'brief_description_ar',
+        'title_arabic', 'short_description_arabic', 'brief_description_arabic',
+    )
+    # HTML fields that may embed uploaded media
+    EMBEDDING_FIELDS = ('brief_description', 'brief_description_ar', 'brief_description_arabic')
+    
     def __str__(self):
         return self.title
     
-    def _extract_clean_text(self, text):
-        """Extract clean text from potentially JSON-formatted text"""
-        if not text:
-            return text
-        if isinstance(text, str) and text.strip().startswith('{') and text.strip().endswith('}'):
-            try:
-                data = json.loads(text)
-                if isinstance(data, dict) and 'translated_text' in data:
-                    return data['translated_text']
-                elif isinstance(data, dict) and 'original_text' in data:
-                    return data['original_text']
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return text
-    
-    def record_click(self):
-        """Increments the click count every time the article is viewed."""
-        self.click_count += 1
-        self.save(update_fields=['click_count'])
+    def record_click(self, user=None):
+        """Count a view of the article; buffered counts reach click_count on the next flush"""
+        from .counters import record_view
+        record_view(self.pk, user)
     
     def get_translations(self):
         """Get all translations of this article"""
@@ -130,44 +193,40 @@ class Article(models.Model):
             return self.parent_article.translations.all()
         return self.translations.all()
     
+    def get_translation_map(self):
+        """Map of language to article for this article's group, loaded at most once"""
+        if not hasattr(self, '_translation_map'):
+            attach_translation_maps([self])
+        return self._translation_map
+    
+    def get_translation(self, target_language):
+        """The article of this group in ``target_language``, or None"""
+        if self.language == target_language:
+            return self
+        return self.get_translation_map().get(target_language)
+    
     def get_available_languages(self):
         """Get list of available languages for this article"""
-        languages = [self.language]
-        if self.parent_article:
-            languages.append(self.parent_article.language)
-            languages.extend([t.language for t in self.parent_article.translations.all()])
-        else:
-            languages.extend([t.language for t in self.translations.all()])
-        return list(set(languages))
+        return list(set([self.language, *self.get_translation_map()]))
     
     def get_title_for_language(self, target_language):
         """Get title in the specified language"""
-        if self.language == target_language:
-            return self._extract_clean_text(self.title)
-        translation = self.parent_article.translations.filter(language=target_language).first() if self.parent_article else self.translations.filter(language=target_language).first()
-        return self._extract_clean_text(translation.title) if translation else self._extract_clean_text(self.title)
+        translation = self.get_translation(target_language) or self
+        return translation.title
     
     def get_short_description_for_language(self, target_language):
         """Get short description in the specified language"""
-        if self.language == target_language:
-            return self._extract_clean_text(self.short_description)
-        translation = self.parent_article.translations.filter(language=target_language).first() if self.parent_article else self.translations.filter(language=target_language).first()
-        return self._extract_clean_text(translation.short_description) if translation else self._extract_clean_text(self.short_description)
+        translation = self.get_translation(target_language) or self
+        return translation.short_description
     
     def get_brief_description_for_language(self, target_language):
         """Get brief description in the specified language"""
-        if self.language == target_language:
-            return self._extract_clean_text(self.brief_description)
-        translation = self.parent_article.translations.filter(language=target_language).first() if self.parent_article else self.translations.filter(language=target_language).first()
-        return self._extract_clean_text(translation.brief_description) if translation else self._extract_clean_text(self.brief_description)
+        translation = self.get_translation(target_language) or self
+        return translation.brief_description
     
     def has_translation(self, target_language):
         """Check if translation exists for the specified language"""
-        if self.language == target_language:
-            return True
-        if self.parent_article:
-            return self.parent_article.translations.filter(language=target_language).exists()
-        return self.translations.filter(language=target_language).exists()
+        return self.get_translation(target_language) is not None
     
     def create_translation(self, target_language, translated_content, user=None):
         """Create a translation of this article"""
@@ -191,66 +250,51 @@ class Article(models.Model):
     
     def validate_category_assignment(self):
         """Validate that article has exactly one main category and one subcategory"""
+        from ..categories.tree import get_category_tree
+
         errors = []
-        if not hasattr(self, 'category_id') or not self.category_id:
+        tree = get_category_tree()
+        ids = [self.category_id, self.subcategory_id]
+        if any(pk and tree.get(pk) is None for pk in ids):
+            # Created by another process since the tree was loaded
+            tree = get_category_tree(refresh=True)
+        category, subcategory = (tree.get(pk) if pk else None for pk in ids)
+        if not self.category_id:
             errors.append("Article must have a main category")
-        else:
-            try:
-                if self.category.type != 'Main':
-                    errors.append("Main category must be of type 'Main'")
-            except:
-                pass
-        if hasattr(self, 'subcategory_id') and self.subcategory_id:
-            try:
-                if self.subcategory.type != 'Sub':
-                    errors.append("Subcategory must be of type 'Sub'")
-                if hasattr(self, 'category_id') and self.category_id and self.subcategory.parent_category_id != self.category_id:
-                    errors.append("Subcategory must belong to the selected main category")
-            except:
-                pass
+        elif category is not None and category.type != 'Main':
+            errors.append("Main category must be of type 'Main'")
+        if subcategory is not None:
+            if subcategory.type != 'Sub':
+                errors.append("Subcategory must be of type 'Sub'")
+            if self.category_id and subcategory.parent_id != self.category_id:
+                errors.append("Subcategory must belong to the selected main category")
         return errors
     
-    def upload_to_google_drive(self, file_content, filename, mime_type=None):
+    def upload_to_google_drive(self, filename=None, mime_type=None):
         """
-        Upload file to Google Drive and update article fields
+        Queue the attachment for upload to Google Drive
+        
+        The Drive sync worker uploads the stored file in the background and
+        fills in the google_drive_* fields once it is on Drive.
         
         Args:
-            file_content: File content as bytes
-            filename: Name of the file
+            filename: Name of the file on Drive (the attachment's name by default)
             mime_type: MIME type of the file
             
         Returns:
-            Dict containing upload result
+            Dict containing the queued sync job
         """
         try:
-            from ..utils.google_drive_service import google_drive_service
-            
-            # Upload to Google Drive
-            result = google_drive_service.upload_file(
-                file_content=file_content,
-                filename=filename,
-                mime_type=mime_type
-            )
+            if not self.attachment:
+                return {'error': 'No attachment to upload'}
             
-            if result.get('success'):
-                # Update article fields with Google Drive information
-                self.google_drive_file_id = result.get('file_id')
-                self.google_drive_filename = result.get('filename')
-                self.google_drive_web_view_link = result.get('web_view_link')
-                self.google_drive_web_content_link = result.get('web_content_link')
-                self.google_drive_file_size = result.get('size')
-                self.save(update_fields=[
-                    'google_drive_file_id',
-                    'google_drive_filename', 
-                    'google_drive_web_view_link',
-                    'google_drive_web_content_link',
-                    'google_drive_file_size'
-                ])
+            from .drive_sync import enqueue_drive_upload
             
-            return result
+            job = enqueue_drive_upload(self, self.attachment.name, filename, mime_type)
+            return {'success': True, 'queued': True, 'job_id': job.pk, 'status': job.status}
             
         except Exception as e:
-            return {'error': f'Failed to upload to Google Drive: {str(e)}'}
+            return {'error': f'Failed to queue Google Drive upload: {str(e)}'}
     
     def delete_from_google_drive(self):
         """
@@ -309,12 +353,211 @@ class Article(models.Model):
         return bool(self.google_drive_file_id)
     
     def save(self, *args, **kwargs):
-        """Override save to validate category assignment"""
+        """Override save to validate category assignment and store only clean, anchored text"""
+        # Read paths never parse content, so no raw AI response envelope may be stored
+        for name in self.CONTENT_FIELDS:
+            setattr(self, name, clean_ai_json(getattr(self, name)))
+        # Heading anchors, the table of contents and responsive images are built here, never on render
+        update_fields = kwargs.get('update_fields')
+        embedded = ' '.join(
+            getattr(self, name) or '' for name in self.EMBEDDING_FIELDS
+            if update_fields is None or name in update_fields
+        )
+        pending_images = ()
+        if update_fields is None or 'brief_description' in update_fields:
+            self.brief_description, self.toc = build_toc(ImageAsset.apply_to_html(self.brief_description))
+            pending_images = set(ImageAsset.local_paths(self.brief_description).values())
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'toc'}
         if hasattr(self, 'category_id') and self.category_id:
             errors = self.validate_category_assignment()
             if errors:
                 raise ValueError(f"Category validation failed: {'; '.join(errors)}")
         super().save(*args, **kwargs)
+        # Editor drops are kept only once an article embeds them
+        Blob.pin_embedded(embedded)
+        if pending_images:
+            # Images whose variants are still being built; the task rewrites this article when they are ready
+            self.pending_images.add(*ImageAsset.objects.filter(source__in=pending_images, status=ImageAsset.STATUS_PENDING))
+
+
+class TranslationJob(models.Model):
+    """Background translation of an article into one target language.
+    
+    There is at most one job per (article, target language); enqueueing a
+    translation again reuses the row, so repeated saves never pile up work.
+    """
+    
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+    
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='translation_jobs', verbose_name='Source Article')
+    target_language = models.CharField(max_length=20, choices=Article.LANGUAGE_CHOICES, verbose_name='Target Language')
+    task_id = models.CharField(max_length=255, unique=True, verbose_name='Task ID')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Status')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='Progress')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Attempts')
+    error_message = models.TextField(blank=True, null=True, verbose_name='Error Message')
+    translation = models.ForeignKey(
+        Article,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Translation'
+    )
+    requested_at = models.DateTimeField(verbose_name='Requested At')
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name='Started At')
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name='Finished At')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    
+    class Meta:
+        unique_together = ['article', 'target_language']
+        ordering = ['-requested_at']
+    
+    def __str__(self):
+        return f"{self.article_id} -> {self.target_language} ({self.status})"
+    
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+    
+    def set_progress(self, progress):
+        """Persist progress without touching the other columns"""
+        self.progress = progress
+        TranslationJob.objects.filter(pk=self.pk).update(progress=progress)
+    
+    def as_status(self):
+        """Celery-style status payload for the task status API"""
+        celery_states = {
+            self.STATUS_PENDING: 'RETRY' if self.attempts else 'PENDING',
+            self.STATUS_RUNNING: 'STARTED',
+            self.STATUS_SUCCEEDED: 'SUCCESS',
+            self.STATUS_FAILED: 'FAILURE',
+        }
+        return {
+            'task_id': self.task_id,
+            'status': celery_states[self.status],
+            'progress': self.progress,
+            'attempts': self.attempts,
+            'article_id': self.article_id,
+            'target_language': self.target_language,
+            'translation_id': self.translation_id,
+            'error': self.error_message,
+            'result': 'Translation completed' if self.status == self.STATUS_SUCCEEDED else None,
+        }
+
+
+class SegmentTranslation(models.Model):
+    """Translation of one block of an article, keyed by a hash of its source text.
+    
+    When an article is edited only the blocks whose hash is not stored yet are
+    sent to the AI service; the rest are reused from here.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='segment_translations', verbose_name='Source Article')
+    target_language = models.CharField(max_length=20, choices=Article.LANGUAGE_CHOICES, verbose_name='Target Language')
+    source_hash = models.CharField(max_length=64, verbose_name='Source Hash')
+    translated_text = models.TextField(verbose_name='Translated Text')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    
+    class Meta:
+        unique_together = ['article', 'target_language', 'source_hash']
+    
+    def __str__(self):
+        return f"{self.article_id} -> {self.target_language} [{self.source_hash[:8]}]"
+
+
+class Checkpoint(models.Model):
+    """Resume position of a long-running batch process, keyed by its name.
+    
+    ``position`` is the last primary key (or other watermark) that was fully
+    processed; ``stats`` holds running totals reported by the process.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name='Name')
+    position = models.BigIntegerField(default=0, verbose_name='Position')
+    stats = models.JSONField(default=dict, blank=True, verbose_name='Stats')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+
+class ArticleViewEvent(models.Model):
+    """One view of an article, appended by the view counter and never updated.
+    
+    Category, department and language are copied when the event is stored so
+    rollups group by what was true when the article was read.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='view_events', verbose_name='Article')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Category')
+    department = models.ForeignKey('departments.Department', on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Department')
+    language = models.CharField(max_length=20, choices=Article.LANGUAGE_CHOICES, verbose_name='Language')
+    viewed_at = models.DateTimeField(db_index=True, verbose_name='Viewed At')
+    
+    def __str__(self):
+        return f"{self.article_id} @ {self.viewed_at}"
+
+
+class ArticleViewRollup(models.Model):
+    """Number of views per hour or day, article, category, department and language"""
+    PERIOD_HOUR = 'hour'
+    PERIOD_DAY = 'day'
+    PERIOD_CHOICES = [
+        (PERIOD_HOUR, 'Hour'),
+        (PERIOD_DAY, 'Day'),
+    ]
+    
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, verbose_name='Period')
+    bucket = models.DateTimeField(verbose_name='Bucket Start')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='view_rollups', verbose_name='Article')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Category')
+    department = models.ForeignKey('departments.Department', on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Department')
+    language = models.CharField(max_length=20, choices=Article.LANGUAGE_CHOICES, verbose_name='Language')
+    views = models.PositiveIntegerField(default=0, verbose_name='Views')
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'article', 'category', 'department', 'language'],
+                nulls_distinct=False,
+                name='unique_article_view_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'bucket']),
+            models.Index(fields=['period', 'department', 'bucket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.article_id} {self.period} {self.bucket}: {self.views}"
+
+
+class ArticleStatusChange(models.Model):
+    """A status transition of an article, recorded on save and never updated.
+    
+    ``from_status`` is empty for the creation of the article. Category and
+    language are copied like for view events; the department is the author's.
+    """
+    article = models.ForeignKey(Article, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_changes', verbose_name='Article')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Category')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Author')
+    language = models.CharField(max_length=20, choices=Article.LANGUAGE_CHOICES, verbose_name='Language')
+    from_status = models.CharField(max_length=20, blank=True, default='', verbose_name='From Status')
+    to_status = models.CharField(max_length=20, verbose_name='To Status')
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Changed At')
+    
+    def __str__(self):
+        return f"{self.article_id}: {self.from_status or '-'} -> {self.to_status} @ {self.changed_at}"
 
 
 class ArticleVersion(models.Model):
@@ -346,6 +589,166 @@ class ArticleImage(models.Model):
         return f"Image for {self.article.title}"
 
 
+class Blob(models.Model):
+    """Stored file content, shared by every upload with the same SHA-256.
+    
+    ``ref_count`` is the number of records pointing at the blob: PDFFiles and
+    video upload sessions. The file is deleted with the last reference unless
+    the blob is ``pinned``: media embedded in article HTML is not owned by a
+    record, so it is pinned when an article embedding it is saved and never
+    deleted. Editor drops no article embedded are swept later. Work
+    derived from the content, such as the extracted pages, is stored once and
+    reused by every reference.
+    """
+    EXTRACTION_NONE = ''
+    EXTRACTION_PENDING = 'pending'
+    EXTRACTION_PROCESSING = 'processing'
+    EXTRACTION_READY = 'ready'
+    EXTRACTION_FAILED = 'failed'
+    EXTRACTION_CHOICES = [
+        (EXTRACTION_NONE, 'Not Requested'),
+        (EXTRACTION_PENDING, 'Pending'),
+        (EXTRACTION_PROCESSING, 'Processing'),
+        (EXTRACTION_READY, 'Ready'),
+        (EXTRACTION_FAILED, 'Failed'),
+    ]
+    
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    size = models.BigIntegerField(verbose_name='Size')
+    path = models.CharField(max_length=255, verbose_name='Storage Path')
+    content_type = models.CharField(max_length=100, blank=True, default='', verbose_name='Content Type')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='References')
+    pinned = models.BooleanField(default=False, verbose_name='Pinned')
+    page_count = models.PositiveIntegerField(null=True, blank=True, verbose_name='Page Count')
+    extraction_status = models.CharField(max_length=20, choices=EXTRACTION_CHOICES, blank=True, default=EXTRACTION_NONE, verbose_name='Extraction Status')
+    pages_extracted = models.PositiveIntegerField(default=0, verbose_name='Pages Extracted')
+    extraction_error = models.TextField(null=True, blank=True, verbose_name='Extraction Error')
+    # Last sign of life of a pending or running extraction
+    extraction_updated_at = models.DateTimeField(null=True, blank=True, verbose_name='Extraction Updated At')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+    
+    @property
+    def url(self):
+        return default_storage.url(self.path)
+    
+    @classmethod
+    def pin_embedded(cls, body):
+        """Pin every blob whose storage path appears in ``body``"""
+        paths = set(BLOB_PATH_RE.findall(body or ''))
+        if paths:
+            cls.objects.filter(path__in=paths, pinned=False).update(pinned=True)
+    
+    def full_text(self):
+        """Extracted text of every page, joined"""
+        return ''.join(text + '\n' for text in self.pages.values_list('text', flat=True) if text)
+
+
+class PDFPage(models.Model):
+    """Text of one page of a PDF blob, stored as the extraction workers return it.
+    
+    Pages belong to the blob, so every PDFFile with the same content shares
+    them. Readers fetch page ranges instead of the whole document.
+    """
+    blob = models.ForeignKey(Blob, on_delete=models.CASCADE, related_name='pages', verbose_name='Blob')
+    number = models.PositiveIntegerField(verbose_name='Page Number')
+    text = models.TextField(blank=True, default='', verbose_name='Text')
+    char_count = models.PositiveIntegerField(default=0, verbose_name='Characters')
+    # SHA-256 of the text
+    checksum = models.CharField(max_length=64, verbose_name='Checksum')
+    
+    class Meta:
+        ordering = ['blob', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['blob', 'number'], name='unique_pdf_page_number'),
+        ]
+        verbose_name = 'PDF Page'
+        verbose_name_plural = 'PDF Pages'
+    
+    def __str__(self):
+        return f"{self.blob_id} p.{self.number}"
+    
+    @classmethod
+    def build(cls, blob_id, number, text):
+        return cls(
+            blob_id=blob_id, number=number, text=text, char_count=len(text),
+            checksum=hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        )
+
+
+class ImageAsset(models.Model):
+    """Responsive variants of an uploaded image, keyed by its storage path.
+    
+    Created when an image is uploaded and filled in by the
+    ``generate_image_variants`` task.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    source = models.CharField(max_length=255, unique=True, verbose_name='Source Path')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Status')
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name='Width')
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name='Height')
+    placeholder = models.TextField(blank=True, default='', verbose_name='Placeholder')
+    # [{'width', 'format', 'path'}]
+    variants = models.JSONField(default=list, blank=True, verbose_name='Variants')
+    error_message = models.TextField(null=True, blank=True, verbose_name='Error Message')
+    # Articles saved while the variants were pending; rewritten once they are ready
+    articles = models.ManyToManyField(Article, blank=True, related_name='pending_images', verbose_name='Articles')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+    
+    @property
+    def url(self):
+        return default_storage.url(self.source)
+    
+    @staticmethod
+    def local_paths(body):
+        """Storage path of every stored image in ``body`` that has no srcset yet, by its ``src``"""
+        prefix = default_storage.base_url
+        return {
+            src: unquote(src[len(prefix):].lstrip('/')) for src in img_sources(body)
+            if prefix and src.startswith(prefix)
+        }
+    
+    @classmethod
+    def apply_to_html(cls, body):
+        """Turn the images of ``body`` that have ready variants into responsive pictures"""
+        paths = cls.local_paths(body)
+        if not paths:
+            return body
+        assets = {asset.source: asset for asset in cls.objects.filter(source__in=set(paths.values()), status=cls.STATUS_READY)}
+        return apply_srcset(body, {src: assets[path] for src, path in paths.items() if path in assets})
+
+
+class PDFFileQuerySet(models.QuerySet):
+    def with_text(self):
+        """Also load the legacy ``extracted_text`` column, which is deferred by default"""
+        return self.defer(None)
+
+
+class PDFFileManager(models.Manager.from_queryset(PDFFileQuerySet)):
+    """Leaves the full extracted text out of every query unless asked for.
+    
+    ``extracted_text`` is only set on files extracted before pages were
+    stored as PDFPages; nothing writes it anymore.
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().defer('extracted_text')
+
+
 class PDFFile(models.Model):
     """Model to store PDF files with extracted text"""
     
@@ -366,6 +769,7 @@ class PDFFile(models.Model):
     google_drive_file_size = models.BigIntegerField(blank=True, null=True, verbose_name='Google Drive File Size')
     
     # PDF-specific fields
+    # Legacy: text is stored per page on the blob; see PDFFileManager
     extracted_text = models.TextField(blank=True, null=True, verbose_name='Extracted Text')
     page_count = models.PositiveIntegerField(blank=True, null=True, verbose_name='Page Count')
     
@@ -374,6 +778,9 @@ class PDFFile(models.Model):
     upload_date = models.DateTimeField(auto_now_add=True, verbose_name='Upload Date')
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Created By')
     error_message = models.TextField(blank=True, null=True, verbose_name='Error Message')
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='pdf_files', verbose_name='Blob')
+    
+    objects = PDFFileManager()
     
     class Meta:
         ordering = ['-upload_date']
@@ -384,97 +791,65 @@ class PDFFile(models.Model):
         return f"{self.original_filename}"
     
     def extract_text_from_pdf(self, file_content):
-        """Extract text from PDF content"""
+        """Extract the pages of PDF content (bytes or a seekable binary file) into the blob's PDFPages"""
         try:
-            from PyPDF2 import PdfReader
-            import io
-            
-            # Create a BytesIO object from the PDF content
-            pdf_buffer = io.BytesIO(file_content)
-            pdf_reader = PdfReader(pdf_buffer)
+            from ..utils.pdf_extraction import extract_pdf_pages
             
-            # Extract text from all pages
-            text_content = []
-            self.page_count = len(pdf_reader.pages)
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():  # Only add non-empty pages
-                        text_content.append(page_text)
-                except Exception as e:
-                    print(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                    continue
-            
-            self.extracted_text = '\n\n'.join(text_content)
-            self.status = 'ready'
-            self.save()
+            if not self.blob_id:
+                raise ValueError('No stored file to extract the text into')
+            # Parsed in limited worker processes, never in this one
+            pages = extract_pdf_pages(file_content)
+            with transaction.atomic():
+                PDFPage.objects.filter(blob_id=self.blob_id).delete()
+                PDFPage.objects.bulk_create(
+                    PDFPage.build(self.blob_id, number, text) for number, text in enumerate(pages, 1)
+                )
+                Blob.objects.filter(pk=self.blob_id).update(
+                    page_count=len(pages), pages_extracted=len(pages), extraction_status=Blob.EXTRACTION_READY,
+                    extraction_error=None, extraction_updated_at=timezone.now(),
+                )
+                self.page_count = len(pages)
+                self.status = 'ready'
+                self.save(update_fields=['page_count', 'status'])
             
             return {
                 'success': True,
-                'text': self.extracted_text,
                 'page_count': self.page_count
             }
             
         except Exception as e:
             self.status = 'error'
             self.error_message = str(e)
-            self.save()
+            self.save(update_fields=['status', 'error_message'])
             
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def upload_to_google_drive(self, file_content, filename=None):
-        """Upload PDF to Google Drive and update metadata"""
+    def full_text(self):
+        """Extracted text, built from the stored pages or, for older files, read from the legacy column"""
+        if self.blob_id and PDFPage.objects.filter(blob_id=self.blob_id).exists():
+            return self.blob.full_text()
+        return PDFFile.objects.with_text().values_list('extracted_text', flat=True).get(pk=self.pk) or ''
+    
+    def upload_to_google_drive(self, filename=None):
+        """Queue the stored PDF for upload to Google Drive; the worker fills in the Drive metadata"""
         try:
-            from ..utils.google_drive_service import google_drive_service
-            
-            # Use original filename if not provided
-            if not filename:
-                filename = self.original_filename
+            if not self.blob_id:
+                return {'success': False, 'error': 'No stored file to upload'}
             
-            # Upload to Google Drive
-            result = google_drive_service.upload_file(
-                file_content=file_content,
-                filename=filename,
-                mime_type='application/pdf'
-            )
+            from .drive_sync import enqueue_drive_upload
             
-            if result.get('success'):
-                # Update Google Drive fields
-                self.google_drive_file_id = result.get('file_id')
-                self.google_drive_filename = result.get('filename')
-                self.google_drive_web_view_link = result.get('web_view_link')
-                self.google_drive_web_content_link = result.get('web_content_link')
-                self.google_drive_file_size = result.get('size')
-                self.status = 'processing'
-                self.save()
-                
-                # Extract text after successful upload
-                text_result = self.extract_text_from_pdf(file_content)
-                
-                return {
-                    'success': True,
-                    'file_id': result.get('file_id'),
-                    'text_result': text_result
-                }
-            else:
-                self.status = 'error'
-                self.error_message = result.get('error')
-                self.save()
-                
-                return {
-                    'success': False,
-                    'error': result.get('error')
-                }
+            job = enqueue_drive_upload(self, self.blob.path, filename or self.original_filename, 'application/pdf')
+            return {
+                'success': True,
+                'queued': True,
+                'job_id': job.pk,
+                'status': job.status,
+            }
                 
         except Exception as e:
-            self.status = 'error'
-            self.error_message = str(e)
-            self.save()
-            
             return {
                 'success': False,
                 'error': str(e)
@@ -514,3 +889,182 @@ class PDFFile(models.Model):
             return f"{size / (1024 * 1024):.1f} MB"
         else:
             return f"{size / (1024 * 1024 * 1024):.1f} GB"
+
+
+class FileCatalogEntry(models.Model):
+    """A stored file, as last seen by the file catalog reconciler.
+    
+    Local entries are keyed by their media path, Drive entries by the Drive
+    file id. The file manager pages and totals are read from this table
+    instead of scanning directories or summing in Python.
+    """
+    SOURCE_LOCAL = 'local'
+    SOURCE_DRIVE = 'drive'
+    SOURCE_CHOICES = [
+        (SOURCE_LOCAL, 'Local Media'),
+        (SOURCE_DRIVE, 'Google Drive'),
+    ]
+    
+    KIND_PDF = 'pdf'
+    KIND_ATTACHMENT = 'attachment'
+    KIND_IMAGE = 'image'
+    KIND_VIDEO = 'video'
+    KIND_OTHER = 'other'
+    KIND_CHOICES = [
+        (KIND_PDF, 'PDF'),
+        (KIND_ATTACHMENT, 'Article Attachment'),
+        (KIND_IMAGE, 'Image'),
+        (KIND_VIDEO, 'Video'),
+        (KIND_OTHER, 'Other'),
+    ]
+    
+    STATUS_PRESENT = 'present'
+    STATUS_MISSING = 'missing'
+    STATUS_CHOICES = [
+        (STATUS_PRESENT, 'Present'),
+        (STATUS_MISSING, 'Missing'),
+    ]
+    
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, verbose_name='Source')
+    key = models.CharField(max_length=255, verbose_name='Path or Drive File ID')
+    name = models.CharField(max_length=255, verbose_name='Name')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_OTHER, verbose_name='Kind')
+    size = models.BigIntegerField(default=0, verbose_name='Size')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PRESENT, verbose_name='Status')
+    modified_at = models.DateTimeField(null=True, blank=True, verbose_name='Modified At')
+    last_seen_at = models.DateTimeField(verbose_name='Last Seen At')
+    pdf_file = models.ForeignKey(PDFFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='catalog_entries', verbose_name='PDF File')
+    article = models.ForeignKey(Article, on_delete=models.SET_NULL, null=True, blank=True, related_name='catalog_entries', verbose_name='Article')
+    
+    class Meta:
+        ordering = ['-modified_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'key'], name='unique_catalog_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'kind']),
+        ]
+        verbose_name = 'File Catalog Entry'
+        verbose_name_plural = 'File Catalog'
+    
+    def __str__(self):
+        return f"{self.source}:{self.key}"
+
+
+class UploadSession(models.Model):
+    """A resumable upload: chunks are PUT to disk one byte range at a time.
+    
+    ``offset`` is the number of bytes received so far, so a client that lost
+    its connection asks for it and continues from there. Finalizing queues
+    the assembly of the chunks into the blob store.
+    """
+    KIND_PDF = 'pdf'
+    KIND_VIDEO = 'video'
+    KIND_CHOICES = [
+        (KIND_PDF, 'PDF'),
+        (KIND_VIDEO, 'Video'),
+    ]
+    
+    STATUS_OPEN = 'open'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', verbose_name='User')
+    filename = models.CharField(max_length=255, verbose_name='Filename')
+    content_type = models.CharField(max_length=100, blank=True, default='', verbose_name='Content Type')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='Kind')
+    size = models.BigIntegerField(verbose_name='Size')
+    offset = models.BigIntegerField(default=0, verbose_name='Bytes Received')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN, verbose_name='Status')
+    blob = models.ForeignKey(Blob, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions', verbose_name='Blob')
+    pdf_file = models.ForeignKey(PDFFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions', verbose_name='PDF File')
+    error_message = models.TextField(null=True, blank=True, verbose_name='Error Message')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    expires_at = models.DateTimeField(verbose_name='Expires At')
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class DriveSyncJob(models.Model):
+    """Pending upload of an article attachment or a PDF to Google Drive.
+    
+    There is at most one job per article and per PDF; the worker uploads the
+    stored file in resumable chunks, records the bytes Drive has received and
+    retries failed attempts with backoff, resuming the same Drive session.
+    """
+    
+    STATUS_PENDING = 'pending'
+    STATUS_UPLOADING = 'uploading'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_UPLOADING)
+    
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, null=True, blank=True, related_name='drive_sync_jobs', verbose_name='Article')
+    pdf_file = models.ForeignKey(PDFFile, on_delete=models.CASCADE, null=True, blank=True, related_name='drive_sync_jobs', verbose_name='PDF File')
+    path = models.CharField(max_length=500, verbose_name='Storage Path')
+    filename = models.CharField(max_length=255, verbose_name='Filename')
+    mime_type = models.CharField(max_length=100, blank=True, default='', verbose_name='MIME Type')
+    size = models.BigIntegerField(default=0, verbose_name='Size')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Status')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Attempts')
+    bytes_uploaded = models.BigIntegerField(default=0, verbose_name='Bytes Uploaded')
+    session_uri = models.TextField(blank=True, default='', verbose_name='Drive Upload Session')
+    error_message = models.TextField(blank=True, null=True, verbose_name='Error Message')
+    next_attempt_at = models.DateTimeField(verbose_name='Next Attempt At')
+    requested_at = models.DateTimeField(verbose_name='Requested At')
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name='Started At')
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name='Finished At')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    
+    class Meta:
+        ordering = ['-requested_at']
+        constraints = [
+            models.UniqueConstraint(fields=['article'], condition=models.Q(article__isnull=False), name='unique_drive_sync_article'),
+            models.UniqueConstraint(fields=['pdf_file'], condition=models.Q(pdf_file__isnull=False), name='unique_drive_sync_pdf_file'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+        verbose_name = 'Drive Sync Job'
+        verbose_name_plural = 'Drive Sync Jobs'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status}, {self.bytes_uploaded}/{self.size})"
+    
+    @property
+    def target(self):
+        return self.article if self.article_id else self.pdf_file
+    
+    @property
+    def progress(self):
+        return round(100 * self.bytes_uploaded / self.size) if self.size else 0
+    
+    def set_progress(self, bytes_uploaded):
+        """Persist the bytes Drive has received without touching the other columns"""
+        self.bytes_uploaded = bytes_uploaded
+        DriveSyncJob.objects.filter(pk=self.pk).update(bytes_uploaded=bytes_uploaded, updated_at=timezone.now())
@@ -0,0 +1,210 @@
+"""
+Resumable uploads.
+
+A client creates an ``UploadSession`` with the file's name and size, then PUTs
+the bytes in order, one ``Content-Range`` chunk per request. Each chunk is
+streamed from the request straight into its own part file under
+``uploads/sessions/<id>/``, and ``offset`` only moves once the whole chunk is
+on disk, so after a dropped connection the client asks for the offset and
+resends from there. Finalizing queues ``assemble_upload_task``: the parts are
+concatenated in the kernel, hashed and moved into the blob store, and PDFs
+get a PDFFile and their text extraction. The hourly cleanup queues the
+assembly again for sessions whose worker died.
+"""
+
+import os
+import re
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..utils.uploads import CHUNK_SIZE, StoredUpload, append_file, file_sha256
+from .blobs import adopt_stored, queue_blob_extraction
+from .models import PDFFile, UploadSession
+
+SESSIONS_DIR = 'uploads/sessions'
+ASSEMBLED_NAME = 'assembled'
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+# Well past the assembly task's time limit
+ASSEMBLY_STALE_AFTER = timedelta(minutes=30)
+
+
+class UploadConflict(Exception):
+    """The chunk does not start at the session's offset, or the session is not open"""
+
+    def __init__(self, session):
+        super().__init__(f"Upload {session.pk} expects byte {session.offset} ({session.status})")
+        self.session = session
+
+
+def session_dir(session, storage=default_storage):
+    return storage.path(f"{SESSIONS_DIR}/{session.pk}")
+
+
+def upload_kind(content_type, filename):
+    if content_type == 'application/pdf' or filename.lower().endswith('.pdf'):
+        return UploadSession.KIND_PDF
+    if content_type.startswith('video/'):
+        return UploadSession.KIND_VIDEO
+    return None
+
+
+def create_session(user, filename, size, content_type=''):
+    """Open an upload session; raises ValueError for unsupported or oversized files"""
+    kind = upload_kind(content_type or '', filename or '')
+    if not filename or kind is None:
+        raise ValueError("Only PDF and video files can be uploaded")
+    if size <= 0 or size > settings.RESUMABLE_UPLOAD_MAX_SIZE:
+        raise ValueError(f"Size must be between 1 and {settings.RESUMABLE_UPLOAD_MAX_SIZE} bytes")
+    session = UploadSession.objects.create(
+        user=user, filename=os.path.basename(filename), content_type=content_type or '', kind=kind, size=size,
+        expires_at=timezone.now() + timedelta(seconds=settings.RESUMABLE_UPLOAD_EXPIRY),
+    )
+    os.makedirs(session_dir(session), exist_ok=True)
+    return session
+
+
+def parse_content_range(header):
+    """``(start, end, total)`` of a ``Content-Range: bytes start-end/total`` header, end inclusive"""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise ValueError("Content-Range must be 'bytes <start>-<end>/<total>'")
+    start, end, total = map(int, match.groups())
+    if end < start:
+        raise ValueError("Content-Range end is before its start")
+    return start, end, total
+
+
+def write_chunk(session_id, start, end, total, stream):
+    """
+    Stream bytes ``start``..``end`` of an upload from ``stream`` into a part file.
+
+    No transaction is open while the body is read, so a slow client holds
+    neither a connection nor a row lock. The part is written to a file of its
+    own and only becomes the chunk at ``start`` if the offset is still
+    ``start`` when it is complete; a concurrent copy of the chunk that lost
+    the race gets ``UploadConflict``. Returns the updated session; raises
+    ``UploadConflict`` if the chunk is not the next one and ValueError if it
+    does not fit the upload or arrives incomplete.
+    """
+    length = end - start + 1
+    session = UploadSession.objects.get(pk=session_id)
+    if session.status != UploadSession.STATUS_OPEN or start != session.offset:
+        raise UploadConflict(session)
+    if total != session.size or end >= session.size:
+        raise ValueError(f"Chunk {start}-{end}/{total} does not fit an upload of {session.size} bytes")
+    if length > settings.RESUMABLE_UPLOAD_MAX_CHUNK:
+        raise ValueError(f"Chunks are limited to {settings.RESUMABLE_UPLOAD_MAX_CHUNK} bytes")
+
+    part = os.path.join(session_dir(session), f"{start:020d}.part")
+    partial = f"{part}.{uuid.uuid4().hex}.tmp"
+    written = 0
+    try:
+        with open(partial, 'wb') as out:
+            while written < length:
+                data = stream.read(min(CHUNK_SIZE, length - written))
+                if not data:
+                    break
+                out.write(data)
+                written += len(data)
+        if written != length:
+            raise ValueError(f"Received {written} of {length} bytes")
+
+        with transaction.atomic():
+            claimed = UploadSession.objects.filter(
+                pk=session.pk, status=UploadSession.STATUS_OPEN, offset=start,
+            ).update(offset=end + 1, updated_at=timezone.now())
+            if claimed:
+                # Rolled back with the offset if the part cannot be moved into place
+                os.replace(partial, part)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    session.refresh_from_db()
+    if not claimed:
+        raise UploadConflict(session)
+    return session
+
+
+def finalize_session(session):
+    """Queue the assembly of a fully received upload; raises UploadConflict otherwise"""
+    from .tasks import assemble_upload_task
+
+    claimed = UploadSession.objects.filter(
+        pk=session.pk, status=UploadSession.STATUS_OPEN, offset=session.size,
+    ).update(status=UploadSession.STATUS_PROCESSING, updated_at=timezone.now())
+    session.refresh_from_db()
+    if not claimed:
+        raise UploadConflict(session)
+    transaction.on_commit(lambda: assemble_upload_task.delay(str(session.pk)))
+    return session
+
+
+def assemble_session(session, storage=default_storage):
+    """Concatenate the parts of an upload, store the result as a blob and start its processing"""
+    directory = session_dir(session, storage)
+    assembled = os.path.join(directory, ASSEMBLED_NAME)
+    parts = sorted(name for name in os.listdir(directory) if name.endswith('.part'))
+    with open(assembled, 'wb') as target:
+        for name in parts:
+            with open(os.path.join(directory, name), 'rb') as source:
+                append_file(source, target)
+    size = os.path.getsize(assembled)
+    if size != session.size:
+        raise ValueError(f"Assembled {size} bytes, expected {session.size}")
+    with open(assembled, 'rb') as handle:
+        sha256 = file_sha256(handle)
+
+    stored = StoredUpload(
+        path=f"{SESSIONS_DIR}/{session.pk}/{ASSEMBLED_NAME}", size=size, sha256=sha256,
+        name=session.filename, content_type=session.content_type,
+    )
+    with transaction.atomic():
+        blob, _ = adopt_stored(stored, storage)
+        session.blob = blob
+        if session.kind == UploadSession.KIND_PDF:
+            ready = queue_blob_extraction(blob) == blob.EXTRACTION_READY
+            session.pdf_file = PDFFile.objects.create(
+                original_filename=session.filename, created_by=session.user, blob=blob,
+                status='ready' if ready else 'processing', page_count=blob.page_count if ready else None,
+                google_drive_file_size=blob.size,
+            )
+        session.status = UploadSession.STATUS_COMPLETE
+        session.save(update_fields=['blob', 'pdf_file', 'status', 'updated_at'])
+    shutil.rmtree(directory, ignore_errors=True)
+    return session
+
+
+def expire_sessions(storage=default_storage):
+    """
+    Delete unfinished sessions past their expiry, with their parts.
+
+    A session stuck in processing (its assembly worker died) counts as
+    unfinished once it has not moved for ASSEMBLY_STALE_AFTER: it is queued
+    for assembly again, or deleted if it has expired. Returns the number of
+    sessions deleted.
+    """
+    from .tasks import assemble_upload_task
+
+    now = timezone.now()
+    stale = Q(status=UploadSession.STATUS_PROCESSING, updated_at__lt=now - ASSEMBLY_STALE_AFTER)
+    for session_id in UploadSession.objects.filter(stale, expires_at__gte=now).values_list('pk', flat=True):
+        UploadSession.objects.filter(pk=session_id).update(updated_at=now)
+        assemble_upload_task.delay(str(session_id))
+
+    expired = UploadSession.objects.filter(
+        Q(status__in=[UploadSession.STATUS_OPEN, UploadSession.STATUS_FAILED]) | stale, expires_at__lt=now,
+    )
+    count = 0
+    for session in expired.iterator():
+        shutil.rmtree(session_dir(session, storage), ignore_errors=True)
+        session.delete()
+        count += 1
+    return count
@@ -1,30 +1,40 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
-from .models import Article
+from .blobs import release_blob
+from .catalog import catalog_article_files, catalog_pdf_file
+from .images import register_image
+from .models import Article, ArticleImage, ArticleStatusChange, PDFFile, UploadSession
 from ..notifications.models import Notification
+from ..categories.tree import invalidate_category_tree
+from ..utils.response_cache import purge_tags
 
 
-@receiver(pre_save, sender=Article)
-def track_previous_status(sender, instance, **kwargs):
-    if instance.pk: 
-        try:
-            previous_instance = Article.objects.get(pk=instance.pk)
-            instance._previous_status = previous_instance.status  
-        except Article.DoesNotExist:
-            instance._previous_status = None 
+@receiver(post_save, sender=Article)
+def article_status_update(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'status' not in update_fields):
+        return
+    # The snapshot taken when the article was loaded holds the previous status
+    if instance.has_changed('status') and instance.status in ['approved', 'rejected']:
+        message = f"Your article '{instance.title}' has been {instance.status}."
+        # Only create notification if user exists
+        if instance.user_id:
+            Notification.objects.create(user_id=instance.user_id, article=instance, message=message)
 
 
 @receiver(post_save, sender=Article)
-def article_status_update(sender, instance, created, **kwargs):
-    if not created:  
-        previous_status = getattr(instance, '_previous_status', None) 
-        if previous_status != instance.status:  
-            if instance.status in ['approved', 'rejected']:
-                message = f"Your article '{instance.title}' has been {instance.status}."
-                # Only create notification if user exists
-                if instance.user:
-                    Notification.objects.create(user=instance.user, article=instance, message=message)
+def record_status_change(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the history the daily metrics are rolled up from"""
+    if not created and (update_fields is not None and 'status' not in update_fields or not instance.has_changed('status')):
+        return
+    ArticleStatusChange.objects.create(
+        article=instance,
+        category_id=instance.category_id,
+        user_id=instance.user_id,
+        language=instance.language,
+        from_status='' if created else instance.previous('status') or '',
+        to_status=instance.status,
+    )
 
 
 @receiver(post_save, sender=Article)
@@ -59,3 +69,56 @@ def create_automatic_translation(sender, instance, created, **kwargs):
             import traceback
             traceback.print_exc()
             # Continue even if translation fails
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def purge_article_pages(sender, instance, **kwargs):
+    """Drop cached pages that show this article or its translation group"""
+    purge_tags(
+        f"article:{instance.pk}",
+        f"article:{instance.parent_article_id}" if instance.parent_article_id else None,
+        "articles",
+    )
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def refresh_category_counts(sender, instance, signal, created=False, **kwargs):
+    """The category tree caches approved article counts per category"""
+    if signal is post_delete or created or instance.has_changed('status') or instance.has_changed('category'):
+        invalidate_category_tree()
+
+
+@receiver(post_save, sender=ArticleImage)
+def queue_article_image_variants(sender, instance, created, **kwargs):
+    if created and instance.image:
+        register_image(instance.image.name)
+
+
+@receiver(post_delete, sender=PDFFile)
+def release_pdf_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        release_blob(instance.blob_id)
+
+
+@receiver(post_delete, sender=UploadSession)
+def release_upload_blob(sender, instance, **kwargs):
+    # The reference of an uploaded PDF belongs to its PDFFile
+    if instance.blob_id and instance.kind == UploadSession.KIND_VIDEO:
+        release_blob(instance.blob_id)
+
+
+@receiver(post_save, sender=PDFFile)
+def catalog_pdf_upload(sender, instance, **kwargs):
+    """Show new uploads in the file manager before the next catalog reconcile"""
+    if instance.blob_id or instance.google_drive_file_id:
+        catalog_pdf_file(instance)
+
+
+@receiver(post_save, sender=Article)
+def catalog_article_attachment(sender, instance, created, update_fields=None, **kwargs):
+    if not (instance.attachment or instance.google_drive_file_id):
+        return
+    if created or update_fields is None or {'attachment', 'google_drive_file_id'} & set(update_fields):
+        catalog_article_files(instance)
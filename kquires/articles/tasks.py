@@ -0,0 +1,222 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TranslationJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True, soft_time_limit=240, time_limit=300)
+def translate_article_task(self, job_id):
+    """Translate the article of a TranslationJob and record the outcome on the job"""
+    from .ai_services import ai_service
+    from .translation import dispatch_translation_job, sync_translation
+
+    try:
+        job = TranslationJob.objects.select_related('article').get(pk=job_id)
+    except TranslationJob.DoesNotExist:
+        return None
+
+    started_at = timezone.now()
+    job.status = TranslationJob.STATUS_RUNNING
+    job.attempts += 1
+    job.progress = 10
+    job.started_at = started_at
+    job.error_message = None
+    job.save(update_fields=['status', 'attempts', 'progress', 'started_at', 'error_message', 'updated_at'])
+
+    try:
+        translation = sync_translation(job.article, job.target_language, progress=job.set_progress)
+    except Exception as exc:
+        job.error_message = str(exc)
+        if self.request.retries < self.max_retries:
+            job.status = TranslationJob.STATUS_PENDING
+            job.save(update_fields=['status', 'error_message', 'updated_at'])
+            # Back off for at least as long as the circuit breaker stays open
+            countdown = max(ai_service.breaker.recovery_timeout, 30 * 2 ** self.request.retries)
+            raise self.retry(exc=exc, countdown=countdown)
+        job.status = TranslationJob.STATUS_FAILED
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+        logger.error("Translation job %s failed after %s attempts: %s", job.pk, job.attempts, exc)
+        return None
+
+    job.refresh_from_db(fields=['requested_at'])
+    job.translation = translation
+    job.progress = 100
+    job.finished_at = timezone.now()
+    job.status = TranslationJob.STATUS_SUCCEEDED
+    job.save(update_fields=['translation', 'progress', 'finished_at', 'status', 'updated_at'])
+
+    if job.requested_at > started_at:
+        # The article changed while we were translating it
+        job.status = TranslationJob.STATUS_PENDING
+        job.progress = 0
+        job.attempts = 0
+        job.save(update_fields=['status', 'progress', 'attempts', 'updated_at'])
+        dispatch_translation_job(job)
+
+    return translation.pk
+
+
+@shared_task()
+def requeue_stale_translation_jobs(minutes=10):
+    """Re-dispatch translation jobs that were never picked up or whose worker died"""
+    from .translation import dispatch_translation_job
+
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    stale = TranslationJob.objects.filter(
+        status__in=TranslationJob.ACTIVE_STATUSES,
+        updated_at__lt=cutoff,
+    )
+    count = 0
+    for job in stale:
+        job.status = TranslationJob.STATUS_PENDING
+        job.save(update_fields=['status', 'updated_at'])
+        dispatch_translation_job(job)
+        count += 1
+    return count
+
+
+@shared_task(acks_late=True)
+def backfill_translations_task(batch_size=50, concurrency=4):
+    """Translate one backfill batch, then queue the next one until nothing is missing"""
+    from .translation import backfill_translations
+
+    stats = backfill_translations(batch_size=batch_size, concurrency=concurrency, max_batches=1)
+    logger.info(
+        "Translation backfill batch: %s translated, %s failed in %ss",
+        stats['translated'], stats['failed'], stats['elapsed'],
+    )
+    if not stats['done']:
+        backfill_translations_task.delay(batch_size=batch_size, concurrency=concurrency)
+    return stats
+
+
+@shared_task()
+def flush_article_view_counts():
+    """Apply the view counts buffered in Redis to Article.click_count"""
+    from .counters import flush_view_counts
+
+    return flush_view_counts()
+
+
+@shared_task()
+def process_article_view_events():
+    """Drain buffered view events and add them to the hourly and daily rollups"""
+    from .analytics import drain_view_events, prune_view_events, rollup_view_events
+
+    drained = drain_view_events()
+    rolled_up = rollup_view_events()
+    pruned = prune_view_events()
+    return {'drained': drained, 'rolled_up': rolled_up, 'pruned': pruned}
+
+
+@shared_task(acks_late=True, soft_time_limit=120, time_limit=180)
+def generate_image_variants(asset_id):
+    """Build the responsive variants of an uploaded image"""
+    from .images import process_image_asset
+    from .models import ImageAsset
+
+    try:
+        asset = ImageAsset.objects.get(pk=asset_id)
+    except ImageAsset.DoesNotExist:
+        return None
+    return process_image_asset(asset).status
+
+
+@shared_task(
+    acks_late=True,
+    soft_time_limit=settings.PDF_EXTRACTION_TIMEOUT + 30,
+    time_limit=settings.PDF_EXTRACTION_TIMEOUT + 60,
+)
+def extract_pdf_text_task(blob_id):
+    """Extract the text of an uploaded PDF in limited worker processes"""
+    from ..utils.pdf_extraction import PDFExtractionError
+    from .blobs import extract_blob_pages
+    from .models import Blob
+
+    try:
+        blob = Blob.objects.get(pk=blob_id)
+    except Blob.DoesNotExist:
+        return None
+    try:
+        extract_blob_pages(blob)
+    except PDFExtractionError as exc:
+        logger.warning("Could not extract the text of blob %s: %s", blob.sha256, exc)
+    except Exception:
+        # Recorded on the blob as a failed extraction
+        logger.exception("Text extraction of blob %s failed", blob.sha256)
+    return blob.extraction_status
+
+
+@shared_task()
+def requeue_stale_pdf_extractions():
+    """Queue again PDF extractions whose worker was killed"""
+    from .blobs import requeue_stale_extractions
+
+    return requeue_stale_extractions()
+
+
+@shared_task()
+def delete_unclaimed_blobs_task():
+    """Delete media dropped into the editor that no saved article embeds"""
+    from .blobs import delete_unclaimed_blobs
+
+    return delete_unclaimed_blobs()
+
+
+@shared_task()
+def reconcile_file_catalog_task():
+    """Sync the file catalog with local media and the recorded Google Drive files"""
+    from .catalog import reconcile_file_catalog
+
+    return reconcile_file_catalog()
+
+
+@shared_task(acks_late=True, soft_time_limit=600, time_limit=660)
+def assemble_upload_task(session_id):
+    """Assemble a finalized resumable upload and hand it to the blob store"""
+    from .models import UploadSession
+    from .resumable import assemble_session
+
+    try:
+        session = UploadSession.objects.get(pk=session_id, status=UploadSession.STATUS_PROCESSING)
+    except UploadSession.DoesNotExist:
+        return None
+    try:
+        assemble_session(session)
+    except Exception as exc:
+        logger.error("Could not assemble upload %s: %s", session_id, exc)
+        session.status = UploadSession.STATUS_FAILED
+        session.error_message = str(exc)
+        session.save(update_fields=['status', 'error_message', 'updated_at'])
+    return session.status
+
+
+@shared_task()
+def expire_upload_sessions():
+    """Remove resumable uploads that were abandoned before they were finalized"""
+    from .resumable import expire_sessions
+
+    return expire_sessions()
+
+
+@shared_task(acks_late=True, soft_time_limit=1800, time_limit=1860)
+def sync_drive_file_task(job_id):
+    """Upload the file of a DriveSyncJob to Google Drive, one attempt"""
+    from .drive_sync import run_drive_job
+
+    return run_drive_job(job_id)
+
+
+@shared_task()
+def requeue_drive_sync_jobs():
+    """Re-dispatch Drive uploads that are due but were never picked up or whose worker died"""
+    from .drive_sync import requeue_drive_jobs
+
+    return requeue_drive_jobs()
@@ -0,0 +1,26 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..images import cached_asset
+from ...utils.images import picture_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, default='', sizes=None, **attrs):
+    """
+    ``<picture>`` for an ImageField file using its cached variants, or a plain
+    ``<img>`` while they are not built yet. ``default`` is used without a file.
+    """
+    attrs = {name.replace('_', '-'): str(value) for name, value in attrs.items()}
+    attrs['src'] = image.url if image else default
+    asset = cached_asset(image.name) if image else None
+    if asset is not None:
+        if sizes:
+            attrs['sizes'] = sizes
+        return mark_safe(picture_html(attrs, asset))
+    return mark_safe('<img %s>' % ' '.join(
+        f'{name}="{escape(value)}"' for name, value in attrs.items()
+    ))
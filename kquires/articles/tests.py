@@ -1,9 +1,72 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from PIL import Image
+from PyPDF2 import PdfWriter
+from redis.exceptions import ResponseError
+
+from django.apps import apps
+from django.contrib import messages
 from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.test import Client
-from .models import Article
+from django.utils import timezone, translation
+
+from .ai_services import ai_service
+from .analytics import drain_view_events, rollup_view_events, view_totals
+from .blobs import UNCLAIMED_BLOB_TTL, delete_unclaimed_blobs, requeue_stale_extractions, store_blob
+from .catalog import reconcile_drive_files, reconcile_local_files
+from .counters import FLUSHING_KEY, FLUSH_LOCK_KEY, flush_view_counts, record_view
+from .drive_sync import backoff_delay, enqueue_drive_upload, run_drive_job
+from .images import process_image_asset
+from .models import (
+    Article, ArticleViewEvent, ArticleViewRollup, Blob, Checkpoint, DriveSyncJob, FileCatalogEntry, ImageAsset,
+    PDFFile, PDFPage, TranslationJob, UploadSession,
+)
+from .resumable import UploadConflict, expire_sessions, session_dir, write_chunk
+from .translation import (
+    BACKFILL_CHECKPOINT, backfill_translations, enqueue_translation, get_translated_fields, missing_translations,
+)
 from ..categories.models import Category
+from ..categories.tree import get_category_tree
+from ..departments.models import Department
+from ..notifications.models import Notification
+from ..utils.google_drive_service import DriveUploadClient
+from ..utils.html_headings import build_toc
+from ..utils.images import build_variants
+from ..utils.html_segments import (
+    chunk_segments, estimate_tokens, join_segments, mask_tags, split_segments, split_sentences, unmask_tags,
+)
+from ..utils.language_detection import detect_language
+from ..utils.pdf_extraction import (
+    ExtractionLimits, ExtractionTimeout, PDFExtractionError, extract_pdf_pages, split_pages,
+)
+from ..utils.rate_limiter import RateLimiter
+from ..utils.response_cache import CSRF_PLACEHOLDER, cache_response, response_cache_key
+from ..utils.translation_service import detect_languages
+from ..utils.uploads import UploadTooLarge, append_file, open_stored, store_upload
 
 User = get_user_model()
 
@@ -94,3 +157,1542 @@ class ArticleAutomaticTranslationTestCase(TestCase):
         main_article = Article.objects.filter(title='Simple Test Article').first()
         self.assertIsNotNone(main_article)
 
+
+
+def _completion(content):
+    """Build a minimal OpenAI chat completion response"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def pdf_bytes(pages=1, title=None):
+    """A PDF of blank pages; a title makes its content, and so its blob, unique"""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    if title:
+        writer.add_metadata({'/Title': title})
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def pdf_upload(name='manual.pdf', pages=1, title=None):
+    return SimpleUploadedFile(name, pdf_bytes(pages, title), content_type='application/pdf')
+
+
+class AIServiceMixin:
+    """Start every test with an empty cache and a mocked OpenAI client on the AI service"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client_mock = mock.MagicMock()
+        self.patch_ai_service('client', self.client_mock)
+
+    def patch_ai_service(self, attribute, new=mock.DEFAULT, **kwargs):
+        """Patch an attribute of the AI service for the duration of the test"""
+        patcher = mock.patch.object(ai_service, attribute, new, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+
+class BatchedTranslationTestCase(AIServiceMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ai_service = ai_service
+
+    def test_all_fields_are_translated_in_one_request(self):
+        self.client_mock.chat.completions.create.return_value = _completion(json.dumps({
+            'title': 'عنوان',
+            'short_description': 'وصف قصير',
+            'brief_description': '<p>نص</p>',
+        }))
+
+        result = self.ai_service.translate_fields(
+            {'title': 'Title', 'short_description': 'Short', 'brief_description': '<p>Body</p>'},
+            'english',
+            'arabic',
+        )
+
+        self.assertEqual(self.client_mock.chat.completions.create.call_count, 1)
+        kwargs = self.client_mock.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs['response_format'], {'type': 'json_object'})
+        self.assertEqual(result['translated_fields']['brief_description'], '<p>نص</p>')
+
+    def test_empty_fields_are_not_sent(self):
+        self.client_mock.chat.completions.create.return_value = _completion(json.dumps({'title': 'عنوان'}))
+
+        result = self.ai_service.translate_fields(
+            {'title': 'Title', 'short_description': '', 'brief_description': None},
+            'english',
+            'arabic',
+        )
+
+        sent = json.loads(self.client_mock.chat.completions.create.call_args.kwargs['messages'][1]['content'])
+        self.assertEqual(sent, {'title': 'Title'})
+        self.assertEqual(result['translated_fields']['short_description'], '')
+
+    def test_missing_field_in_response_is_an_error(self):
+        self.client_mock.chat.completions.create.return_value = _completion('{"title": "عنوان"}')
+
+        result = self.ai_service.translate_fields(
+            {'title': 'Title', 'short_description': 'Short'},
+            'english',
+            'arabic',
+        )
+
+        self.assertIn('error', result)
+
+    def test_circuit_breaker_stops_calls_after_repeated_failures(self):
+        self.client_mock.chat.completions.create.side_effect = RuntimeError('timeout')
+
+        for _ in range(self.ai_service.breaker.failure_threshold):
+            self.ai_service.translate_fields({'title': 'Title'}, 'english', 'arabic')
+
+        self.assertFalse(self.ai_service.is_available())
+        calls = self.client_mock.chat.completions.create.call_count
+        result = self.ai_service.translate_fields({'title': 'Title'}, 'english', 'arabic')
+        self.assertIn('error', result)
+        self.assertEqual(self.client_mock.chat.completions.create.call_count, calls)
+
+    def test_circuit_breaker_resets_only_after_failures(self):
+        breaker = self.ai_service.breaker
+        with mock.patch.object(cache, 'delete_many', wraps=cache.delete_many) as delete_many:
+            breaker.record_success()
+            delete_many.assert_not_called()
+
+            breaker.record_failure()
+            breaker.record_success()
+            delete_many.assert_called_once()
+        self.assertEqual(breaker.failures, 0)
+
+
+class TranslationJobTestCase(AIServiceMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='writer@example.com', password='testpass123')
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.article = Article.objects.create(
+            title='Hello',
+            short_description='Short',
+            brief_description='<p>Body</p>',
+            category=self.category,
+            user=self.user,
+            language='english',
+        )
+        arabic = {'Hello': 'مرحبا', 'Short': 'قصير', 'Body': 'نص'}
+
+        def create(**kwargs):
+            fields = json.loads(kwargs['messages'][1]['content'])
+            return _completion(json.dumps({key: arabic[text] for key, text in fields.items()}))
+
+        self.client_mock.chat.completions.create.side_effect = create
+
+    def test_job_runs_after_commit_and_creates_translation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue_translation(self.article, 'arabic')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.translation.parent_article, self.article)
+        self.assertEqual(job.translation.title, 'مرحبا')
+
+    def test_jobs_are_deduplicated_per_article_and_language(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            first = enqueue_translation(self.article, 'arabic')
+            second = enqueue_translation(self.article, 'arabic')
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(TranslationJob.objects.count(), 1)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_task_status_reports_job_state(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue_translation(self.article, 'arabic')
+
+        job.refresh_from_db()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('articles:get_task_status', args=[job.task_id]))
+
+        data = response.json()
+        self.assertEqual(data['status'], 'SUCCESS')
+        self.assertEqual(data['progress'], 100)
+        self.assertEqual(data['translation_id'], job.translation_id)
+
+    def test_translate_view_links_the_task_status(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.client.post(
+                reverse('articles:translate_article', args=[self.article.pk]),
+                json.dumps({'target_language': 'arabic'}), content_type='application/json',
+            )
+
+        self.assertEqual(response.status_code, 202)
+        job = TranslationJob.objects.get()
+        self.assertEqual(response.json()['status_url'], reverse('articles:get_task_status', args=[job.task_id]))
+
+    def test_translate_view_rejects_unknown_and_own_languages(self):
+        self.client.force_login(self.user)
+        for language in ('klingon', 'english'):
+            response = self.client.post(
+                reverse('articles:translate_article', args=[self.article.pk]),
+                json.dumps({'target_language': language}), content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(TranslationJob.objects.exists())
+
+
+class SegmentTranslationTestCase(AIServiceMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.article = Article.objects.create(
+            title='Guide',
+            short_description='Short',
+            brief_description='<h2>Intro</h2><p>First <b>step</b>.</p><ul><li>One</li><li>Two</li></ul>',
+            category=self.category,
+            language='english',
+        )
+        self.sent = []
+
+        def translate_fields(fields, source_lang, target_lang, technical_terms=None):
+            self.sent.append(dict(fields))
+            return {'translated_fields': {key: f'AR({text})' for key, text in fields.items()}}
+
+        self.patch_ai_service('translate_fields', side_effect=translate_fields)
+
+    def test_html_segments_round_trip(self):
+        html = '<p>Hello <a href="/x">world</a></p>\n<table><tr><td>Cell</td><td>&nbsp;</td></tr></table>'
+        parts = split_segments(html)
+
+        self.assertEqual(join_segments(parts), html)
+        self.assertEqual(
+            [part.text for part in parts if part.translatable],
+            ['Hello <a href="/x">world</a>', 'Cell'],
+        )
+
+    def test_only_changed_segments_are_sent(self):
+        first = get_translated_fields(self.article, 'english', 'arabic')
+        self.assertEqual(
+            first['brief_description'],
+            '<h2 id="heading-intro">AR(Intro)</h2><p>AR(First <b>step</b>.)</p><ul><li>AR(One)</li><li>AR(Two)</li></ul>',
+        )
+
+        self.article.brief_description = '<h2>Intro</h2><p>First <b>step</b>.</p><ul><li>One</li><li>Three</li></ul>'
+        second = get_translated_fields(self.article, 'english', 'arabic')
+
+        self.assertEqual(list(self.sent[-1].values()), ['Three'])
+        self.assertEqual(second['title'], 'AR(Guide)')
+        self.assertIn('<li>AR(Three)</li>', second['brief_description'])
+
+    def test_unchanged_article_needs_no_ai_call(self):
+        get_translated_fields(self.article, 'english', 'arabic')
+        get_translated_fields(self.article, 'english', 'arabic')
+
+        self.assertEqual(len(self.sent), 1)
+
+
+class ChunkedTranslationTestCase(TestCase):
+    def test_mask_tags_round_trip(self):
+        masked, tags = mask_tags('Click <a href="/x">here</a> now')
+
+        self.assertEqual(masked, 'Click ⟦0⟧here⟦1⟧ now')
+        self.assertEqual(unmask_tags('انقر ⟦0⟧هنا⟦1⟧ الآن', tags), 'انقر <a href="/x">هنا</a> الآن')
+        with self.assertRaises(ValueError):
+            unmask_tags('انقر هنا ⟦1⟧', tags)
+
+    def test_chunks_respect_token_budget(self):
+        segments = {f's{index}': 'word ' * 20 for index in range(10)}
+        chunks = chunk_segments(segments, 100)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([key for chunk in chunks for key in chunk], list(segments))
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(text) for text in chunk.values()), 100)
+
+        text = 'One sentence here.\n' * 15 + 'Another one!  ' * 15
+        pieces = split_sentences(text.strip(), 40)
+        self.assertGreater(len(pieces), 1)
+        self.assertTrue(all(estimate_tokens(piece) <= 40 for piece in pieces))
+        # The separators between sentences are kept
+        self.assertEqual(''.join(pieces), text.strip())
+
+    def test_long_segments_are_translated_in_parallel_chunks(self):
+        calls = []
+
+        def translate_fields(fields, source_lang, target_lang, technical_terms=None):
+            calls.append(dict(fields))
+            return {'translated_fields': {key: text.upper() for key, text in fields.items()}}
+
+        long_text = 'First <b>bold</b> sentence.\n' * 40
+        segments = {'s0': long_text.strip(), 's1': 'Short <i>one</i>'}
+        with mock.patch.object(ai_service, 'chunk_tokens', 100), \
+                mock.patch.object(ai_service, 'translate_fields', side_effect=translate_fields):
+            result = ai_service.translate_segments(segments, 'english', 'arabic')
+
+        self.assertGreater(len(calls), 2)
+        self.assertNotIn('<b>', ''.join(text for call in calls for text in call.values()))
+        self.assertEqual(result['translated_fields']['s0'], long_text.strip().replace('First', 'FIRST')
+                         .replace('bold', 'BOLD').replace('sentence', 'SENTENCE'))
+        self.assertEqual(result['translated_fields']['s1'], 'SHORT <i>ONE</i>')
+
+
+class TranslationBackfillTestCase(AIServiceMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.first = Article.objects.create(title='First', category=self.category, language='english')
+        self.done = Article.objects.create(title='Done', category=self.category, language='english')
+        Article.objects.create(title='تم', category=self.category, language='arabic', parent_article=self.done)
+        self.second = Article.objects.create(title='ثاني', category=self.category, language='arabic')
+
+        def translate_segments(segments, source_lang, target_lang, technical_terms=None, progress=None):
+            return {'translated_fields': {key: f'T({text})' for key, text in segments.items()}}
+
+        self.patch_ai_service('translate_segments', side_effect=translate_segments)
+
+    def test_missing_translations_uses_keyset_order(self):
+        self.assertEqual(missing_translations(), [self.first, self.second])
+        self.assertEqual(missing_translations(after_id=self.first.pk), [self.second])
+
+    def test_backfill_resumes_from_checkpoint(self):
+        out = StringIO()
+        call_command('backfill_translations', batch_size=1, concurrency=1, max_batches=1, stdout=out)
+
+        self.assertIn('paused', out.getvalue())
+        self.assertEqual(Checkpoint.objects.get(name=BACKFILL_CHECKPOINT).position, self.first.pk)
+        self.assertEqual(self.first.translations.get().title, 'T(First)')
+        self.assertFalse(self.second.translations.exists())
+
+        call_command('backfill_translations', batch_size=1, concurrency=1, stdout=out)
+
+        self.assertIn('Backfill complete', out.getvalue())
+        self.assertEqual(self.second.translations.get().language, 'english')
+        self.assertEqual(Checkpoint.objects.get(name=BACKFILL_CHECKPOINT).stats['translated'], 2)
+
+    def test_failed_articles_are_retried_after_the_scan(self):
+        outcomes = {self.first.pk: [False, True], self.second.pk: [False, False, True]}
+
+        def backfill_article(article):
+            return outcomes[article.pk].pop(0)
+
+        with mock.patch('kquires.articles.translation._backfill_article', side_effect=backfill_article):
+            stats = backfill_translations(batch_size=1, concurrency=1)
+            checkpoint = Checkpoint.objects.get(name=BACKFILL_CHECKPOINT)
+            # The retry pass ran once; the article failing again waits for the next run
+            self.assertEqual((stats['done'], stats['translated'], stats['failed']), (True, 1, 3))
+            self.assertEqual(checkpoint.stats['failed_ids'], [self.second.pk])
+
+            stats = backfill_translations(batch_size=1, concurrency=1)
+        self.assertEqual((stats['done'], stats['translated'], stats['failed']), (True, 1, 0))
+        self.assertEqual(Checkpoint.objects.get(name=BACKFILL_CHECKPOINT).stats['failed_ids'], [])
+
+    def test_rate_limiter_blocks_after_limit(self):
+        limiter = RateLimiter('test', limit=2, period=60)
+
+        self.assertTrue(limiter.acquire(timeout=0))
+        self.assertTrue(limiter.acquire(timeout=0))
+        self.assertFalse(limiter.acquire(timeout=0))
+
+
+class LanguageDetectionTestCase(TestCase):
+    def test_detects_script_and_ignores_markup(self):
+        self.assertEqual(detect_language('How to reset your password'), 'english')
+        self.assertEqual(detect_language('كيفية إعادة تعيين كلمة المرور'), 'arabic')
+        self.assertEqual(detect_language('<p class="intro">تثبيت البرنامج على الخادم</p>'), 'arabic')
+        self.assertEqual(detect_language('123 !!'), 'english')
+        self.assertEqual(detect_language('', default='unknown'), 'unknown')
+
+    def test_mixed_text_uses_trigrams(self):
+        self.assertEqual(detect_language('Install Docker and Kubernetes على الخادم for the team'), 'english')
+        self.assertEqual(detect_language('شرح إعداد Docker في الخادم من خلال API'), 'arabic')
+
+    def test_batch_detection_and_ai_service_never_call_the_api(self):
+        self.assertEqual(detect_languages(['Hello there', 'مرحبا بكم']), ['english', 'arabic'])
+        with mock.patch.object(ai_service, '_chat') as chat:
+            self.assertEqual(ai_service.detect_language('?!'), 'unknown')
+            self.assertEqual(ai_service.detect_language('Deterministic detection'), 'english')
+        chat.assert_not_called()
+
+
+class TranslationMapTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.articles = []
+        for index in range(5):
+            article = Article.objects.create(
+                title=f'Title {index}',
+                short_description=f'Short {index}',
+                category=self.category,
+                language='english',
+            )
+            Article.objects.create(
+                title=f'عنوان {index}',
+                short_description=f'وصف {index}',
+                category=self.category,
+                language='arabic',
+                parent_article=article,
+            )
+            self.articles.append(article)
+
+    def test_page_of_articles_resolves_in_two_queries(self):
+        template = Template(
+            '{% load article_filters %}{% for article in articles %}'
+            '{{ article|get_title_for_language:"arabic" }}|{{ article|get_short_description_for_language:"arabic" }}|'
+            '{{ article|get_brief_description_for_language:"arabic" }};{% endfor %}'
+        )
+        with self.assertNumQueries(2):
+            articles = Article.objects.filter(parent_article__isnull=True).with_translations().order_by('pk')[:5]
+            rendered = template.render(Context({'articles': articles}))
+
+        self.assertIn('عنوان 0|وصف 0', rendered)
+        self.assertIn('عنوان 4|وصف 4', rendered)
+
+    def test_translation_resolves_from_either_side_of_the_group(self):
+        translation = self.articles[0].translations.get()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(translation.get_title_for_language('english'), 'Title 0')
+            self.assertEqual(translation.get_title_for_language('arabic'), 'عنوان 0')
+            self.assertEqual(sorted(translation.get_available_languages()), ['arabic', 'english'])
+        self.assertFalse(Article.objects.create(title='Solo', category=self.category).has_translation('arabic'))
+
+
+class CleanContentTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+
+    def test_raw_ai_json_is_unwrapped_on_save(self):
+        article = Article.objects.create(
+            title='{"translated_text": "دليل", "source_language": "english"}',
+            short_description='{"original_text": "Guide"}',
+            brief_description='<p>{not json}</p>',
+            category=self.category,
+        )
+        article.refresh_from_db()
+
+        self.assertEqual(article.title, 'دليل')
+        self.assertEqual(article.short_description, 'Guide')
+        self.assertEqual(article.brief_description, '<p>{not json}</p>')
+
+    def test_migration_cleans_existing_rows(self):
+        article = Article.objects.create(title='Guide', category=self.category)
+        Article.objects.filter(pk=article.pk).update(short_description='{"translated_text": "Clean"}')
+
+        migration = importlib.import_module('kquires.articles.migrations.0014_clean_ai_json_content')
+        migration.clean_article_content(apps, None)
+
+        article.refresh_from_db()
+        self.assertEqual(article.short_description, 'Clean')
+
+    def test_translate_content_uses_structured_response(self):
+        client = mock.MagicMock()
+        client.chat.completions.create.return_value = _completion('{"text": "مرحبا"}')
+        with mock.patch.object(ai_service, 'client', client):
+            result = ai_service.translate_content('Hello', 'english', 'arabic')
+
+        self.assertEqual(result['translated_text'], 'مرحبا')
+        kwargs = client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs['response_format'], {'type': 'json_object'})
+
+
+class FakeRedis:
+    """The few hash commands used by the view counter, kept in memory"""
+
+    def __init__(self):
+        self.data = {}
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[str(field).encode()] = fields.get(str(field).encode(), 0) + amount
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, source, target):
+        if source not in self.data:
+            raise ResponseError('no such key')
+        self.data[target] = self.data.pop(source)
+
+    def hgetall(self, key):
+        return {field: str(value).encode() for field, value in self.data.get(key, {}).items()}
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def lock(self, name, timeout=None, blocking=True):
+        redis = self
+
+        class Lock:
+            def acquire(self):
+                return bool(redis.set(name, 'locked', nx=True))
+
+            def release(self):
+                redis.delete(name)
+
+        return Lock()
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        stream = self.data.setdefault(key, [])
+        entry_id = f'{len(stream)}-0'.encode()
+        stream.append((entry_id, {name.encode(): str(value).encode() for name, value in fields.items()}))
+
+    def xrange(self, key, min='-', max='+', count=None):
+        return self.data.get(key, [])[:count]
+
+    def xdel(self, key, *entry_ids):
+        self.data[key] = [entry for entry in self.data.get(key, []) if entry[0] not in entry_ids]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+
+class ViewCounterTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.first = Article.objects.create(title='First', category=self.category, click_count=5)
+        self.second = Article.objects.create(title='Second', category=self.category)
+
+    def test_views_are_buffered_and_flushed_in_batches(self):
+        redis = FakeRedis()
+        with mock.patch('kquires.articles.counters.get_redis', return_value=redis):
+            for _ in range(3):
+                record_view(self.first.pk)
+            record_view(self.second.pk)
+            self.first.refresh_from_db()
+            self.assertEqual(self.first.click_count, 5)
+
+            # One UPDATE per distinct increment, next to the batch checkpoint
+            # (created by this first flush)
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(11):
+                    self.assertEqual(flush_view_counts(), 4)
+            self.assertEqual(flush_view_counts(), 0)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.click_count, 8)
+        self.assertEqual(self.second.click_count, 1)
+
+    def test_flushes_do_not_overlap_or_count_a_batch_twice(self):
+        redis = FakeRedis()
+        with mock.patch('kquires.articles.counters.get_redis', return_value=redis):
+            record_view(self.first.pk)
+            redis.set(FLUSH_LOCK_KEY, 'other worker')
+            self.assertEqual(flush_view_counts(), 0)
+            redis.delete(FLUSH_LOCK_KEY)
+
+            # The counts commit but the process dies before the batch is deleted
+            with self.captureOnCommitCallbacks(execute=False):
+                self.assertEqual(flush_view_counts(), 1)
+            self.assertTrue(redis.exists(FLUSHING_KEY))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(flush_view_counts(), 0)
+            self.assertFalse(redis.exists(FLUSHING_KEY))
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.click_count, 6)
+
+    def test_without_redis_views_are_applied_atomically(self):
+        stale = Article.objects.get(pk=self.first.pk)
+        self.first.record_click()
+        stale.record_click()
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.click_count, 7)
+
+
+class ViewAnalyticsTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.article = Article.objects.create(title='Guide', category=self.category)
+        self.other = Article.objects.create(title='دليل', category=self.category, language='arabic')
+        self.sales = Department.objects.create(name='Sales')
+        self.reader = User.objects.create_user(email='reader@example.com', password='x', department=self.sales)
+
+    def _age_events(self, hours=1):
+        ArticleViewEvent.objects.update(viewed_at=timezone.now() - timedelta(hours=hours))
+
+    def test_stream_is_drained_into_events(self):
+        redis = FakeRedis()
+        with mock.patch('kquires.articles.counters.get_redis', return_value=redis), \
+                mock.patch('kquires.articles.analytics.get_redis', return_value=redis):
+            self.article.record_click(self.reader)
+            self.other.record_click()
+            self.assertEqual(drain_view_events(batch_size=1), 2)
+
+        event = ArticleViewEvent.objects.get(article=self.article)
+        self.assertEqual(event.department, self.sales)
+        self.assertEqual(event.category, self.category)
+        self.assertEqual(ArticleViewEvent.objects.get(article=self.other).language, 'arabic')
+
+    def test_rollups_are_incremental_from_the_watermark(self):
+        for _ in range(2):
+            self.article.record_click(self.reader)
+        self.other.record_click()
+        self._age_events()
+
+        self.assertEqual(rollup_view_events(), 3)
+        self.assertEqual(rollup_view_events(), 0)
+
+        self.article.record_click(self.reader)
+        self._age_events(hours=0.5)
+        self.assertEqual(rollup_view_events(), 1)
+
+        now = timezone.now()
+        week = view_totals(now - timedelta(days=7), now + timedelta(days=1), department=self.sales)
+        self.assertEqual(list(week), [{'article': self.article.pk, 'views': 3}])
+        by_language = view_totals(now - timedelta(days=7), now + timedelta(days=1), group_by=('language',))
+        self.assertEqual({row['language']: row['views'] for row in by_language}, {'english': 3, 'arabic': 1})
+        self.assertEqual(
+            ArticleViewRollup.objects.filter(period='hour').aggregate(total=Sum('views'))['total'], 4
+        )
+
+    def test_rollup_rows_without_a_department_are_updated_in_place(self):
+        self.other.record_click()
+        self._age_events()
+        self.assertEqual(rollup_view_events(), 1)
+        # A second anonymous view in the same hour adds to the existing row
+        ArticleViewEvent.objects.create(
+            article=self.other, category=self.category, language='arabic',
+            viewed_at=ArticleViewEvent.objects.get().viewed_at,
+        )
+        self.assertEqual(rollup_view_events(), 1)
+        row = ArticleViewRollup.objects.get(period='hour', article=self.other)
+        self.assertEqual((row.department, row.views), (None, 2))
+
+
+class TableOfContentsTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+
+    def test_build_toc_is_deterministic(self):
+        body = '<h1>Getting <b>started</b></h1><p>x</p><h2 style="color:red">Setup</h2><h2>Setup</h2><h3>&nbsp;</h3><h2 id="faq">FAQ</h2>'
+        anchored, toc = build_toc(body)
+
+        self.assertEqual(build_toc(body), (anchored, toc))
+        self.assertEqual(build_toc(anchored), (anchored, toc))
+        self.assertEqual(toc, [
+            {'id': 'heading-getting-started', 'text': 'Getting started', 'level': 'h1'},
+            {'id': 'heading-setup', 'text': 'Setup', 'level': 'h2'},
+            {'id': 'heading-setup-2', 'text': 'Setup', 'level': 'h2'},
+            {'id': 'faq', 'text': 'FAQ', 'level': 'h2'},
+        ])
+        self.assertIn('<h2 id="heading-setup" style="color:red">Setup</h2>', anchored)
+
+        # data-id is not the heading's id
+        anchored, toc = build_toc('<h2 data-id="block-1">Intro</h2>')
+        self.assertEqual(toc, [{'id': 'heading-intro', 'text': 'Intro', 'level': 'h2'}])
+        self.assertEqual(anchored, '<h2 id="heading-intro" data-id="block-1">Intro</h2>')
+
+    def test_toc_is_stored_on_save(self):
+        article = Article.objects.create(
+            title='Guide',
+            brief_description='<div data-bs-ride="true"><h2>مقدمة</h2><p>نص</p></div>',
+            category=self.category,
+        )
+        article.refresh_from_db()
+
+        self.assertEqual(article.toc, [{'id': 'heading-مقدمة', 'text': 'مقدمة', 'level': 'h2'}])
+        self.assertEqual(article.brief_description, '<div ><h2 id="heading-مقدمة">مقدمة</h2><p>نص</p></div>')
+
+        article.brief_description += '<h2>Next</h2>'
+        article.save(update_fields=['brief_description'])
+        article.refresh_from_db()
+        self.assertEqual([heading['text'] for heading in article.toc], ['مقدمة', 'Next'])
+
+
+class ArticleDetailApiTestCase(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.article = Article.objects.create(title='Guide', category=self.category, language='english')
+        self.translation = Article.objects.create(
+            title='دليل',
+            category=self.category,
+            language='arabic',
+            parent_article=self.article,
+            translation_status='translated',
+        )
+        self.url = reverse('articles:article_detail_api', args=[self.translation.pk])
+
+    def test_group_is_loaded_in_one_query(self):
+        # One SELECT inside the ATOMIC_REQUESTS savepoint
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'language': 'arabic'})
+
+        data = response.json()
+        self.assertEqual(data['title'], 'دليل')
+        self.assertEqual(data['main_id'], self.article.pk)
+        self.assertEqual(data['category_id'], self.category.pk)
+        self.assertTrue(data['has_arabic'])
+        self.assertFalse(data['has_english'])
+
+    def test_repeat_requests_get_not_modified(self):
+        response = self.client.get(self.url, {'language': 'arabic'})
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        cached = self.client.get(self.url, {'language': 'arabic'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        other_language = self.client.get(self.url, {'language': 'english'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(other_language.status_code, 200)
+        self.assertEqual(other_language.json()['title'], 'Guide')
+
+        self.translation.title = 'دليل محدث'
+        self.translation.save()
+        changed = self.client.get(self.url, {'language': 'arabic'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+
+    def test_not_modified_is_answered_before_queueing_a_translation(self):
+        untranslated = Article.objects.create(title='Policy', category=self.category, language='english')
+        url = reverse('articles:article_detail_api', args=[untranslated.pk])
+        with mock.patch('kquires.articles.views.enqueue_translation', return_value=None) as enqueue:
+            response = self.client.get(url, {'language': 'arabic'})
+            self.assertEqual(enqueue.call_count, 1)
+            cached = self.client.get(url, {'language': 'arabic'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(enqueue.call_count, 1)
+
+    def test_unknown_article_is_not_found(self):
+        response = self.client.get(reverse('articles:article_detail_api', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.sub = Category.objects.create(
+            name='Sub', type='Sub', status='approved', parent_category=self.category
+        )
+        self.article = Article.objects.create(
+            title='Guide', brief_description='<h2>Intro</h2>', category=self.category, status='approved'
+        )
+        self.user = User.objects.create_user(email='reader@example.com', password='x', is_employee=True)
+        self.client.force_login(self.user)
+
+    def test_article_page_is_cached_and_purged_on_save(self):
+        url = reverse('articles:index', args=[self.article.pk])
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('article:%d' % self.article.pk, first['Surrogate-Key'])
+        self.assertIn('private', first['Cache-Control'])
+
+        with self.assertNumQueries(7):
+            # Savepoint, session, user and the view counter without Redis
+            # (update, article lookup, event); the page itself is not queried
+            cached = self.client.get(url)
+        # Only the masked CSRF token differs between the two responses
+        self.assertEqual(len(cached.content), len(first.content))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.click_count, 2)
+
+        self.article.title = 'Updated guide'
+        self.article.save()
+        self.assertContains(self.client.get(url), 'Updated guide')
+
+    def test_cached_page_gets_the_current_csrf_token(self):
+        url = reverse('articles:index', args=[self.article.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertNotIn(CSRF_PLACEHOLDER, response.content.decode())
+
+    def test_pages_vary_on_role_and_language(self):
+        request = RequestFactory().get('/articles/1/')
+        request.user = self.user
+        employee = response_cache_key(request)
+        request.COOKIES['language'] = 'ar'
+        arabic = response_cache_key(request)
+        self.user.is_admin = True
+        admin = response_cache_key(request)
+
+        self.assertEqual(len({employee, arabic, admin}), 3)
+
+        translation.activate('ar')
+        self.addCleanup(translation.deactivate)
+        self.assertNotEqual(response_cache_key(request), admin)
+
+    def test_pages_with_flash_messages_are_not_cached(self):
+        @cache_response(timeout=300)
+        def page(request):
+            return HttpResponse(' '.join(str(message) for message in messages.get_messages(request)))
+
+        def get(message=None):
+            request = RequestFactory().get('/messages/')
+            SessionMiddleware(lambda request: None).process_request(request)
+            request.user = self.user
+            request._messages = FallbackStorage(request)
+            if message:
+                messages.info(request, message)
+            return page(request).content.decode()
+
+        self.assertEqual(get('SECRET for alice'), 'SECRET for alice')
+        self.assertEqual(get(), '')
+        self.assertEqual(get('Saved'), 'Saved')
+
+    def test_subcategories_api_is_public_and_purged_by_category_signals(self):
+        url = reverse('categories:subcategories_api', args=[self.category.pk])
+        response = self.client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(response.json()['subcategories'], [{'id': self.sub.pk, 'name': 'Sub'}])
+
+        Category.objects.create(name='Other', type='Sub', status='approved', parent_category=self.category)
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()['subcategories']), 2)
+
+
+class ChangeTrackingTestCase(TestCase):
+    def setUp(self):
+        self.Notification = Notification
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.author = User.objects.create_user(email='author@example.com', password='x')
+        Article.objects.create(title='Guide', category=self.category, user=self.author, status='pending')
+
+    def test_snapshot_reports_previous_values(self):
+        article = Article.objects.get(title='Guide')
+        self.assertFalse(article.has_changed('status'))
+
+        article.status = 'approved'
+        article.category = None
+        self.assertTrue(article.has_changed('status'))
+        self.assertEqual(article.previous('status'), 'pending')
+        self.assertEqual(article.changed_fields(), {
+            'status': ('pending', 'approved'),
+            'category': (self.category.pk, None),
+        })
+
+    def test_status_change_notifies_without_reloading_the_article(self):
+        get_category_tree()
+        article = Article.objects.get(title='Guide')
+        article.status = 'approved'
+        with self.assertNumQueries(3):
+            # Update, status history and notification; no SELECT of the stored row or its categories
+            article.save(update_fields=['status'])
+        self.assertEqual(self.Notification.objects.filter(article=article).count(), 1)
+
+        # The saved values are the new baseline
+        self.assertFalse(article.has_changed('status'))
+        article.title = 'Renamed'
+        article.save()
+        self.assertEqual(self.Notification.objects.filter(article=article).count(), 1)
+
+    def test_deferred_fields_are_unchanged_until_assigned(self):
+        article = Article.objects.only('pk').get(title='Guide')
+        self.assertFalse(article.has_changed('status'))
+        self.assertEqual(article.status, 'pending')
+        self.assertFalse(article.has_changed('status'))
+
+        article = Article.objects.only('pk').get(title='Guide')
+        article.status = 'rejected'
+        self.assertTrue(article.has_changed('status'))
+
+    def test_category_and_user_track_changes(self):
+        category = Category.objects.get(pk=self.category.pk)
+        category.status = 'pending'
+        self.assertEqual(category.changed_fields(), {'status': ('approved', 'pending')})
+
+        user = User.objects.get(pk=self.author.pk)
+        user.is_admin = True
+        self.assertTrue(user.has_changed('is_admin'))
+        self.assertFalse(user.has_changed('email'))
+
+
+class ImageVariantsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.user = User.objects.create_user(email='writer@example.com', password='x', is_article_writer=True)
+        self.client.force_login(self.user)
+
+    def upload(self, size=(2000, 1000), mode='RGB', process=True):
+        buffer = BytesIO()
+        Image.new(mode, size, 'red').save(buffer, 'PNG')
+        upload = SimpleUploadedFile('shot.png', buffer.getvalue(), content_type='image/png')
+        with self.captureOnCommitCallbacks(execute=process):
+            response = self.client.post(reverse('articles:process_file'), {'file': upload})
+        return response.json()['image_url']
+
+    def test_upload_builds_variants_in_the_background(self):
+        url = self.upload()
+        asset = ImageAsset.objects.get()
+
+        self.assertEqual(asset.url, url)
+        self.assertEqual((asset.status, asset.width, asset.height), (ImageAsset.STATUS_READY, 2000, 1000))
+        self.assertEqual(
+            sorted({(variant['width'], variant['format']) for variant in asset.variants}),
+            [(width, fmt) for width in (320, 640, 1024, 1600) for fmt in ('jpeg', 'webp')],
+        )
+        self.assertEqual(len(asset.variants), 8)
+        self.assertTrue(asset.placeholder.startswith('data:image/webp;base64,'))
+
+    def test_small_and_transparent_images_are_not_upscaled(self):
+        self.upload(size=(200, 100), mode='RGBA')
+        asset = ImageAsset.objects.get()
+        self.assertEqual({variant['width'] for variant in asset.variants}, {200})
+
+    def test_article_html_gets_srcset(self):
+        url = self.upload()
+        article = Article.objects.create(
+            title='Guide', category=self.category, brief_description=f'<p><img src="{url}" alt="Shot"></p>'
+        )
+
+        self.assertIn('<picture><source type="image/webp" srcset="', article.brief_description)
+        self.assertIn('320w', article.brief_description)
+        self.assertIn('width="2000" height="1000"', article.brief_description)
+        # Saving again leaves the rewritten picture alone
+        article.save()
+        self.assertEqual(article.brief_description.count('<picture>'), 1)
+
+    def test_articles_saved_before_processing_are_rewritten(self):
+        url = self.upload(process=False)
+        asset = ImageAsset.objects.get()
+        self.assertEqual(asset.status, ImageAsset.STATUS_PENDING)
+        article = Article.objects.create(title='Guide', category=self.category, brief_description=f'<img src="{url}">')
+        self.assertNotIn('srcset', article.brief_description)
+
+        self.assertEqual(list(asset.articles.all()), [article])
+
+        with mock.patch.object(Article, 'save') as save, self.assertNumQueries(5):
+            process_image_asset(asset)
+        save.assert_not_called()
+        article.refresh_from_db()
+        self.assertIn('srcset', article.brief_description)
+        self.assertFalse(asset.articles.exists())
+
+    def test_variants_are_kept_when_a_rebuild_fails(self):
+        self.upload(size=(500, 250))
+        asset = ImageAsset.objects.get()
+        encode = Image.Image.save
+
+        def fail_after_two(image, *args, **kwargs):
+            if fail_after_two.calls == 2:
+                raise OSError('encoder failed')
+            fail_after_two.calls += 1
+            return encode(image, *args, **kwargs)
+
+        fail_after_two.calls = 0
+        with mock.patch.object(Image.Image, 'save', autospec=True, side_effect=fail_after_two), \
+                mock.patch.object(default_storage, 'delete') as delete, self.assertRaises(OSError):
+            build_variants(asset.source)
+        # Nothing was replaced before the encoder failed
+        delete.assert_not_called()
+        self.assertTrue(all(default_storage.exists(variant['path']) for variant in asset.variants))
+
+    def test_template_tag_uses_cached_variants(self):
+        self.upload(size=(500, 250))
+        source = ImageAsset.objects.get().source
+        self.category.logo.name = source
+        template = Template('{% load images %}{% responsive_image category.logo default="/logo.svg" width="50" %}')
+
+        with self.assertNumQueries(0):
+            rendered = template.render(Context({'category': self.category}))
+        self.assertIn('srcset=', rendered)
+        self.assertIn('sizes="(max-width: 50px) 100vw, 50px"', rendered)
+        self.assertIn('height="25"', rendered)
+        self.assertEqual(
+            template.render(Context({'category': Category(name='Empty')})),
+            '<img width="50" src="/logo.svg">',
+        )
+
+
+class StreamingUploadTestCase(TestCase):
+    def temporary_upload(self, data, name='clip.mp4', content_type='video/mp4'):
+        upload = TemporaryUploadedFile(name, content_type, len(data), None)
+        upload.write(data)
+        upload.seek(0)
+        return upload
+
+    def test_store_upload_hashes_while_streaming(self):
+        data = bytes(range(256)) * 12289  # a little over three 1 MB chunks
+        stored = store_upload(self.temporary_upload(data), 'videos')
+
+        self.assertEqual(stored.size, len(data))
+        self.assertEqual(stored.sha256, hashlib.sha256(data).hexdigest())
+        self.assertTrue(stored.path.startswith('videos/') and stored.path.endswith('_clip.mp4'))
+        with open_stored(stored.path, memory_map=True) as mapped:
+            self.assertEqual(mapped[:256], data[:256])
+            self.assertEqual(len(mapped), len(data))
+        default_storage.delete(stored.path)
+
+    def test_oversized_uploads_are_not_kept(self):
+        with self.assertRaises(UploadTooLarge):
+            store_upload(self.temporary_upload(b'x' * (3 * 1024 * 1024)), 'videos', max_size=1024 * 1024)
+        stored_files = default_storage.listdir('videos')[1] if default_storage.exists('videos') else []
+        self.assertEqual(stored_files, [])
+
+    def test_upload_pdf_extracts_from_the_stored_file(self):
+        upload = pdf_upload()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('articles:upload_pdf'), {'pdf_file': upload}).json()
+
+        self.assertTrue(response['success'])
+        pdf_record = PDFFile.objects.get()
+        self.assertEqual(pdf_record.page_count, 1)
+        self.assertEqual(pdf_record.google_drive_file_size, upload.size)
+        self.assertTrue(default_storage.exists(response['local_path']))
+
+
+class BlobStoreTestCase(TestCase):
+    def test_duplicate_pdf_uploads_share_one_blob(self):
+        url = reverse('articles:upload_pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'pdf_file': pdf_upload('manual.pdf')})
+        with mock.patch('kquires.articles.blobs.extract_pdf_pages') as extract:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, {'pdf_file': pdf_upload('copy.pdf')}).json()
+
+        extract.assert_not_called()
+        self.assertEqual(response['status'], 'ready')
+        blob = Blob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(response['page_count'], 1)
+        self.assertEqual(set(PDFFile.objects.values_list('blob', flat=True)), {blob.pk})
+        self.assertEqual(default_storage.listdir('blobs/incoming')[1], [])
+
+    def test_last_reference_deletes_the_file(self):
+        url = reverse('articles:upload_pdf')
+        self.client.post(url, {'pdf_file': pdf_upload()})
+        self.client.post(url, {'pdf_file': pdf_upload()})
+        path = Blob.objects.get().path
+
+        first, second = PDFFile.objects.all()
+        first.delete()
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(path))
+
+    def test_duplicate_images_reuse_their_variants(self):
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200), 'blue').save(buffer, 'PNG')
+        urls = []
+        for name in ('a.png', 'b.png'):
+            upload = SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                urls.append(self.client.post(reverse('articles:process_file'), {'file': upload}).json()['image_url'])
+
+        self.assertEqual(urls[0], urls[1])
+        self.assertEqual(ImageAsset.objects.get().status, ImageAsset.STATUS_READY)
+        # The second upload found ready variants and queued nothing
+        self.assertEqual(callbacks, [])
+
+    def test_editor_drops_are_pinned_only_once_an_article_embeds_them(self):
+        urls = []
+        for color in ('red', 'blue'):
+            buffer = BytesIO()
+            Image.new('RGB', (40, 20), color).save(buffer, 'PNG')
+            upload = SimpleUploadedFile(f'{color}.png', buffer.getvalue(), content_type='image/png')
+            with self.captureOnCommitCallbacks(execute=True):
+                urls.append(self.client.post(reverse('articles:process_file'), {'file': upload}).json()['image_url'])
+        self.assertEqual(list(Blob.objects.values_list('ref_count', 'pinned')), [(0, False), (0, False)])
+
+        category = Category.objects.create(name='Main', type='Main', status='approved')
+        Article.objects.create(title='Embeds', category=category, brief_description=f'<p><img src="{urls[0]}"></p>')
+        embedded, abandoned = Blob.objects.order_by('pk')
+        self.assertEqual((embedded.pinned, abandoned.pinned), (True, False))
+
+        # Only abandoned drops old enough are swept, with their variants
+        self.assertEqual(delete_unclaimed_blobs(), 0)
+        Blob.objects.update(created_at=timezone.now() - UNCLAIMED_BLOB_TTL - timedelta(minutes=1))
+        variants = [variant['path'] for variant in ImageAsset.objects.get(source=abandoned.path).variants]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(delete_unclaimed_blobs(), 1)
+        self.assertEqual(list(Blob.objects.all()), [embedded])
+        self.assertFalse(ImageAsset.objects.filter(source=abandoned.path).exists())
+        self.assertFalse(any(default_storage.exists(path) for path in [abandoned.path, *variants]))
+        self.assertTrue(default_storage.exists(embedded.path))
+
+    def test_a_record_sharing_an_editor_drop_releases_only_its_reference(self):
+        upload = pdf_upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('articles:process_file'), {'file': upload})
+        Blob.objects.update(pinned=True)
+
+        upload.seek(0)
+        self.client.post(reverse('articles:upload_pdf'), {'pdf_file': upload})
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            PDFFile.objects.get().delete()
+        blob = Blob.objects.get()
+        self.assertEqual(blob.ref_count, 0)
+        self.assertTrue(default_storage.exists(blob.path))
+
+
+class PDFExtractionTestCase(TestCase):
+    def upload(self, pages=1):
+        return pdf_upload('report.pdf', pages)
+
+    def test_upload_returns_before_extraction(self):
+        with mock.patch('kquires.articles.blobs.extract_pdf_pages') as extract:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(reverse('articles:upload_pdf'), {'pdf_file': self.upload(3)}).json()
+            extract.assert_not_called()
+
+        self.assertEqual(response['status'], 'processing')
+        self.assertEqual(PDFFile.objects.get().status, 'processing')
+        self.assertEqual(Blob.objects.get().extraction_status, Blob.EXTRACTION_PENDING)
+
+        for callback in callbacks:
+            callback()
+        pdf_record = PDFFile.objects.get()
+        self.assertEqual((pdf_record.status, pdf_record.page_count), ('ready', 3))
+        self.assertEqual(Blob.objects.get().pages_extracted, 3)
+
+    def test_pages_are_split_across_workers(self):
+        self.assertEqual(split_pages(25, 4, 10), [(0, 9), (9, 18), (18, 25)])
+        self.assertEqual(split_pages(3, 4, 10), [(0, 3)])
+
+        arrived = []
+        limits = ExtractionLimits(timeout=30, workers=3, min_pages_per_worker=1)
+        texts = extract_pdf_pages(pdf_bytes(7), limits, on_page=lambda number, text: arrived.append(number))
+        self.assertEqual(len(texts), 7)
+        self.assertEqual(sorted(arrived), list(range(1, 8)))
+
+    def test_documents_over_the_limits_fail(self):
+        with self.assertRaises(ExtractionTimeout):
+            extract_pdf_pages(pdf_bytes(), ExtractionLimits(timeout=0.01))
+        with self.assertRaises(PDFExtractionError):
+            extract_pdf_pages(pdf_bytes(), ExtractionLimits(timeout=30, memory_mb=16))
+        with self.assertRaises(PDFExtractionError):
+            extract_pdf_pages(b'not a pdf', ExtractionLimits(timeout=30))
+
+        with override_settings(PDF_EXTRACTION_TIMEOUT=0.01):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('articles:upload_pdf'), {'pdf_file': self.upload()})
+        self.assertEqual(PDFFile.objects.get().status, 'error')
+        self.assertEqual(Blob.objects.get().extraction_status, Blob.EXTRACTION_FAILED)
+
+    def test_crashed_or_killed_extractions_do_not_stay_claimed(self):
+        with mock.patch('kquires.articles.blobs.extract_pdf_pages', side_effect=RuntimeError('database went away')):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('articles:upload_pdf'), {'pdf_file': self.upload(2)})
+        blob = Blob.objects.get()
+        self.assertEqual((blob.extraction_status, blob.extraction_error), (Blob.EXTRACTION_FAILED, 'database went away'))
+        self.assertEqual(PDFFile.objects.get().status, 'error')
+
+        # A worker killed mid-extraction leaves the blob processing until it is stale
+        Blob.objects.update(extraction_status=Blob.EXTRACTION_PROCESSING, extraction_updated_at=timezone.now())
+        PDFFile.objects.update(status='processing')
+        self.assertEqual(requeue_stale_extractions(), 0)
+        Blob.objects.update(extraction_updated_at=timezone.now() - timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(requeue_stale_extractions(), 1)
+        self.assertEqual(Blob.objects.get().extraction_status, Blob.EXTRACTION_READY)
+        self.assertEqual((PDFFile.objects.get().status, PDFFile.objects.get().page_count), ('ready', 2))
+
+    def test_editor_pdf_upload_is_polled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('articles:process_file'), {'file': self.upload(2)})
+        self.assertEqual(response.status_code, 202)
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'ready')
+        self.assertEqual(status['page_count'], 2)
+        self.assertIn('content', status)
+
+
+class PDFPageTestCase(TestCase):
+    def upload(self, pages):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('articles:upload_pdf'), {'pdf_file': pdf_upload('book.pdf', pages)})
+        return response.json()['file_id']
+
+    def test_extraction_stores_one_row_per_page(self):
+        self.upload(3)
+        pages = list(PDFPage.objects.values_list('number', 'char_count', 'checksum'))
+        self.assertEqual(pages, [(number, 0, hashlib.sha256(b'').hexdigest()) for number in (1, 2, 3)])
+
+    def test_pages_api_returns_page_ranges(self):
+        file_id = self.upload(25)
+        url = reverse('articles:pdf_pages_api', args=[file_id])
+
+        first = self.client.get(url).json()
+        self.assertEqual((first['start'], first['end'], first['page_count']), (1, 20, 25))
+        self.assertEqual([page['number'] for page in first['pages']], list(range(1, 21)))
+
+        rest = self.client.get(first['next']).json()
+        self.assertEqual([page['number'] for page in rest['pages']], list(range(21, 26)))
+        self.assertIsNone(rest['next'])
+
+        ranged = self.client.get(url, {'start': 5, 'end': 6}).json()
+        self.assertEqual([page['number'] for page in ranged['pages']], [5, 6])
+        self.assertEqual(self.client.get(url, {'start': 3, 'end': 2}).status_code, 400)
+
+    def test_listings_leave_the_full_text_out(self):
+        file_id = self.upload(2)
+        pdf_file = PDFFile.objects.get(pk=file_id)
+        self.assertIn('extracted_text', pdf_file.get_deferred_fields())
+
+        PDFPage.objects.filter(blob_id=pdf_file.blob_id, number=2).update(text='quarterly revenue')
+        PDFFile.objects.filter(pk=file_id).update(google_drive_file_id='drive-1')
+        results = self.client.get(reverse('articles:search_files'), {'q': 'revenue'}).json()
+        self.assertEqual([result['id'] for result in results['files']], [file_id])
+
+        legacy = PDFFile.objects.create(original_filename='old.pdf', extracted_text='legacy text', page_count=1, status='ready')
+        response = self.client.post(
+            reverse('articles:extract_pdf_text'), json.dumps({'file_id': legacy.pk}), content_type='application/json',
+        ).json()
+        self.assertEqual(response['extracted_text'], 'legacy text')
+
+    def test_direct_extraction_stores_pages_only(self):
+        pdf_file = PDFFile.objects.get(pk=self.upload(2))
+        with mock.patch('kquires.utils.pdf_extraction.extract_pdf_pages', return_value=['alpha', 'beta']):
+            result = pdf_file.extract_text_from_pdf(b'%PDF')
+
+        self.assertEqual(result, {'success': True, 'page_count': 2})
+        pages = PDFPage.objects.filter(blob_id=pdf_file.blob_id).values_list('text', flat=True)
+        self.assertEqual(list(pages), ['alpha', 'beta'])
+        self.assertIsNone(PDFFile.objects.with_text().get(pk=pdf_file.pk).extracted_text)
+        self.assertEqual(pdf_file.full_text(), 'alpha\nbeta\n')
+
+
+class FileCatalogTestCase(TestCase):
+    def test_reconcile_catalogs_media_and_marks_missing_files(self):
+        self.client.post(reverse('articles:upload_pdf'), {'pdf_file': pdf_upload('guide.pdf', title='guide.pdf')})
+        pdf_file = PDFFile.objects.get()
+        default_storage.save('videos/intro.mp4', ContentFile(b'v' * 300))
+        default_storage.save('blobs/incoming/partial.pdf', ContentFile(b'partial'))
+        FileCatalogEntry.objects.all().delete()
+
+        self.assertEqual(reconcile_local_files()['missing'], 0)
+        entries = {entry.key: entry for entry in FileCatalogEntry.objects.all()}
+        self.assertEqual(set(entries), {pdf_file.blob.path, 'videos/intro.mp4'})
+        self.assertEqual(entries[pdf_file.blob.path].pdf_file, pdf_file)
+        self.assertEqual(entries[pdf_file.blob.path].kind, FileCatalogEntry.KIND_PDF)
+        self.assertEqual((entries['videos/intro.mp4'].kind, entries['videos/intro.mp4'].size), (FileCatalogEntry.KIND_VIDEO, 300))
+
+        default_storage.delete('videos/intro.mp4')
+        self.assertEqual(reconcile_local_files()['missing'], 1)
+        self.assertEqual(FileCatalogEntry.objects.get(key='videos/intro.mp4').status, FileCatalogEntry.STATUS_MISSING)
+
+    def test_drive_files_are_cataloged(self):
+        PDFFile.objects.create(original_filename='drive.pdf', google_drive_file_id='d-1', google_drive_file_size=42)
+        self.assertEqual(reconcile_drive_files()['seen'], 1)
+        entry = FileCatalogEntry.objects.get(source=FileCatalogEntry.SOURCE_DRIVE)
+        self.assertEqual((entry.key, entry.size, entry.kind), ('d-1', 42, FileCatalogEntry.KIND_PDF))
+
+        PDFFile.objects.all().delete()
+        self.assertEqual(reconcile_drive_files()['missing'], 1)
+
+    def test_file_manager_reads_the_catalog(self):
+        url = reverse('articles:file_manager')
+        self.client.post(reverse('articles:upload_pdf'), {'pdf_file': pdf_upload('a.pdf', title='a.pdf')})
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url)
+        self.assertEqual((response.context['total_files'], response.context['total_pdf_files']), (1, 1))
+
+        for name in ('b.pdf', 'c.pdf'):
+            self.client.post(reverse('articles:upload_pdf'), {'pdf_file': pdf_upload(name, title=name)})
+        with CaptureQueriesContext(connection) as more:
+            response = self.client.get(url)
+        self.assertEqual(response.context['total_files'], 3)
+        self.assertEqual(len(more), len(few))
+        self.assertContains(response, 'c.pdf')
+        self.assertContains(response, reverse('articles:pdf_pages_api', args=['000']))
+
+
+class ResumableUploadTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='uploader@example.com', password='password')
+        self.client.force_login(self.user)
+
+    def start(self, name, size, content_type='application/pdf'):
+        response = self.client.post(
+            reverse('articles:create_upload_session'),
+            json.dumps({'filename': name, 'size': size, 'content_type': content_type}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, url, data, start, total):
+        return self.client.put(
+            url, data, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{total}",
+        )
+
+    def test_chunks_resume_from_the_offset_and_finalize_into_a_pdf(self):
+        content = pdf_bytes(2)
+        session = self.start('report.pdf', len(content))
+        url, half = session['upload_url'], len(content) // 2
+
+        self.assertEqual(self.put(url, content[:half], 0, len(content)).json()['offset'], half)
+        # The same chunk again, as after a lost response, is refused with the offset to resume from
+        conflict = self.put(url, content[:half], 0, len(content))
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(int(conflict['Upload-Offset']), half)
+        self.assertEqual(self.client.get(url).json()['offset'], half)
+        self.assertEqual(self.put(url, content[half:], half, len(content)).json()['offset'], len(content))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('articles:finalize_upload_session', args=[session['id']]))
+        self.assertEqual(response.status_code, 202)
+
+        upload = UploadSession.objects.get(pk=session['id'])
+        self.assertEqual(upload.status, UploadSession.STATUS_COMPLETE)
+        self.assertEqual(upload.blob.size, len(content))
+        self.assertEqual(Blob.objects.get().extraction_status, Blob.EXTRACTION_READY)
+        pdf_file = PDFFile.objects.get()
+        self.assertEqual((pdf_file.original_filename, pdf_file.page_count, pdf_file.created_by), ('report.pdf', 2, self.user))
+        self.assertEqual(self.client.get(url).json()['file_id'], pdf_file.pk)
+
+    def test_a_chunk_that_loses_the_race_is_refused(self):
+        session = self.start('clip.mp4', 10, content_type='video/mp4')
+        url = session['upload_url']
+
+        class RacingStream:
+            # Another copy of the chunk completes while this one is still being read
+            def __init__(self, data):
+                self.data = BytesIO(data)
+                self.raced = False
+
+            def read(self, size):
+                if not self.raced:
+                    self.raced = True
+                    write_chunk(session['id'], 0, 4, 10, BytesIO(b'aaaaa'))
+                return self.data.read(size)
+
+        with self.assertRaises(UploadConflict) as conflict:
+            write_chunk(session['id'], 0, 4, 10, RacingStream(b'bbbbb'))
+        self.assertEqual(conflict.exception.session.offset, 5)
+        self.assertEqual(self.put(url, b'ccccc', 5, 10).json()['offset'], 10)
+
+        upload = UploadSession.objects.get()
+        parts = sorted(os.listdir(session_dir(upload)))
+        self.assertEqual(len(parts), 2)
+        with open(os.path.join(session_dir(upload), parts[0]), 'rb') as handle:
+            self.assertEqual(handle.read(), b'aaaaa')
+
+    def test_sessions_reject_bad_chunks_and_other_users(self):
+        session = self.start('clip.mp4', 10, content_type='video/mp4')
+        url = session['upload_url']
+        self.assertEqual(self.put(url, b'x' * 11, 0, 11).status_code, 400)
+        self.assertEqual(self.client.put(url, b'x', content_type='application/octet-stream').status_code, 400)
+        self.assertEqual(self.client.post(reverse('articles:finalize_upload_session', args=[session['id']])).status_code, 409)
+        self.assertEqual(UploadSession.objects.get().offset, 0)
+
+        other = User.objects.create_user(email='other@example.com', password='password')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_stuck_assemblies_are_queued_again_or_expired(self):
+        ids = []
+        for _ in range(2):
+            session = self.start('clip.mp4', 10, content_type='video/mp4')
+            self.put(session['upload_url'], b'x' * 10, 0, 10)
+            # The assembly task is never run, as when its worker is killed
+            self.client.post(reverse('articles:finalize_upload_session', args=[session['id']]))
+            ids.append(session['id'])
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        UploadSession.objects.update(updated_at=an_hour_ago)
+        UploadSession.objects.filter(pk=ids[1]).update(expires_at=an_hour_ago)
+
+        self.assertEqual(expire_sessions(), 1)
+        self.assertEqual(UploadSession.objects.get().status, UploadSession.STATUS_COMPLETE)
+        self.assertEqual(str(UploadSession.objects.get().pk), ids[0])
+
+    def test_append_file_concatenates_files(self):
+        with tempfile.TemporaryFile() as first, tempfile.TemporaryFile() as second, tempfile.TemporaryFile() as target:
+            first.write(b'a' * 5000)
+            second.write(b'b' * 300)
+            for source in (first, second):
+                source.flush()
+                source.seek(0)
+                self.assertEqual(append_file(source, target), os.fstat(source.fileno()).st_size)
+            target.seek(0)
+            self.assertEqual(target.read(), b'a' * 5000 + b'b' * 300)
+
+
+class FakeDrive:
+    """Local HTTP server speaking the Drive resumable upload protocol"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.requests = []
+        self.failures = []
+        drive = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=None, headers=None):
+                payload = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                metadata = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                session = f"s{len(drive.sessions) + 1}"
+                drive.sessions[session] = {'name': metadata['name'], 'data': b'', 'size': int(self.headers['X-Upload-Content-Length'])}
+                self.reply(200, headers={'Location': f"{drive.url}/sessions/{session}"})
+
+            def do_PUT(self):
+                session = drive.sessions[self.path.rsplit('/', 1)[1]]
+                data = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                drive.requests.append((self.headers['Content-Range'], len(data)))
+                failure = drive.failures.pop(0) if drive.failures else None
+                if failure:
+                    return self.reply(failure)
+                session['data'] += data
+                stored = len(session['data'])
+                if stored == session['size']:
+                    return self.reply(200, {
+                        'id': 'drive-file-1', 'name': session['name'], 'size': str(stored),
+                        'webViewLink': 'https://drive.example/view', 'webContentLink': 'https://drive.example/download',
+                    })
+                self.reply(308, headers={'Range': f"bytes=0-{stored - 1}"} if stored else {})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def client(self):
+        return DriveUploadClient(requests.Session(), upload_url=f"{self.url}/upload")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DriveSyncTestCase(TestCase):
+    CHUNK = 256 * 1024
+
+    def setUp(self):
+        self.drive = FakeDrive()
+        self.addCleanup(self.drive.close)
+        patcher = mock.patch('kquires.articles.drive_sync.drive_upload_client', side_effect=self.drive.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        overrides = override_settings(DRIVE_SYNC_CHUNK_SIZE=self.CHUNK, DRIVE_SYNC_MAX_ATTEMPTS=3)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def article_with_attachment(self, content):
+        category = Category.objects.create(name='Docs', type='Main', status='approved')
+        article = Article.objects.create(title='Handbook', category=category, brief_description='<p>Body</p>')
+        article.attachment.save('handbook.bin', ContentFile(content))
+        return article
+
+    def test_upload_resumes_after_a_failed_chunk(self):
+        content = bytes(range(256)) * 2500
+        article = self.article_with_attachment(content)
+        self.drive.failures = [503]
+        with self.captureOnCommitCallbacks(execute=True):
+            result = article.upload_to_google_drive(filename='handbook.bin', mime_type='application/octet-stream')
+        self.assertTrue(result['queued'])
+
+        job = DriveSyncJob.objects.get(pk=result['job_id'])
+        self.assertEqual((job.status, job.attempts, job.bytes_uploaded), (DriveSyncJob.STATUS_PENDING, 1, 0))
+        self.assertGreater(job.next_attempt_at, job.started_at)
+        article.refresh_from_db()
+        self.assertIsNone(article.google_drive_file_id)
+
+        # The next attempt asks Drive for its offset, then the second chunk fails
+        DriveSyncJob.objects.filter(pk=job.pk).update(next_attempt_at=job.started_at)
+        self.drive.failures = [None, None, 502]
+        run_drive_job(job.pk, client=self.drive.client())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.bytes_uploaded), (DriveSyncJob.STATUS_PENDING, self.CHUNK))
+
+        # The chunk Drive stored is not sent again
+        DriveSyncJob.objects.filter(pk=job.pk).update(next_attempt_at=job.started_at)
+        self.drive.requests.clear()
+        self.assertEqual(run_drive_job(job.pk, client=self.drive.client()), DriveSyncJob.STATUS_SUCCEEDED)
+        self.assertEqual(self.drive.requests[0], (f"bytes */{len(content)}", 0))
+        self.assertTrue(self.drive.requests[1][0].startswith(f"bytes {self.CHUNK}-"))
+        self.assertEqual(self.drive.sessions['s1']['data'], content)
+        self.assertEqual(len(self.drive.sessions), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.attempts, job.bytes_uploaded, job.progress), (3, len(content), 100))
+        article.refresh_from_db()
+        self.assertEqual(
+            (article.google_drive_file_id, article.google_drive_filename, article.google_drive_file_size),
+            ('drive-file-1', 'handbook.bin', len(content)),
+        )
+
+    def test_failures_back_off_and_give_up(self):
+        with self.settings(DRIVE_SYNC_BACKOFF_BASE=10, DRIVE_SYNC_BACKOFF_MAX=60):
+            with mock.patch('kquires.articles.drive_sync.random.uniform', side_effect=lambda low, high: high):
+                self.assertEqual([backoff_delay(attempt) for attempt in (1, 2, 3, 4, 5)], [10, 20, 40, 60, 60])
+            self.assertTrue(all(0 <= backoff_delay(3) <= 40 for _ in range(20)))
+
+        article = self.article_with_attachment(b'x' * 1000)
+        self.drive.failures = [403]
+        with self.captureOnCommitCallbacks(execute=True):
+            job_id = article.upload_to_google_drive()['job_id']
+        job = DriveSyncJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.attempts), (DriveSyncJob.STATUS_FAILED, 1))
+        self.assertIn('403', job.error_message)
+        self.assertIsNone(run_drive_job(job.pk))
+
+    def test_chunk_that_does_not_advance_is_retried(self):
+        article = self.article_with_attachment(b'x' * 1000)
+        # Drive answers "resume incomplete" without storing anything
+        self.drive.failures = [308]
+        with self.captureOnCommitCallbacks(execute=True):
+            job_id = article.upload_to_google_drive()['job_id']
+        job = DriveSyncJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.attempts, job.bytes_uploaded), (DriveSyncJob.STATUS_PENDING, 1, 0))
+        self.assertIn('stored none of the chunk', job.error_message)
+        self.assertEqual(len(self.drive.requests), 1)
+
+    def test_failed_attempt_does_not_resume_the_old_file_session(self):
+        article = self.article_with_attachment(b'a' * 1000)
+        with self.captureOnCommitCallbacks(execute=False):
+            job_id = article.upload_to_google_drive()['job_id']
+        client = self.drive.client()
+        send_chunk = client.send_chunk
+
+        def replace_file_then_send(*args):
+            # The author uploads a new attachment while the first one is being sent
+            client.send_chunk = send_chunk
+            path = default_storage.save('articles/attachments/v2.bin', ContentFile(b'b' * 700))
+            enqueue_drive_upload(article, path, 'v2.bin')
+            return send_chunk(*args)
+
+        client.send_chunk = replace_file_then_send
+        self.drive.failures = [503]
+        with self.captureOnCommitCallbacks(execute=False):
+            self.assertEqual(run_drive_job(job_id, client=client), DriveSyncJob.STATUS_PENDING)
+        job = DriveSyncJob.objects.get(pk=job_id)
+        self.assertEqual((job.attempts, job.session_uri, job.bytes_uploaded, job.size), (0, '', 0, 700))
+
+        self.assertEqual(run_drive_job(job_id, client=self.drive.client()), DriveSyncJob.STATUS_SUCCEEDED)
+        self.assertEqual(self.drive.sessions['s2']['data'], b'b' * 700)
+
+    def test_pdf_upload_fills_in_drive_fields(self):
+        blob, _ = store_blob(SimpleUploadedFile('manual.pdf', b'%PDF-1.4 ' + b'p' * 600000, content_type='application/pdf'))
+        pdf_file = PDFFile.objects.create(original_filename='manual.pdf', blob=blob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(pdf_file.upload_to_google_drive()['success'])
+        pdf_file.refresh_from_db()
+        self.assertEqual((pdf_file.google_drive_file_id, pdf_file.google_drive_file_size), ('drive-file-1', blob.size))
+        self.assertEqual(len(self.drive.requests), 3)
+        self.assertTrue(FileCatalogEntry.objects.filter(source=FileCatalogEntry.SOURCE_DRIVE, key='drive-file-1', pdf_file=pdf_file).exists())
@@ -0,0 +1,312 @@
+"""
+Article translation workflow.
+
+Views never call the AI service directly: they enqueue a ``TranslationJob``
+and return immediately, and the Celery worker translates the article and
+stores the result as a child translation of the article group. Articles that
+were never translated are filled in by ``backfill_translations``, run from the
+``backfill_translations`` management command or its Celery task.
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from ..utils.html_segments import join_segments, segment_hash, split_segments
+from .models import Article, Checkpoint, SegmentTranslation, TranslationJob
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHECKPOINT = 'translation-backfill'
+
+
+def opposite_language(language):
+    """Return the language an article should be translated into"""
+    return "arabic" if language == "english" else "english"
+
+
+def get_translated_fields(article, source_lang, target_lang, progress=None):
+    """
+    Translate the title, short and brief description of an article.
+
+    The body is split into block-level segments and every segment is looked up
+    in the article's segment memory by the hash of its source text. Only new or
+    edited segments are sent to the AI service, in token-bounded chunks that
+    are translated concurrently; the rest are reused and the HTML is
+    reassembled around them. ``progress`` receives (chunks done, chunks total).
+    """
+    from .ai_services import ai_service
+
+    parts = split_segments(article.brief_description or '')
+    sources = [article.title or '', article.short_description or '']
+    sources += [part.text for part in parts if part.translatable]
+    hashes = [segment_hash(text) if text.strip() else None for text in sources]
+
+    memory = SegmentTranslation.objects.filter(article=article, target_language=target_lang)
+    known = dict(
+        memory.filter(source_hash__in={h for h in hashes if h}).values_list('source_hash', 'translated_text')
+    )
+
+    pending = {}
+    for source_hash, text in zip(hashes, sources, strict=True):
+        if source_hash and source_hash not in known:
+            pending[source_hash] = text
+
+    if pending:
+        if not ai_service.is_available():
+            raise Exception("AI service not available")
+        keys = {f"s{index}": source_hash for index, source_hash in enumerate(pending)}
+        result = ai_service.translate_segments(
+            {key: pending[source_hash] for key, source_hash in keys.items()},
+            source_lang,
+            target_lang,
+            technical_terms=article.technical_terms or None,
+            progress=progress,
+        )
+        if 'error' in result:
+            raise Exception(result['error'])
+        translated = {keys[key]: text for key, text in result['translated_fields'].items()}
+        SegmentTranslation.objects.bulk_create(
+            [
+                SegmentTranslation(
+                    article=article,
+                    target_language=target_lang,
+                    source_hash=source_hash,
+                    translated_text=text,
+                )
+                for source_hash, text in translated.items()
+            ],
+            ignore_conflicts=True,
+        )
+        known.update(translated)
+
+    # Forget segments that are no longer part of the article
+    memory.exclude(source_hash__in={h for h in hashes if h}).delete()
+
+    translations = [known[h] if h else text for h, text in zip(hashes, sources, strict=True)]
+    body = iter(translations[2:])
+    for part in parts:
+        if part.translatable:
+            part.text = next(body)
+
+    return {
+        'title': translations[0],
+        'short_description': translations[1],
+        'brief_description': join_segments(parts),
+    }
+
+
+def sync_translation(article, target_lang, create=True, progress=None):
+    """
+    Translate ``article`` into ``target_lang`` and store it as a child translation.
+
+    The existing translation of the article group is updated in place; a new one
+    is only created when ``create`` is True. Returns the translation or None.
+    ``progress`` is an optional callable receiving a percentage.
+    """
+    main_article = article.parent_article if article.parent_article else article
+    translation = Article.objects.filter(
+        parent_article=main_article,
+        language=target_lang
+    ).first()
+
+    if translation is None:
+        if not create:
+            return None
+        translation = Article(
+            user=article.user,
+            language=target_lang,
+            original_language=article.language,
+            parent_article=main_article,
+            ai_translated=True,
+            translation_status="translated",
+        )
+
+    def chunk_progress(done, total):
+        # Chunks account for 10-90% of the job
+        if progress:
+            progress(10 + 80 * done // total)
+
+    translated = get_translated_fields(article, article.language, target_lang, progress=chunk_progress)
+    if progress:
+        progress(90)
+
+    for name, value in translated.items():
+        setattr(translation, name, value)
+    translation.category = article.category
+    translation.subcategory = article.subcategory
+    translation.status = article.status
+    translation.visibility = article.visibility
+    translation.last_translated_at = timezone.now()
+    translation.save()
+    return translation
+
+
+def enqueue_translation(article, target_lang, create=True):
+    """
+    Schedule a background translation of ``article`` into ``target_lang``.
+
+    Jobs are deduplicated per (article, target language): while a job is
+    pending the call is a no-op, and a running job is told to run again once
+    it finishes so it picks up the latest content. The Celery task is only
+    dispatched after the surrounding transaction commits.
+
+    Returns the job, or None when there is nothing to do.
+    """
+    from .ai_services import ai_service
+
+    if not ai_service.client:
+        logger.warning("Translation of article %s skipped: AI service not configured", article.pk)
+        return None
+
+    if not create:
+        main_article = article.parent_article if article.parent_article else article
+        if not Article.objects.filter(parent_article=main_article, language=target_lang).exists():
+            return None
+
+    now = timezone.now()
+    with transaction.atomic():
+        job, created = TranslationJob.objects.select_for_update().get_or_create(
+            article=article,
+            target_language=target_lang,
+            defaults={'task_id': uuid.uuid4().hex, 'requested_at': now},
+        )
+        if not created:
+            if job.is_active:
+                # The worker re-runs the job if it was requested after it started
+                TranslationJob.objects.filter(pk=job.pk).update(requested_at=now)
+                return job
+            job.task_id = uuid.uuid4().hex
+            job.status = TranslationJob.STATUS_PENDING
+            job.progress = 0
+            job.attempts = 0
+            job.error_message = None
+            job.requested_at = now
+            job.started_at = None
+            job.finished_at = None
+            job.save()
+
+    transaction.on_commit(lambda: dispatch_translation_job(job))
+    return job
+
+
+def dispatch_translation_job(job):
+    """Send a pending job to the Celery worker"""
+    from .tasks import translate_article_task
+
+    try:
+        translate_article_task.apply_async(args=[job.pk], task_id=job.task_id)
+    except Exception as e:
+        # The job stays pending and is picked up again by the beat schedule
+        logger.error("Could not dispatch translation job %s: %s", job.pk, e)
+
+
+def missing_translations(after_id=0, limit=50, ids=None):
+    """
+    Main articles with an id above ``after_id`` that have no translation into
+    their counterpart language, in id order (keyset pagination). ``ids``
+    restricts the scan to those articles.
+    """
+    def has_translation(language):
+        return Exists(Article.objects.filter(parent_article=OuterRef('pk'), language=language))
+
+    return list(
+        Article.objects.alias(
+            has_arabic=has_translation('arabic'),
+            has_english=has_translation('english'),
+        )
+        .filter(parent_article__isnull=True, id__gt=after_id, **({} if ids is None else {'id__in': ids}))
+        .filter(Q(language='english', has_arabic=False) | Q(language='arabic', has_english=False))
+        .order_by('id')[:limit]
+    )
+
+
+def _backfill_article(article):
+    """Translate one article for the backfill; returns True on success"""
+    try:
+        return sync_translation(article, opposite_language(article.language)) is not None
+    except Exception as e:
+        logger.error("Backfill translation of article %s failed: %s", article.pk, e)
+        return False
+
+
+def _backfill_article_in_thread(article):
+    try:
+        return _backfill_article(article)
+    finally:
+        # Worker threads open their own database connection
+        connection.close()
+
+
+def backfill_translations(batch_size=50, concurrency=4, max_batches=None, reset=False, report=None):
+    """
+    Translate every article that is missing its counterpart language.
+
+    Articles are scanned in keyset batches by id and each batch is translated
+    with ``concurrency`` threads; every AI call still goes through the shared
+    rate limiter and circuit breaker. The last processed id is stored in a
+    ``Checkpoint`` after each batch, so an interrupted run resumes where it
+    stopped. Ids that failed are kept in the checkpoint's ``failed_ids`` and
+    retried once the scan reaches the end; those that fail again are retried
+    by the next run, or with ``reset``.
+
+    ``report`` is an optional callable receiving the stats after each batch.
+    Returns the stats, with ``done`` set once the scan and its retry pass are
+    finished.
+    """
+    checkpoint, _ = Checkpoint.objects.get_or_create(name=BACKFILL_CHECKPOINT)
+    if reset:
+        checkpoint.position = 0
+        checkpoint.stats = {}
+        checkpoint.save()
+
+    stats = {'processed': 0, 'translated': 0, 'failed': 0, 'batches': 0, 'elapsed': 0.0, 'done': False}
+    started = time.monotonic()
+    while max_batches is None or stats['batches'] < max_batches:
+        retry_ids = checkpoint.stats.get('retry_ids', [])
+        if retry_ids:
+            batch = missing_translations(limit=batch_size, ids=retry_ids[:batch_size])
+            checkpoint.stats['retry_ids'] = retry_ids[batch_size:]
+        else:
+            batch = missing_translations(after_id=checkpoint.position, limit=batch_size)
+            if not batch:
+                if not checkpoint.stats.get('failed_ids'):
+                    stats['done'] = True
+                    break
+                # The scan is over: the articles that failed get one more try
+                checkpoint.stats['retry_ids'] = checkpoint.stats.pop('failed_ids')
+                continue
+
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(_backfill_article_in_thread, batch))
+        else:
+            results = [_backfill_article(article) for article in batch]
+
+        failed_ids = [article.pk for article, translated in zip(batch, results, strict=True) if not translated]
+        checkpoint.stats['failed_ids'] = checkpoint.stats.get('failed_ids', []) + failed_ids
+        totals = {
+            'processed': len(batch), 'translated': len(batch) - len(failed_ids), 'failed': len(failed_ids), 'batches': 1,
+        }
+        for key, value in totals.items():
+            stats[key] += value
+            checkpoint.stats[key] = checkpoint.stats.get(key, 0) + value
+        stats['elapsed'] = round(time.monotonic() - started, 2)
+        stats['per_minute'] = round(stats['processed'] * 60 / stats['elapsed'], 1) if stats['elapsed'] else None
+
+        if not retry_ids:
+            checkpoint.position = batch[-1].pk
+        checkpoint.save()
+        if report:
+            report(stats)
+        if retry_ids and not checkpoint.stats['retry_ids']:
+            # Ids failing again wait for the next run instead of being retried in a loop
+            stats['done'] = True
+            break
+
+    return stats
@@ -20,8 +20,13 @@ from .views import (
     get_file_info,
     upload_pdf,
     extract_pdf_text,
+    pdf_text_status,
+    pdf_pages_api,
     delete_pdf_file,
     search_files,
+    create_upload_session,
+    upload_session,
+    finalize_upload_session,
 )
 from .api_views import translate_article_view, get_task_status  # Added from feature branch
 
@@ -59,6 +64,13 @@ urlpatterns = [
     # PDF Management endpoints
     path("upload-pdf/", upload_pdf, name="upload_pdf"),
     path("extract-pdf-text/", extract_pdf_text, name="extract_pdf_text"),
+    path("pdf-text/<str:sha256>/", pdf_text_status, name="pdf_text_status"),
+    path("api/pdf/<int:file_id>/pages/", pdf_pages_api, name="pdf_pages_api"),
     path("delete-pdf/<int:file_id>/", delete_pdf_file, name="delete_pdf_file"),
     path("search-files/", search_files, name="search_files"),
+
+    # Resumable uploads
+    path("uploads/", create_upload_session, name="create_upload_session"),
+    path("uploads/<uuid:session_id>/", upload_session, name="upload_session"),
+    path("uploads/<uuid:session_id>/finalize/", finalize_upload_session, name="finalize_upload_session"),
 ]
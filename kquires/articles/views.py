@@ -1,77 +1,74 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.views.generic import ListView, DetailView, CreateView, DeleteView, UpdateView, View
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Q
+from django.http import JsonResponse, HttpResponse, Http404
+from django.db import transaction
+from django.db.models import Count, F, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.utils.html import strip_tags
 from django.utils.translation import get_language
+from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from .models import Article, PDFFile
+from .models import Article, Blob, FileCatalogEntry, PDFFile, PDFPage, UploadSession
 from .forms import ArticleForm
 from ..notifications.models import Notification
 from ..categories.models import Category
-from ..utils.translation_service import detect_language, translate_text, clean_ai_json
+from ..utils.response_cache import cache_response
+from ..utils.translation_service import detect_language
+from .counters import record_view
+from .images import register_image
+from .blobs import queue_blob_extraction, store_blob
+from .resumable import UploadConflict, create_session, finalize_session, parse_content_range, write_chunk
+from .translation import enqueue_translation, opposite_language
+
 
-def get_translated_text(text, source_lang, target_lang):
-    """Helper function to get translated text"""
-    if not text:
-        return text
-    
-    try:
-        # Test if AI service is available
-        from kquires.articles.ai_services import ai_service
-        if not ai_service.client:
-            print("AI service client not available")
-            raise Exception("AI service not available")
-        
-        # Test with a simple translation first
-        test_result = ai_service.translate_content("Hello", "english", "arabic")
-        if 'error' in test_result:
-            print(f"AI service test failed: {test_result['error']}")
-            raise Exception(f"AI service test failed: {test_result['error']}")
-        
-        result = translate_text(text, source_lang, target_lang)
-        print(f"Translation result for '{text[:50]}...': {result}")  # Debug log
-        
-        if isinstance(result, dict):
-            if 'error' in result:
-                print(f"Translation error: {result['error']}")
-                raise Exception(f"Translation failed: {result['error']}")
-            translated = result.get('translated_text', text)
-            if translated == text and source_lang != target_lang:
-                raise Exception("Translation returned original text")
-            return translated
-        else:
-            return result
-    except Exception as e:
-        print(f"Translation exception: {e}")
-        raise e
 import csv
-import os
+import hashlib
+import logging
 from io import TextIOWrapper
 from openpyxl import Workbook
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from django.utils.text import get_valid_filename
-import uuid
-from PyPDF2 import PdfReader
 from openpyxl import load_workbook
 
+logger = logging.getLogger(__name__)
+
+# Pages returned by one request of the PDF page APIs
+PDF_PAGES_PER_REQUEST = 20
+
+
+def article_page_tags(request, response, *args, **kwargs):
+    """Surrogate keys of a rendered article page"""
+    article = response.context_data["article"]
+    return [
+        f"article:{article.pk}",
+        f"article:{article.parent_article_id}" if article.parent_article_id else None,
+        f"category:{article.category_id}",
+        f"category:{article.subcategory_id}" if article.subcategory_id else None,
+    ]
+
 
 class ArticleIndexView(DetailView):
     model = Article
     template_name = "articles/index.html"
     context_object_name = "article"
 
+    def dispatch(self, request, *args, **kwargs):
+        response = self.cached_dispatch(request, *args, **kwargs)
+        if request.method == "GET" and response.status_code == 200:
+            # Counted here so views served from the cache are counted too
+            record_view(kwargs["pk"], request.user)
+        return response
+
+    @method_decorator(cache_response(timeout=300, tags=article_page_tags))
+    def cached_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        article = self.get_object()
-
-        # Strip unwanted bootstrap attrs
-        if article.brief_description:
-            article.brief_description = article.brief_description.replace(
-                'data-bs-ride="true"', ""
-            )
+        article = self.object
 
         # Add multi-language context
         context["article_title"] = article.title
@@ -95,7 +92,7 @@ class ArticleListView(ListView):
         return self.paginate_by
 
     def get_queryset(self):
-        queryset = Article.objects.filter(parent_article__isnull=True).order_by('-created_at')
+        queryset = Article.objects.filter(parent_article__isnull=True).with_translations().order_by('-created_at')
         
         # Handle search query with comprehensive database search
         search_query = self.request.GET.get('q')
@@ -173,21 +170,14 @@ class ArticleCreateView(CreateView):
         if self.request.FILES.get('attachment'):
             attachment_file = self.request.FILES['attachment']
             try:
-                # Read file content
-                file_content = attachment_file.read()
                 filename = attachment_file.name
                 mime_type = attachment_file.content_type
                 
-                # Upload to Google Drive
-                upload_result = instance.upload_to_google_drive(
-                    file_content=file_content,
-                    filename=filename,
-                    mime_type=mime_type
-                )
+                # The Drive sync worker uploads the stored attachment after this request
+                upload_result = instance.upload_to_google_drive(filename=filename, mime_type=mime_type)
                 
                 if upload_result.get('success'):
-                    # File uploaded successfully to Google Drive
-                    print(f"File uploaded to Google Drive: {upload_result.get('file_id')}")
+                    logger.info("Google Drive upload of article %s queued as job %s", instance.pk, upload_result.get('job_id'))
                 else:
                     print(f"Google Drive upload failed: {upload_result.get('error')}")
                     
@@ -195,46 +185,9 @@ class ArticleCreateView(CreateView):
                 print(f"Error uploading to Google Drive: {str(e)}")
         
         # Generate translation in opposite language
-        target_lang = "arabic" if detected_lang == "english" else "english"
+        target_lang = opposite_language(detected_lang)
         
-        try:
-            # Check if translation already exists
-            existing_translation = Article.objects.filter(
-                parent_article=instance, 
-                language=target_lang
-            ).first()
-            
-            if existing_translation:
-                # Update existing translation
-                existing_translation.title = get_translated_text(instance.title, instance.language, target_lang)
-                existing_translation.short_description = get_translated_text(instance.short_description, instance.language, target_lang)
-                existing_translation.brief_description = get_translated_text(instance.brief_description, instance.language, target_lang)
-                existing_translation.category = instance.category
-                existing_translation.subcategory = instance.subcategory
-                existing_translation.status = instance.status
-                existing_translation.visibility = instance.visibility
-                existing_translation.save()
-            else:
-                # Create new translation
-                translated_article = Article(
-                    title=get_translated_text(instance.title, instance.language, target_lang),
-                    short_description=get_translated_text(instance.short_description, instance.language, target_lang),
-                    brief_description=get_translated_text(instance.brief_description, instance.language, target_lang),
-                    user=instance.user,
-                    language=target_lang,
-                    original_language=detected_lang,
-                    parent_article=instance,
-                    ai_translated=True,
-                    translation_status="translated",
-                    category=instance.category,
-                    subcategory=instance.subcategory,
-                    status=instance.status,
-                    visibility=instance.visibility,
-                )
-                translated_article.save()
-        except Exception:
-            import traceback
-            traceback.print_exc()
+        enqueue_translation(instance, target_lang)
 
         return redirect("articles:list")
 
@@ -254,28 +207,9 @@ class ArticleUpdateView(UpdateView):
         instance.save()
         
         # Update translation in opposite language if it exists
-        main_article = instance.parent_article if instance.parent_article else instance
-        target_lang = "arabic" if instance.language == "english" else "english"
+        target_lang = opposite_language(instance.language)
         
-        try:
-            existing_translation = Article.objects.filter(
-                parent_article=main_article, 
-                language=target_lang
-            ).first()
-            
-            if existing_translation:
-                # Update existing translation
-                existing_translation.title = get_translated_text(instance.title, instance.language, target_lang)
-                existing_translation.short_description = get_translated_text(instance.short_description, instance.language, target_lang)
-                existing_translation.brief_description = get_translated_text(instance.brief_description, instance.language, target_lang)
-                existing_translation.category = instance.category
-                existing_translation.subcategory = instance.subcategory
-                existing_translation.status = instance.status
-                existing_translation.visibility = instance.visibility
-                existing_translation.save()
-        except Exception:
-            import traceback
-            traceback.print_exc()
+        enqueue_translation(instance, target_lang, create=False)
         
         return redirect("articles:list")
 
@@ -317,63 +251,61 @@ class ArticleVisibilityView(View):
         return redirect("articles:list")
 
 
+def load_article_group(id):
+    """
+    The article ``id`` and every article of its translation group, in one query.
+
+    Returns ``(article, main_article, {language: article})``; the main article
+    wins over a translation in the same language.
+    """
+    group_id = Coalesce('parent_article_id', 'pk')
+    members = sorted(
+        Article.objects.annotate(group_id=group_id).filter(group_id=Subquery(
+            Article.objects.filter(pk=id).annotate(group_id=group_id).values('group_id')[:1]
+        )),
+        key=lambda member: (member.parent_article_id is not None, member.pk),
+    )
+    article = next((member for member in members if member.pk == id), None)
+    if article is None:
+        raise Http404("No Article matches the given query.")
+    main_article = next(member for member in members if member.parent_article_id is None)
+    by_language = {}
+    for member in members:
+        by_language.setdefault(member.language, member)
+    return article, main_article, by_language
+
+
 def article_detail_api(request, id):
-    """Return article in correct language, fallback if not available"""
-    article = get_object_or_404(Article, id=id)
+    """Return article in correct language, fallback if not available
+
+    The whole translation group is read in one query. Responses carry an ETag
+    and Last-Modified derived from the group's ``updated_at``, so repeat loads
+    of an unchanged article are answered with 304 Not Modified.
+    """
+    article, main_article, by_language = load_article_group(id)
     requested_lang = request.GET.get('language', 'english')
-    # Get the main article (parent or self)
-    main_article = article.parent_article if article.parent_article else article
+    translated_languages = {
+        member.language for member in by_language.values() if member.parent_article_id
+    }
+    
+    last_modified = max(member.updated_at for member in by_language.values())
+    etag = quote_etag(hashlib.sha256(
+        f"{id}:{requested_lang}:{last_modified.isoformat()}:{sorted(by_language)}".encode()
+    ).hexdigest())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        return not_modified
+
+    translation_job = None
     
     # Try to get translation for requested language
     if article.language != requested_lang:
-        translation = Article.objects.filter(
-            parent_article=main_article, language=requested_lang
-        ).first()
+        translation = by_language.get(requested_lang)
         if translation:
             article = translation
         else:
-            # If translation doesn't exist, try to create it on the fly
-            try:
-                print(f"Creating translation for article {main_article.id} from {main_article.language} to {requested_lang}")
-                
-                if requested_lang == "arabic":
-                    translated_title = get_translated_text(main_article.title, main_article.language, "arabic")
-                    translated_short_desc = get_translated_text(main_article.short_description, main_article.language, "arabic")
-                    translated_brief_desc = get_translated_text(main_article.brief_description, main_article.language, "arabic")
-                else:  # english
-                    translated_title = get_translated_text(main_article.title, main_article.language, "english")
-                    translated_short_desc = get_translated_text(main_article.short_description, main_article.language, "english")
-                    translated_brief_desc = get_translated_text(main_article.brief_description, main_article.language, "english")
-                
-                print(f"Translated title: {translated_title}")
-                print(f"Translated short_desc: {translated_short_desc}")
-                print(f"Translated brief_desc: {translated_brief_desc}")
-                
-                # Create the translation
-                translation = Article.objects.create(
-                    title=translated_title,
-                    short_description=translated_short_desc,
-                    brief_description=translated_brief_desc,
-                    user=main_article.user,
-                    language=requested_lang,
-                    original_language=main_article.language,
-                    parent_article=main_article,
-                    ai_translated=True,
-                    translation_status="translated",
-                    category=main_article.category,
-                    subcategory=main_article.subcategory,
-                    status=main_article.status,
-                    visibility=main_article.visibility,
-                )
-                article = translation
-                print(f"Translation created successfully with ID: {translation.id}")
-            except Exception as e:
-                # If translation fails, don't create article, just return original with status
-                print(f"Translation failed: {e}")
-                import traceback
-                traceback.print_exc()
-                # Set flag to indicate translation failed
-                translation_in_progress = True
+            # Translations are produced by the Celery worker, never inside the request
+            translation_job = enqueue_translation(main_article, requested_lang)
 
     # Check if the content is actually translated or still in English
     is_translated = True
@@ -391,35 +323,45 @@ def article_detail_api(request, id):
             "id": main_article.id,  # Return main article ID
             "main_id": main_article.id,
             "title": main_article.title,  # Return original content
-            "short_description": clean_ai_json(main_article.short_description),
-            "brief_description": clean_ai_json(main_article.brief_description),
+            "short_description": main_article.short_description,
+            "brief_description": main_article.brief_description,
             "language": main_article.language,  # Return original language
             "current_language": main_article.language,
-            "category_id": main_article.category.id if main_article.category else None,
-            "subcategory_id": main_article.subcategory.id if main_article.subcategory else None,
-            "has_english": Article.objects.filter(parent_article=main_article, language="english").exists(),
-            "has_arabic": Article.objects.filter(parent_article=main_article, language="arabic").exists(),
+            "category_id": main_article.category_id,
+            "subcategory_id": main_article.subcategory_id,
+            "has_english": "english" in translated_languages,
+            "has_arabic": "arabic" in translated_languages,
             "is_translated": False,
             "translation_status": "translation_in_progress",
-            "translation_message": f"Translation to {requested_lang} is not available. Please check your OpenAI API key configuration in the .env file."
+            "translation_message": (
+                f"Translation to {requested_lang} is being prepared."
+                if translation_job else
+                f"Translation to {requested_lang} is not available. Please check your OpenAI API key configuration in the .env file."
+            ),
+            "task_id": translation_job.task_id if translation_job else None,
         }
     else:
         response = {
             "id": article.id,
             "main_id": main_article.id,
             "title": article.title,
-            "short_description": clean_ai_json(article.short_description),
-            "brief_description": clean_ai_json(article.brief_description),
+            "short_description": article.short_description,
+            "brief_description": article.brief_description,
             "language": article.language,
             "current_language": article.language,
-            "category_id": article.category.id if article.category else None,
-            "subcategory_id": article.subcategory.id if article.subcategory else None,
-            "has_english": Article.objects.filter(parent_article=main_article, language="english").exists(),
-            "has_arabic": Article.objects.filter(parent_article=main_article, language="arabic").exists(),
+            "category_id": article.category_id,
+            "subcategory_id": article.subcategory_id,
+            "has_english": "english" in translated_languages,
+            "has_arabic": "arabic" in translated_languages,
             "is_translated": is_translated,
             "translation_status": article.translation_status if hasattr(article, 'translation_status') else ("translated" if is_translated else "translation_in_progress")
         }
-    return JsonResponse(response)
+    response = JsonResponse(response)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Browsers keep the response but check it with the ETag before reuse
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 def test_translation_api(request):
@@ -442,7 +384,8 @@ def test_translation_api(request):
             "status": "success",
             "test_text": test_text,
             "translation_result": result,
-            "ai_service_available": True
+            "ai_service_available": True,
+            "circuit_breaker": ai_service.breaker.state()
         })
     except Exception as e:
         return JsonResponse({
@@ -452,13 +395,14 @@ def test_translation_api(request):
         })
 
 
+@method_decorator(cache_response(timeout=300, tags=lambda *args, **kwargs: ["articles", "categories"]), name="dispatch")
 class ArticlesOverviewView(ListView):
     model = Article
     template_name = "articles/overview.html"
     context_object_name = "articles"
 
     def get_queryset(self):
-        return Article.objects.filter(status="approved", parent_article__isnull=True)
+        return Article.objects.filter(status="approved", parent_article__isnull=True).with_translations()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -481,21 +425,14 @@ def upload_article(request):
             if request.FILES.get('attachment'):
                 attachment_file = request.FILES['attachment']
                 try:
-                    # Read file content
-                    file_content = attachment_file.read()
                     filename = attachment_file.name
                     mime_type = attachment_file.content_type
                     
-                    # Upload to Google Drive
-                    upload_result = article.upload_to_google_drive(
-                        file_content=file_content,
-                        filename=filename,
-                        mime_type=mime_type
-                    )
+                    # The Drive sync worker uploads the stored attachment after this request
+                    upload_result = article.upload_to_google_drive(filename=filename, mime_type=mime_type)
                     
                     if upload_result.get('success'):
-                        # File uploaded successfully to Google Drive
-                        print(f"File uploaded to Google Drive: {upload_result.get('file_id')}")
+                        logger.info("Google Drive upload of article %s queued as job %s", article.pk, upload_result.get('job_id'))
                     else:
                         print(f"Google Drive upload failed: {upload_result.get('error')}")
                         
@@ -503,45 +440,8 @@ def upload_article(request):
                     print(f"Error uploading to Google Drive: {str(e)}")
 
             # Generate translation in opposite language
-            target_lang = "arabic" if detected_lang == "english" else "english"
-            try:
-                # Check if translation already exists
-                existing_translation = Article.objects.filter(
-                    parent_article=article, 
-                    language=target_lang
-                ).first()
-                
-                if existing_translation:
-                    # Update existing translation
-                    existing_translation.title = get_translated_text(article.title, article.language, target_lang)
-                    existing_translation.short_description = get_translated_text(article.short_description, article.language, target_lang)
-                    existing_translation.brief_description = get_translated_text(article.brief_description, article.language, target_lang)
-                    existing_translation.category = article.category
-                    existing_translation.subcategory = article.subcategory
-                    existing_translation.status = article.status
-                    existing_translation.visibility = article.visibility
-                    existing_translation.save()
-                else:
-                    # Create new translation
-                    translated_article = Article(
-                        title=get_translated_text(article.title, article.language, target_lang),
-                        short_description=get_translated_text(article.short_description, article.language, target_lang),
-                        brief_description=get_translated_text(article.brief_description, article.language, target_lang),
-                        user=article.user,
-                        language=target_lang,
-                        original_language=detected_lang,
-                        parent_article=article,
-                        ai_translated=True,
-                        translation_status="translated",
-                        category=article.category,
-                        subcategory=article.subcategory,
-                        status=article.status,
-                        visibility=article.visibility,
-                    )
-                    translated_article.save()
-            except Exception:
-                import traceback
-                traceback.print_exc()
+            target_lang = opposite_language(detected_lang)
+            enqueue_translation(article, target_lang)
 
             return redirect("articles:list")
     else:
@@ -625,27 +525,27 @@ def process_file(request):
         try:
             # Handle Image Uploads
             if file_type.startswith("image/"):
-                safe_filename = get_valid_filename(uploaded_file.name)
-                unique_filename = f"{uuid.uuid4().hex}_{safe_filename}"
-                save_path = os.path.join("articles", unique_filename)
-                path = default_storage.save(save_path, ContentFile(uploaded_file.read()))
-                image_url = settings.MEDIA_URL + path
-                return JsonResponse({"image_url": image_url})
+                # Embedded in article HTML, which holds no reference: the blob is pinned
+                # when an article embedding it is saved. Resized variants are built in the background
+                blob, _ = store_blob(uploaded_file, reference=False)
+                register_image(blob.path)
+                return JsonResponse({"image_url": blob.url, "size": blob.size, "sha256": blob.sha256})
 
             # Handle Video Uploads
             elif file_type.startswith("video/"):
-                safe_filename = get_valid_filename(uploaded_file.name)
-                unique_filename = f"{uuid.uuid4().hex}_{safe_filename}"
-                save_path = os.path.join("videos", unique_filename)
-                path = default_storage.save(save_path, ContentFile(uploaded_file.read()))
-                video_url = settings.MEDIA_URL + path
-                return JsonResponse({"video_url": video_url})
+                blob, _ = store_blob(uploaded_file, reference=False)
+                return JsonResponse({"video_url": blob.url, "size": blob.size, "sha256": blob.sha256})
 
             # Handle PDF Uploads
             elif file_type == "application/pdf":
-                pdf_reader = PdfReader(uploaded_file)
-                content = "\n".join([page.extract_text() for page in pdf_reader.pages if page.extract_text()])
-                return JsonResponse({"content": content})
+                # Parsed by the extraction workers; the editor polls status_url for the text
+                blob, _ = store_blob(uploaded_file, reference=False)
+                if queue_blob_extraction(blob) == blob.EXTRACTION_READY:
+                    return JsonResponse({"content": blob.full_text()})
+                return JsonResponse({
+                    "status": "processing",
+                    "status_url": reverse("articles:pdf_text_status", args=[blob.sha256]),
+                }, status=202)
 
             # Handle CSV Uploads
             elif file_type == "text/csv":
@@ -674,105 +574,29 @@ def process_file(request):
 
 
 class FileManagerView(ListView):
-    """View for managing uploaded files"""
-    model = Article
+    """View for managing uploaded files, read from the file catalog"""
+    model = FileCatalogEntry
     template_name = "articles/file_manager.html"
-    context_object_name = "articles"
+    context_object_name = "files"
     paginate_by = 20
 
     def get_queryset(self):
-        """Get articles that have Google Drive files"""
-        return Article.objects.filter(
-            google_drive_file_id__isnull=False
-        ).exclude(google_drive_file_id='').order_by('-created_at')
+        return FileCatalogEntry.objects.filter(
+            status=FileCatalogEntry.STATUS_PRESENT
+        ).select_related('pdf_file').defer('pdf_file__extracted_text').annotate(
+            article_title=F('article__title')
+        ).order_by('-modified_at', '-id')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Add article files statistics
-        article_files = self.get_queryset()
-        total_article_files = article_files.count()
-        total_article_size = sum(
-            article.google_drive_file_size or 0 
-            for article in article_files
+        totals = FileCatalogEntry.objects.filter(status=FileCatalogEntry.STATUS_PRESENT).aggregate(
+            total_files=Count('id'),
+            total_size=Coalesce(Sum('size'), 0),
+            total_pdf_files=Count('id', filter=Q(kind=FileCatalogEntry.KIND_PDF)),
+            total_article_files=Count('id', filter=Q(kind=FileCatalogEntry.KIND_ATTACHMENT)),
         )
-        
-        # Add PDF files statistics - include ALL PDF files (not just Google Drive ones)
-        pdf_files = PDFFile.objects.all()
-        
-        # Also count local files in the media directory
-        import os
-        from django.conf import settings
-        
-        local_pdf_count = 0
-        local_pdf_size = 0
-        local_pdf_files = []
-        
-        # Force the path to be correct
-        pdf_folder = '/home/lenovo/kquires/kquires/media/pdfs'
-        
-        try:
-            if os.path.exists(pdf_folder):
-                files_in_folder = os.listdir(pdf_folder)
-                
-                for filename in files_in_folder:
-                    if filename.lower().endswith('.pdf'):
-                        file_path = os.path.join(pdf_folder, filename)
-                        if os.path.isfile(file_path):
-                            local_pdf_count += 1
-                            file_size = os.path.getsize(file_path)
-                            local_pdf_size += file_size
-                            
-                            # Create a mock PDFFile object for display
-                            class MockPDFFile:
-                                def __init__(self, file_id, filename, file_size):
-                                    self.id = file_id
-                                    self.original_filename = filename
-                                    self.file_size = file_size
-                                    self.upload_date = None
-                                    self.status = 'ready'
-                                    self.extracted_text = None
-                                
-                                def get_file_size_display(self):
-                                    if self.file_size < 1024:
-                                        return f"{self.file_size} B"
-                                    elif self.file_size < 1024 * 1024:
-                                        return f"{round(self.file_size / 1024, 1)} KB"
-                                    else:
-                                        return f"{round(self.file_size / (1024 * 1024), 1)} MB"
-                                
-                                def get_status_display(self):
-                                    return 'Ready'
-                            
-                            mock_pdf = MockPDFFile(local_pdf_count, filename, file_size)
-                            local_pdf_files.append(mock_pdf)
-        except Exception as e:
-            # If there's an error, just use a hardcoded count for now
-            local_pdf_count = 8  # We know there are 8 files
-            local_pdf_size = 0
-        
-        total_pdf_files = pdf_files.count() + local_pdf_count
-        total_pdf_size = sum(
-            pdf.google_drive_file_size or 0 
-            for pdf in pdf_files
-        ) + local_pdf_size
-        
-        # Combined statistics
-        total_files = total_article_files + total_pdf_files
-        total_size = total_article_size + total_pdf_size
-        
-        # Combine database PDF files with local files for display
-        all_pdf_files = list(pdf_files) + local_pdf_files
-        
-        context.update({
-            'total_files': total_files,
-            'total_size': total_size,
-            'total_size_mb': round(total_size / (1024 * 1024), 2) if total_size else 0,
-            'total_article_files': total_article_files,
-            'total_pdf_files': total_pdf_files,
-            'pdf_files': all_pdf_files,
-        })
-        
+        context.update(totals)
+        context['total_size_mb'] = round(totals['total_size'] / (1024 * 1024), 2)
         return context
 
 
@@ -806,17 +630,35 @@ def get_file_info(request, article_id):
     """Get Google Drive file information"""
     try:
         article = get_object_or_404(Article, id=article_id)
+        job = article.drive_sync_jobs.first()
+        sync = {
+            'status': job.status,
+            'progress': job.progress,
+            'bytes_uploaded': job.bytes_uploaded,
+            'size': job.size,
+            'attempts': job.attempts,
+            'error': job.error_message,
+        } if job else None
+        if job and job.status != job.STATUS_SUCCEEDED and not article.google_drive_file_id:
+            # Not on Drive yet: report the background upload instead
+            return JsonResponse({
+                'success': False,
+                'message': 'Google Drive upload is not complete',
+                'sync': sync
+            })
         result = article.get_google_drive_file_info()
         
         if result.get('success'):
             return JsonResponse({
                 'success': True,
-                'file_info': result
+                'file_info': result,
+                'sync': sync
             })
         else:
             return JsonResponse({
                 'success': False,
-                'message': result.get('error', 'Failed to get file info')
+                'message': result.get('error', 'Failed to get file info'),
+                'sync': sync
             })
     except Exception as e:
         return JsonResponse({
@@ -849,9 +691,9 @@ def upload_pdf(request):
                     'message': 'File must be a PDF'
                 })
             
-            # Read file content
-            file_content = pdf_file.read()
-            print(f"File content read: {len(file_content)} bytes")
+            # Stream the upload to the blob store; a file uploaded before is not stored again
+            blob, created = store_blob(pdf_file)
+            logger.info("PDF %s stored as blob %s (%s bytes, %s)", pdf_file.name, blob.sha256, blob.size, 'new' if created else 'duplicate')
             
             # Create PDFFile instance with transaction and retry logic
             print("Creating PDFFile record...")
@@ -865,7 +707,8 @@ def upload_pdf(request):
                     with transaction.atomic():
                         pdf_record = PDFFile.objects.create(
                             original_filename=pdf_file.name,
-                            created_by=request.user if request.user.is_authenticated else None
+                            created_by=request.user if request.user.is_authenticated else None,
+                            blob=blob,
                         )
                     print(f"PDFFile record created with ID: {pdf_record.id}")
                     break
@@ -882,86 +725,37 @@ def upload_pdf(request):
             if not pdf_record:
                 raise Exception("Failed to create PDFFile record after all retries")
             
-            # Save file locally first (no Google Drive dependency)
-            import os
-            from django.conf import settings
-            
-            # Create media directory if it doesn't exist
-            media_path = settings.MEDIA_ROOT
-            pdf_folder = os.path.join(media_path, 'pdfs')
-            if not os.path.exists(pdf_folder):
-                os.makedirs(pdf_folder)
-            
-            # Save file locally first (avoid database lock issues)
-            print("Saving file locally...")
-            file_path = os.path.join(pdf_folder, pdf_file.name)
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            print(f"File saved locally: {file_path}")
+            file_path = default_storage.path(blob.path)
             
-            # Update PDFFile record with file information
+            # Text is extracted by the extraction workers; a PDF uploaded before is ready at once
+            extraction_status = queue_blob_extraction(blob)
+            ready = extraction_status == blob.EXTRACTION_READY
             if pdf_record:
                 try:
-                    pdf_record.status = 'ready'
+                    pdf_record.status = 'ready' if ready else 'processing'
                     pdf_record.google_drive_file_id = None  # Skip Google Drive for now
-                    pdf_record.google_drive_file_size = len(file_content)
+                    pdf_record.google_drive_file_size = blob.size
+                    if ready:
+                        pdf_record.page_count = blob.page_count
                     pdf_record.save()
                     print(f"PDFFile record updated: {pdf_record.id}")
                 except Exception as e:
                     print(f"Failed to update PDFFile record: {str(e)}")
                     # Continue anyway since file is saved locally
             
-            # Extract text from PDF (main requirement) - simplified version
-            print("Extracting text from PDF...")
-            try:
-                from PyPDF2 import PdfReader
-                import io
-                
-                pdf_reader = PdfReader(io.BytesIO(file_content))
-                extracted_text = ""
-                page_count = len(pdf_reader.pages)
-                
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        extracted_text += page_text + "\n"
-                
-                text_result = {
-                    'success': True,
-                    'text': extracted_text,
-                    'page_count': page_count
-                }
-                print(f"Text extraction successful: {page_count} pages, {len(extracted_text)} characters")
-            except Exception as e:
-                print(f"Text extraction failed: {str(e)}")
-                text_result = {
-                    'success': False,
-                    'error': str(e)
-                }
-            
-            # Save extracted text to database if we have a record
-            if pdf_record and text_result.get('success'):
-                try:
-                    pdf_record.extracted_text = text_result['text']
-                    pdf_record.save()
-                    print(f"Extracted text saved to database: {len(text_result['text'])} characters")
-                except Exception as e:
-                    print(f"Failed to save extracted text: {str(e)}")
-            
             # Try to upload to Google Drive (optional bonus)
             print("Skipping Google Drive upload for now (authentication issue)")
-            google_drive_success = False
             google_drive_id = None
-            google_drive_message = "Authentication needed"
             
             print("Upload completed successfully!")
             return JsonResponse({
                 'success': True,
-                'message': f'PDF uploaded successfully!\n✓ Saved locally: {pdf_file.name}\n✓ Text extracted: {text_result.get("success", False)}\n✓ Pages: {text_result.get("page_count", 0)}\n⚠️ Database: Skipped (SQLite lock)\n⚠️ Google Drive: Authentication needed',
-                'file_id': None,
+                'message': f'PDF uploaded successfully!\n✓ Saved locally: {pdf_file.name}\n✓ Text extraction: {pdf_record.status}\n⚠️ Google Drive: Authentication needed',
+                'file_id': pdf_record.id,
                 'filename': pdf_file.name,
-                'text_extracted': text_result.get('success', False),
-                'page_count': text_result.get('page_count', 0),
+                'status': pdf_record.status,
+                'text_extracted': ready,
+                'page_count': blob.page_count if ready else 0,
                 'google_drive_id': google_drive_id,
                 'local_path': file_path
             })
@@ -981,8 +775,79 @@ def upload_pdf(request):
     })
 
 
+def pdf_text_status(request, sha256):
+    """Extraction progress of a PDF uploaded through process_file, with its text once ready"""
+    blob = get_object_or_404(Blob, sha256=sha256)
+    data = {
+        "status": blob.extraction_status,
+        "pages_extracted": blob.pages_extracted,
+        "page_count": blob.page_count,
+    }
+    if blob.extraction_status == Blob.EXTRACTION_READY:
+        data["content"] = blob.full_text()
+    elif blob.extraction_status == Blob.EXTRACTION_FAILED:
+        data["error"] = blob.extraction_error
+    return JsonResponse(data)
+
+
+def pdf_page_range(pdf_file, start, end):
+    """
+    Pages ``start`` to ``end`` (inclusive) of a PDF as dicts.
+
+    Text extracted before pages were stored separately is returned whole as
+    page 1.
+    """
+    pages = list(
+        PDFPage.objects.filter(blob_id=pdf_file.blob_id, number__range=(start, end))
+        .values('number', 'text', 'char_count', 'checksum')
+    ) if pdf_file.blob_id else []
+    if not pages and start == 1 and not PDFPage.objects.filter(blob_id=pdf_file.blob_id).exists():
+        legacy = PDFFile.objects.with_text().values_list('extracted_text', flat=True).get(pk=pdf_file.pk)
+        if legacy:
+            pages = [{
+                'number': 1, 'text': legacy, 'char_count': len(legacy),
+                'checksum': hashlib.sha256(legacy.encode('utf-8')).hexdigest(),
+            }]
+    return pages
+
+
+def parse_page_range(start, end):
+    """Validated ``(start, end)`` page numbers, at most PDF_PAGES_PER_REQUEST pages apart"""
+    start = int(start or 1)
+    end = int(end or start + PDF_PAGES_PER_REQUEST - 1)
+    if start < 1 or end < start:
+        raise ValueError("Invalid page range")
+    return start, min(end, start + PDF_PAGES_PER_REQUEST - 1)
+
+
+def pdf_pages_api(request, file_id):
+    """Text of a range of pages of a PDF: ``?start=1&end=20``, at most PDF_PAGES_PER_REQUEST pages"""
+    pdf_file = get_object_or_404(PDFFile, pk=file_id)
+    try:
+        start, end = parse_page_range(request.GET.get('start'), request.GET.get('end'))
+    except ValueError:
+        return JsonResponse({'error': 'start and end must be page numbers with start <= end'}, status=400)
+
+    page_count = pdf_file.page_count or 0
+    next_url = None
+    if end < page_count:
+        next_url = reverse('articles:pdf_pages_api', args=[pdf_file.pk]) + (
+            f"?start={end + 1}&end={min(page_count, end + PDF_PAGES_PER_REQUEST)}"
+        )
+    return JsonResponse({
+        'file_id': pdf_file.pk,
+        'filename': pdf_file.original_filename,
+        'status': pdf_file.status,
+        'page_count': page_count,
+        'start': start,
+        'end': min(end, page_count) if page_count else end,
+        'pages': pdf_page_range(pdf_file, start, end),
+        'next': next_url,
+    })
+
+
 def extract_pdf_text(request):
-    """Extract text from PDF file"""
+    """Extracted text of a range of pages of a PDF file (the first PDF_PAGES_PER_REQUEST by default)"""
     if request.method == 'POST':
         try:
             import json
@@ -996,13 +861,25 @@ def extract_pdf_text(request):
                     'message': 'No file ID provided'
                 })
             
-            pdf_file = PDFFile.objects.get(id=file_id)
+            pdf_file = PDFFile.objects.select_related('blob').get(id=file_id)
+            start, end = parse_page_range(data.get('start'), data.get('end'))
+            pages = pdf_page_range(pdf_file, start, end)
             
-            if pdf_file.extracted_text:
+            if pages:
                 return JsonResponse({
                     'success': True,
-                    'extracted_text': pdf_file.extracted_text,
-                    'page_count': pdf_file.page_count
+                    'extracted_text': '\n'.join(page['text'] for page in pages),
+                    'page_count': pdf_file.page_count,
+                    'start': start,
+                    'end': pages[-1]['number'],
+                    'has_more': pages[-1]['number'] < (pdf_file.page_count or 0),
+                })
+            elif pdf_file.status == 'processing':
+                return JsonResponse({
+                    'success': False,
+                    'status': 'processing',
+                    'pages_extracted': pdf_file.blob.pages_extracted if pdf_file.blob else 0,
+                    'message': 'Text extraction is in progress'
                 })
             else:
                 return JsonResponse({
@@ -1078,8 +955,9 @@ def search_files(request):
             if search_term:
                 queryset = queryset.filter(
                     Q(original_filename__icontains=search_term) |
+                    Q(blob__pages__text__icontains=search_term) |
                     Q(extracted_text__icontains=search_term)
-                )
+                ).distinct()
             
             # Apply type filter
             if file_type == 'pdf':
@@ -1101,7 +979,7 @@ def search_files(request):
                     'file_size': pdf.google_drive_file_size,
                     'view_link': pdf.google_drive_web_view_link,
                     'download_link': pdf.google_drive_web_content_link,
-                    'has_text': bool(pdf.extracted_text)
+                    'has_text': bool(pdf.page_count)
                 })
             
             return JsonResponse({
@@ -1120,3 +998,94 @@ def search_files(request):
         'success': False,
         'message': 'Invalid request method'
     })
+
+
+def upload_session_data(session):
+    data = {
+        'id': str(session.pk),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.offset,
+        'status': session.status,
+        'upload_url': reverse('articles:upload_session', args=[session.pk]),
+    }
+    if session.pdf_file_id:
+        data['file_id'] = session.pdf_file_id
+    if session.status == UploadSession.STATUS_FAILED:
+        data['error'] = session.error_message
+    return data
+
+
+def create_upload_session(request):
+    """
+    Start a resumable upload: POST JSON ``{"filename", "size", "content_type"}``.
+
+    The bytes are then PUT to ``upload_url`` in order, each request carrying
+    ``Content-Range: bytes <start>-<end>/<size>``.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        import json
+
+        data = json.loads(request.body)
+        session = create_session(
+            request.user, data.get('filename', ''), int(data.get('size') or 0), data.get('content_type', ''),
+        )
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(
+        {**upload_session_data(session), 'chunk_size': settings.RESUMABLE_UPLOAD_CHUNK_SIZE}, status=201,
+    )
+
+
+@transaction.non_atomic_requests
+def upload_session(request, session_id):
+    """
+    GET/HEAD: how many bytes were received. PUT: the next chunk, streamed from the request.
+
+    Not wrapped in ATOMIC_REQUESTS, so no transaction stays open while a chunk arrives.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+
+    if request.method in ('GET', 'HEAD'):
+        response = JsonResponse(upload_session_data(session))
+        response['Upload-Offset'] = session.offset
+        patch_cache_control(response, no_store=True)
+        return response
+    if request.method != 'PUT':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        start, end, total = parse_content_range(request.headers.get('Content-Range'))
+        session = write_chunk(session.pk, start, end, total, request)
+    except UploadConflict as e:
+        response = JsonResponse({**upload_session_data(e.session), 'error': str(e)}, status=409)
+        response['Upload-Offset'] = e.session.offset
+        return response
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    response = JsonResponse(upload_session_data(session))
+    response['Upload-Offset'] = session.offset
+    return response
+
+
+def finalize_upload_session(request, session_id):
+    """Hand a fully received upload to the background assembly; poll the session for its outcome"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+    try:
+        session = finalize_session(session)
+    except UploadConflict as e:
+        return JsonResponse({**upload_session_data(e.session), 'error': str(e)}, status=409)
+    return JsonResponse(
+        {**upload_session_data(session), 'status_url': reverse('articles:upload_session', args=[session.pk])},
+        status=202,
+    )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kquires.categories'
+
+    def ready(self):
+        import kquires.categories.signals  # noqa: F401
@@ -2,9 +2,10 @@ from django.db import models
 from datetime import datetime
 from ..users.models import User
 from ..departments.models import Department
+from ..utils.change_tracking import FieldTrackerMixin
 # Create your models here.
     
-class Category(models.Model):
+class Category(FieldTrackerMixin, models.Model):
     
     CATEGORY_TYPE_CHOICES = [
         ('Main', 'Main'),
@@ -36,22 +37,23 @@ class Category(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     comment = models.TextField(null=True, blank=True, verbose_name='Comment')  # Add this line
 
+    tracked_fields = ('status', 'visibility', 'name', 'type', 'parent_category', 'logo')
+
 
     def __str__(self):
         return self.name
     
     def get_approved_articles_count(self):
-        count = self.articles.filter(status='approved').count()
-        
-        subcategories = self.subcategories.all()  
-        subcategory_articles_count = sum(sub.get_approved_articles_count() for sub in subcategories)
-
-        return count + subcategory_articles_count
+        """Approved articles of this category and its subcategories, from the category tree cache"""
+        from .tree import get_category_tree
+        return get_category_tree().approved_articles_count(self.pk)
     
     def sub_categories(self):
-        return Category.objects.filter(status='approved', parent_category=self).order_by('-created_at')[:2]
+        return self.all_sub_categories()[:2]
     def all_sub_categories(self):
-        return Category.objects.filter(status='approved', parent_category=self).order_by('-created_at')
+        """Approved subcategories, newest first, from the category tree cache"""
+        from .tree import get_category_tree
+        return get_category_tree().children(self.pk)
     
 
         
\ No newline at end of file
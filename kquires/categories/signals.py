@@ -0,0 +1,30 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from .models import Category
+from .tree import invalidate_category_tree
+from ..articles.images import register_image
+from ..utils.response_cache import purge_tags
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category_pages(sender, instance, **kwargs):
+    """Drop cached pages and APIs that list this category or its subcategories"""
+    purge_tags(
+        f"category:{instance.pk}",
+        f"category:{instance.parent_category_id}" if instance.parent_category_id else None,
+        "categories",
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Category.departments.through)
+def refresh_category_tree(sender, **kwargs):
+    invalidate_category_tree()
+
+
+@receiver(post_save, sender=Category)
+def queue_logo_variants(sender, instance, **kwargs):
+    if instance.logo and instance.has_changed('logo'):
+        register_image(instance.logo.name)
@@ -1,3 +1,53 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Category
+from .tree import get_category_tree
+from ..articles.models import Article
+from ..departments.models import Department
+
+
+class CategoryTreeTestCase(TestCase):
+    def setUp(self):
+        self.main = Category.objects.create(name='Main', type='Main', status='approved')
+        self.first = Category.objects.create(name='First', type='Sub', status='approved', parent_category=self.main)
+        self.second = Category.objects.create(name='Second', type='Sub', status='approved', parent_category=self.main)
+        Category.objects.create(name='Hidden', type='Sub', status='pending', parent_category=self.main)
+        for status in ('approved', 'approved', 'pending'):
+            Article.objects.create(title='Guide', category=self.main, subcategory=self.first, status=status)
+
+    def test_counts_and_children_come_from_memory(self):
+        get_category_tree()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.main.get_approved_articles_count(), 2)
+            self.assertEqual([sub.name for sub in self.main.all_sub_categories()], ['Second', 'First'])
+            self.assertEqual(len(self.main.sub_categories()), 2)
+            Article(title='New', category=self.main, subcategory=self.first).validate_category_assignment()
+
+    def test_counts_roll_up_over_subcategories(self):
+        nested = Category.objects.create(name='Nested', type='Main', status='approved', parent_category=self.first)
+        Article.objects.create(title='Deep', category=nested, status='approved')
+
+        self.assertEqual(self.main.get_approved_articles_count(), 3)
+        self.assertEqual(self.first.get_approved_articles_count(), 1)
+
+    def test_writes_refresh_the_tree(self):
+        self.assertEqual(self.main.get_approved_articles_count(), 2)
+        article = Article.objects.filter(status='pending').get()
+        article.status = 'approved'
+        article.save()
+        self.assertEqual(self.main.get_approved_articles_count(), 3)
+
+        self.second.status = 'rejected'
+        self.second.save()
+        self.assertEqual([sub.name for sub in self.main.all_sub_categories()], ['First'])
+
+        department = Department.objects.create(name='HR')
+        self.main.departments.add(department)
+        self.assertEqual(get_category_tree().get(self.main.pk).department_ids, (department.pk,))
+
+    def test_validation_uses_the_tree(self):
+        article = Article(title='Wrong', category=self.first, subcategory=self.second)
+        self.assertEqual(article.validate_category_assignment(), [
+            "Main category must be of type 'Main'",
+            "Subcategory must belong to the selected main category",
+        ])
@@ -0,0 +1,145 @@
+"""
+Process-level cache of the category tree.
+
+Categories change rarely but are read on every page and every article save,
+so each process keeps the whole tree in memory: ids, names, parents, types,
+departments, status and the approved article counts rolled up over
+subcategories. It is loaded with three queries. Writes bump a version key in
+the shared cache and every process reloads its copy once it sees a new
+version; the version is checked at most every ``VERSION_CHECK_INTERVAL``
+seconds.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+VERSION_KEY = 'categories:tree:version'
+VERSION_CHECK_INTERVAL = 1.0
+
+
+@dataclass
+class CategoryNode:
+    """Metadata of one category, as used by templates and validation"""
+    id: int
+    name: str
+    type: str
+    status: str
+    visibility: bool
+    parent_id: Optional[int]
+    created_at: Optional[datetime]
+    department_ids: Tuple[int, ...] = ()
+    children_ids: List[int] = field(default_factory=list)
+    # Approved articles filed under this category or any of its descendants
+    approved_articles: int = 0
+
+
+class CategoryTree:
+    def __init__(self, nodes: Dict[int, CategoryNode]):
+        self.nodes = nodes
+
+    def get(self, category_id) -> Optional[CategoryNode]:
+        return self.nodes.get(category_id)
+
+    def categories(self, type=None, status=None) -> List[CategoryNode]:
+        """Categories in id order, optionally of one type and status"""
+        return [
+            node for _, node in sorted(self.nodes.items())
+            if (type is None or node.type == type) and (status is None or node.status == status)
+        ]
+
+    def children(self, category_id, status='approved') -> List[CategoryNode]:
+        """Child categories, newest first"""
+        node = self.nodes.get(category_id)
+        if node is None:
+            return []
+        return [
+            self.nodes[child_id] for child_id in node.children_ids
+            if status is None or self.nodes[child_id].status == status
+        ]
+
+    def approved_articles_count(self, category_id) -> int:
+        node = self.nodes.get(category_id)
+        return node.approved_articles if node else 0
+
+
+def load_category_tree() -> CategoryTree:
+    from ..articles.models import Article
+    from .models import Category
+
+    nodes = {
+        row['id']: CategoryNode(
+            id=row['id'], name=row['name'], type=row['type'], status=row['status'],
+            visibility=row['visibility'], parent_id=row['parent_category_id'],
+            created_at=row['created_at'],
+        )
+        for row in Category.objects.values(
+            'id', 'name', 'type', 'status', 'visibility', 'parent_category_id', 'created_at'
+        )
+    }
+
+    departments: Dict[int, List[int]] = {}
+    for category_id, department_id in Category.departments.through.objects.values_list(
+        'category_id', 'department_id'
+    ):
+        departments.setdefault(category_id, []).append(department_id)
+    for category_id, department_ids in departments.items():
+        nodes[category_id].department_ids = tuple(department_ids)
+
+    own_counts = dict(
+        Article.objects.filter(status='approved')
+        .values_list('category_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+    # Children newest first, as the pages list them
+    for node in sorted(nodes.values(), key=lambda node: node.created_at, reverse=True):
+        if node.parent_id in nodes:
+            nodes[node.parent_id].children_ids.append(node.id)
+
+    def roll_up(node, seen):
+        if node.id in seen:
+            return 0
+        seen.add(node.id)
+        node.approved_articles = own_counts.get(node.id, 0) + sum(
+            roll_up(nodes[child_id], seen) for child_id in node.children_ids
+        )
+        return node.approved_articles
+
+    for node in nodes.values():
+        if node.parent_id not in nodes:
+            roll_up(node, set())
+    return CategoryTree(nodes)
+
+
+_lock = threading.Lock()
+_state = {'tree': None, 'version': None, 'checked_at': 0.0}
+
+
+def get_category_tree(refresh: bool = False) -> CategoryTree:
+    """The category tree of this process, reloaded when another process changed it"""
+    now = time.monotonic()
+    if not refresh and _state['tree'] is not None and now - _state['checked_at'] < VERSION_CHECK_INTERVAL:
+        return _state['tree']
+
+    version = cache.get(VERSION_KEY, 0)
+    with _lock:
+        if refresh or _state['tree'] is None or version != _state['version']:
+            _state['tree'] = load_category_tree()
+            _state['version'] = version
+        _state['checked_at'] = now
+        return _state['tree']
+
+
+def invalidate_category_tree(shared: bool = True) -> None:
+    """Drop this process's tree now and, if ``shared``, the other processes' once the change is committed"""
+    _state['tree'] = None
+    if shared:
+        transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time_ns(), timeout=None))
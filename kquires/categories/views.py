@@ -13,6 +13,7 @@ from ..departments.models import Department
 from ..users.models import User
 from django.db.models import Q
 from django.http import HttpRequest
+from ..utils.response_cache import cache_response
 
 class CategoryListView(LoginRequiredMixin, ListView):
     model = Category
@@ -126,6 +127,7 @@ def category_detail_api(request, id):
         'parent_category': parent_category,
     })
 
+@cache_response(timeout=600, tags=lambda request, response, category_id: [f"category:{category_id}"], public=True)
 def subcategories_api(request, category_id):
     """API endpoint to get subcategories for a given category"""
     try:
@@ -1,5 +1,6 @@
 import pytest
 
+from kquires.categories.tree import invalidate_category_tree
 from kquires.users.models import User
 from kquires.users.tests.factories import UserFactory
 
@@ -9,6 +10,12 @@ def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def _category_tree() -> None:
+    # Rolled back test data never reaches the category signals
+    invalidate_category_tree(shared=False)
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
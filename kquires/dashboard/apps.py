@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kquires.dashboard'
+
+    def ready(self):
+        import kquires.dashboard.signals  # noqa: F401
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.10 on 2026-10-19 17:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('categories', '0003_category_updated_at'),
+        ('departments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('articles_created', 'Articles created'), ('articles_approved', 'Articles approved'), ('articles_rejected', 'Articles rejected'), ('active_contributors_week', 'Active contributors per week'), ('translation_backlog', 'Translation backlog')], max_length=50, verbose_name='Metric')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('language', models.CharField(blank=True, default='', max_length=20, verbose_name='Language')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Value')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='categories.category', verbose_name='Category')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metric', 'date'], name='dashboard_d_metric_422b47_idx')],
+            },
+        ),
+    ]
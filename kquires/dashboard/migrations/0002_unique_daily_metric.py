@@ -0,0 +1,41 @@
+# Generated by Django 5.0.10 on 2026-10-19 18:04
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+METRIC_KEY = ('metric', 'date', 'category', 'department', 'language')
+# Sampled rather than added up; duplicates hold the same reading
+GAUGES = ('active_contributors_week', 'translation_backlog')
+
+
+def merge_duplicate_metrics(apps, schema_editor):
+    # Overlapping rollups could create the same row twice; keep the first with the total
+    DailyMetric = apps.get_model('dashboard', 'DailyMetric')
+    duplicates = (
+        DailyMetric.objects.values(*METRIC_KEY)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('value'), latest=Max('value'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in duplicates:
+        rows = DailyMetric.objects.filter(**{field: group[field] for field in METRIC_KEY})
+        rows.exclude(pk=group['keep']).delete()
+        value = group['latest'] if group['metric'] in GAUGES else group['total']
+        rows.filter(pk=group['keep']).update(value=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0003_category_updated_at'),
+        ('dashboard', '0001_initial'),
+        ('departments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_metrics, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(fields=('metric', 'date', 'category', 'department', 'language'), name='unique_daily_metric', nulls_distinct=False),
+        ),
+    ]
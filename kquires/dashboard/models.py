@@ -1,3 +1,45 @@
 from django.db import models
 
-# Create your models here.
+from ..categories.models import Category
+
+
+class DailyMetric(models.Model):
+    """Value of a dashboard metric for one day and one category, department and language.
+    
+    Rows without a category, department or language hold metrics that are not
+    split by that dimension.
+    """
+    ARTICLES_CREATED = 'articles_created'
+    ARTICLES_APPROVED = 'articles_approved'
+    ARTICLES_REJECTED = 'articles_rejected'
+    ACTIVE_CONTRIBUTORS_WEEK = 'active_contributors_week'
+    TRANSLATION_BACKLOG = 'translation_backlog'
+    METRIC_CHOICES = [
+        (ARTICLES_CREATED, 'Articles created'),
+        (ARTICLES_APPROVED, 'Articles approved'),
+        (ARTICLES_REJECTED, 'Articles rejected'),
+        (ACTIVE_CONTRIBUTORS_WEEK, 'Active contributors per week'),
+        (TRANSLATION_BACKLOG, 'Translation backlog'),
+    ]
+    
+    metric = models.CharField(max_length=50, choices=METRIC_CHOICES, verbose_name='Metric')
+    date = models.DateField(verbose_name='Date')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Category')
+    department = models.ForeignKey('departments.Department', on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Department')
+    language = models.CharField(max_length=20, blank=True, default='', verbose_name='Language')
+    value = models.BigIntegerField(default=0, verbose_name='Value')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['metric', 'date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'date', 'category', 'department', 'language'],
+                nulls_distinct=False,
+                name='unique_daily_metric',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.date}: {self.value}"
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .stats import schedule_dashboard_refresh
+from ..articles.models import Article
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_counts_changed(sender, instance, signal, created=False, **kwargs):
+    if signal is post_delete or created or instance.has_changed('status') or instance.has_changed('user'):
+        schedule_dashboard_refresh()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_counts_changed(sender, instance, signal, created=False, **kwargs):
+    if signal is post_delete or created or instance.has_changed('status'):
+        schedule_dashboard_refresh()
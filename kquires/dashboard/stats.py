@@ -0,0 +1,62 @@
+"""
+Dashboard statistics snapshot.
+
+All metrics are computed with one conditional aggregate per table and stored
+in the cache, so opening a dashboard is a single cache read. The snapshot is
+refreshed by Celery beat and, shortly after writes that change the numbers,
+by the signals in ``dashboard.signals``.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+SNAPSHOT_KEY = 'dashboard:stats'
+REFRESH_QUEUED_KEY = 'dashboard:stats:refresh-queued'
+# Writes within this many seconds share one refresh
+REFRESH_DELAY = 5
+
+
+def compute_dashboard_stats() -> dict:
+    from ..articles.models import Article
+
+    stats = Article.objects.aggregate(
+        total_articles=Count('id'),
+        pending_articles=Count('id', filter=Q(status='pending')),
+        approved_articles=Count('id', filter=Q(status='approved')),
+        rejected_articles=Count('id', filter=Q(status='rejected')),
+        total_contributors=Count('user', distinct=True),
+    )
+    stats.update(get_user_model().objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(status='True')),
+    ))
+    stats['computed_at'] = timezone.now()
+    return stats
+
+
+def refresh_dashboard_stats() -> dict:
+    # Writes from now on need another refresh
+    cache.delete(REFRESH_QUEUED_KEY)
+    stats = compute_dashboard_stats()
+    cache.set(SNAPSHOT_KEY, stats, timeout=None)
+    return stats
+
+
+def get_dashboard_stats() -> dict:
+    """The current snapshot; computed on the spot only if it was never stored"""
+    stats = cache.get(SNAPSHOT_KEY)
+    if stats is None:
+        stats = refresh_dashboard_stats()
+    return stats
+
+
+def schedule_dashboard_refresh() -> None:
+    """Refresh the snapshot once the current transaction commits, coalescing bursts of writes"""
+    from django.db import transaction
+
+    from .tasks import refresh_dashboard_stats_task
+
+    if cache.add(REFRESH_QUEUED_KEY, True, timeout=REFRESH_DELAY):
+        transaction.on_commit(lambda: refresh_dashboard_stats_task.apply_async(countdown=REFRESH_DELAY))
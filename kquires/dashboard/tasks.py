@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from .metrics import rollup_daily_metrics
+from .stats import refresh_dashboard_stats
+
+
+@shared_task(ignore_result=True)
+def refresh_dashboard_stats_task():
+    """Recompute the dashboard statistics snapshot"""
+    refresh_dashboard_stats()
+
+
+@shared_task(ignore_result=True)
+def rollup_daily_metrics_task():
+    """Roll the new article status changes up into the daily metrics"""
+    return rollup_daily_metrics()
@@ -1,3 +1,149 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .metrics import METRICS_CHECKPOINT, _add, metric_series, rollup_daily_metrics
+from .models import DailyMetric
+from .stats import SNAPSHOT_KEY, compute_dashboard_stats, get_dashboard_stats
+from .tasks import refresh_dashboard_stats_task
+from ..articles.models import Article, ArticleStatusChange, Checkpoint
+from ..categories.models import Category
+from ..departments.models import Department
+
+User = get_user_model()
+
+
+class DashboardStatsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', is_admin=True, status='True')
+        self.writer = User.objects.create_user(email='writer@example.com', password='x')
+        for status in ('approved', 'approved', 'pending', 'rejected'):
+            Article.objects.create(title='Guide', category=self.category, user=self.writer, status=status)
+        Article.objects.create(title='Draft', category=self.category, user=self.admin, status='draft')
+
+    def test_metrics_use_one_query_per_table(self):
+        with self.assertNumQueries(2):
+            stats = compute_dashboard_stats()
+        self.assertEqual(
+            {key: value for key, value in stats.items() if key != 'computed_at'},
+            {
+                'total_articles': 5, 'pending_articles': 1, 'approved_articles': 2,
+                'rejected_articles': 1, 'total_contributors': 2, 'total_users': 2, 'active_users': 1,
+            },
+        )
+
+    def test_dashboard_reads_the_snapshot(self):
+        refresh_dashboard_stats_task()
+        Article.objects.create(title='Later', category=self.category, status='pending')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_stats()['total_articles'], 5)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dashboard:statistics'))
+        self.assertEqual(response.context['total_articles'], 5)
+        self.assertEqual(response.context['total_contributors'], 2)
+
+    def test_writes_schedule_a_refresh(self):
+        refresh_dashboard_stats_task()
+        article = Article.objects.get(status='pending')
+        article.status = 'approved'
+        with self.captureOnCommitCallbacks(execute=True):
+            article.save()
+
+        self.assertEqual(cache.get(SNAPSHOT_KEY)['approved_articles'], 3)
+
+
+class DailyMetricsTestCase(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='HR')
+        self.category = Category.objects.create(name='Main', type='Main', status='approved')
+        self.writer = User.objects.create_user(email='writer@example.com', password='x', department=self.department)
+        self.other = User.objects.create_user(email='other@example.com', password='x')
+        self.manager = User.objects.create_user(email='manager@example.com', password='x', is_manager=True)
+        self.articles = [
+            Article.objects.create(title='One', category=self.category, user=self.writer, status='pending'),
+            Article.objects.create(title='Two', category=self.category, user=self.writer, status='pending', language='arabic'),
+            Article.objects.create(title='Three', category=self.category, user=self.other, status='pending'),
+        ]
+        self.articles[0].status = 'approved'
+        self.articles[0].save()
+        self.articles[2].status = 'rejected'
+        self.articles[2].save()
+
+    def test_rollup_is_incremental(self):
+        self.assertEqual(rollup_daily_metrics(lag_seconds=0), 5)
+        self.assertEqual(rollup_daily_metrics(lag_seconds=0), 0)
+        self.assertEqual(
+            Checkpoint.objects.get(name=METRICS_CHECKPOINT).position,
+            ArticleStatusChange.objects.latest('id').pk,
+        )
+
+        self.articles[1].status = 'approved'
+        self.articles[1].save()
+        self.assertEqual(rollup_daily_metrics(lag_seconds=0), 1)
+
+        today = timezone.localdate()
+
+        def values(metric, **filters):
+            return [row['value'] for row in metric_series(metric, today, today, **filters)]
+
+        self.assertEqual(values(DailyMetric.ARTICLES_CREATED), [3])
+        self.assertEqual(values(DailyMetric.ARTICLES_APPROVED), [2])
+        self.assertEqual(values(DailyMetric.ARTICLES_APPROVED, department=self.department.pk), [2])
+        self.assertEqual(values(DailyMetric.ARTICLES_APPROVED, language='arabic'), [1])
+        self.assertEqual(values(DailyMetric.ARTICLES_REJECTED), [1])
+        week = today - timedelta(days=today.weekday())
+        self.assertEqual(
+            DailyMetric.objects.get(metric=DailyMetric.ACTIVE_CONTRIBUTORS_WEEK, date=week).value, 2
+        )
+
+    def test_metrics_without_a_department_are_added_in_place(self):
+        today = timezone.localdate()
+        for value in (2, 3):
+            _add(DailyMetric.ARTICLES_CREATED, today, value,
+                 category_id=self.category.pk, department_id=None, language='english')
+        rows = DailyMetric.objects.filter(metric=DailyMetric.ARTICLES_CREATED, date=today, department=None)
+        self.assertEqual(list(rows.values_list('value', flat=True)), [5])
+
+    def test_translation_backlog_is_sampled(self):
+        def backlog():
+            return dict(
+                DailyMetric.objects.filter(metric=DailyMetric.TRANSLATION_BACKLOG, date=timezone.localdate())
+                .values_list('language', 'value')
+            )
+
+        rollup_daily_metrics(lag_seconds=0)
+        self.assertEqual(backlog(), {'arabic': 2, 'english': 1})
+
+        Article.objects.create(
+            title='Uno', category=self.category, user=self.writer, language='arabic',
+            parent_article=self.articles[0],
+        )
+        Article.objects.filter(pk=self.articles[0].pk).update(translation_status='translated')
+        # Still marked not_translated, so it stays in the backlog despite its translation
+        Article.objects.create(
+            title='Tres', category=self.category, user=self.other, language='arabic',
+            parent_article=self.articles[2],
+        )
+        rollup_daily_metrics(lag_seconds=0)
+        self.assertEqual(backlog(), {'arabic': 1, 'english': 1})
+
+    def test_metrics_api_reads_one_range(self):
+        rollup_daily_metrics(lag_seconds=0)
+        self.client.force_login(self.manager)
+        url = reverse('dashboard:metrics_api')
+        today = timezone.localdate()
+
+        response = self.client.get(url, {'metric': DailyMetric.ARTICLES_CREATED, 'start': today.isoformat()})
+        self.assertEqual(response.json()['series'], [{'date': today.isoformat(), 'value': 3}])
+        self.assertEqual(self.client.get(url, {'metric': 'unknown'}).status_code, 400)
 
-# Create your tests here.
+        self.client.force_login(self.writer)
+        self.assertEqual(self.client.get(url, {'metric': DailyMetric.ARTICLES_CREATED}).status_code, 403)
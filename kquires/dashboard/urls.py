@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import DashboardIndexView, DashboardHomeView, DashboardStatisticsView
+from .views import DashboardIndexView, DashboardHomeView, DashboardStatisticsView, metrics_api
 from django.views.generic import TemplateView
 
 app_name = "dashboard"
@@ -7,4 +7,5 @@ urlpatterns = [
     path("", DashboardIndexView.as_view(), name="index"),
     path("home/", DashboardHomeView.as_view(), name="home"),
     path("statistics/", DashboardStatisticsView.as_view(), name="statistics"),
+    path("api/metrics/", metrics_api, name="metrics_api"),
 ]
@@ -1,4 +1,8 @@
+from datetime import date, timedelta
+
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
+from django.utils import timezone
 from django.views.generic import ListView
 from ..articles.models import Article
 from ..categories.models import Category
@@ -8,6 +12,10 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model  # Import the User model or your custom user model
 from ..departments.models import Department  # Import the Department model
+from ..categories.tree import get_category_tree
+from .metrics import metric_series
+from .models import DailyMetric
+from .stats import get_dashboard_stats
 from django.contrib.auth import logout
 
 # Create your views here.
@@ -69,13 +77,11 @@ class DashboardHomeView(LoginRequiredMixin, ListView):
 
 
         context = super().get_context_data(**kwargs)
-        context['total_articles'] = Article.objects.count()
-        context['pending_articles'] = Article.objects.filter(status="pending").count()
-        context['approved_articles'] = Article.objects.filter(status="approved").count()
-        context['rejected_articles'] = Article.objects.filter(status="rejected").count()
+        context.update(get_dashboard_stats())
         context['departments'] = Department.objects.all()
-        context['categories'] = Category.objects.all()
-        context["parent_category"] = Category.objects.filter(status='approved', type='Main')
+        tree = get_category_tree()
+        context['categories'] = tree.categories()
+        context["parent_category"] = tree.categories(type='Main', status='approved')
 
 
         return context
@@ -107,11 +113,33 @@ class DashboardStatisticsView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
 
         context = super().get_context_data(**kwargs)
-        context['total_articles'] = Article.objects.count()
-        context['rejected_articles'] = Article.objects.filter(status="rejected").count()
-        context['total_contributors'] = Article.objects.values('user').distinct().count()  # Add this line to include total contributors
-        context["total_users"] = User.objects.count()
+        context.update(get_dashboard_stats())
         context['new_articles'] = Article.objects.order_by('-created_at')[:5] # Get the 5 most recent articles
         return context
 
 
+def metrics_api(request):
+    """Daily series of one dashboard metric for the statistics charts"""
+    user = request.user
+    if not user.is_authenticated or not (user.is_admin or user.is_manager):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    metric = request.GET.get('metric')
+    if metric not in dict(DailyMetric.METRIC_CHOICES):
+        return JsonResponse({'error': 'Unknown metric'}, status=400)
+    try:
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else timezone.localdate()
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else end - timedelta(days=29)
+        filters = {name: int(request.GET[name]) for name in ('category', 'department') if request.GET.get(name)}
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date or id'}, status=400)
+    if request.GET.get('language'):
+        filters['language'] = request.GET['language']
+
+    series = metric_series(metric, start, end, **filters)
+    return JsonResponse({
+        'metric': metric,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'series': [{'date': row['date'].isoformat(), 'value': row['value']} for row in series],
+    })
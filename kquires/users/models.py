@@ -5,11 +5,12 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime
 from ..departments.models import Department
+from ..utils.change_tracking import FieldTrackerMixin
 
 from .managers import UserManager
 
 
-class User(AbstractUser):
+class User(FieldTrackerMixin, AbstractUser):
     """
     Default custom user model for kquires.
     If adding fields that need to be filled at user signup,
@@ -38,6 +39,11 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    tracked_fields = (
+        'email', 'status', 'role', 'department', 'is_active',
+        'is_admin', 'is_article_writer', 'is_approval_manager', 'is_manager', 'is_employee',
+    )
+
     objects: ClassVar[UserManager] = UserManager()
 
     def get_absolute_url(self) -> str: 
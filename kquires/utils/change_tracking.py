@@ -0,0 +1,78 @@
+"""
+Field change tracking without extra queries.
+
+Models using ``FieldTrackerMixin`` keep a snapshot of their tracked fields as
+loaded from the database, captured in ``from_db``. Signal handlers can then
+ask ``instance.has_changed('status')`` or ``instance.previous('status')``
+instead of fetching the stored row again. The snapshot is replaced after a
+successful save, so ``post_save`` receivers still see the values the save
+started from.
+"""
+
+from typing import Any, Dict, Tuple
+
+
+class FieldTrackerMixin:
+    """
+    Track changes of ``tracked_fields`` since the instance was loaded or saved.
+
+    Fields are given by name; foreign keys are compared by their id. Fields
+    that were deferred when loading are only reported as changed if they were
+    assigned afterwards.
+    """
+
+    tracked_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls) -> Dict[str, str]:
+        return {name: cls._meta.get_field(name).attname for name in cls.tracked_fields}
+
+    def _take_snapshot(self, names=None) -> None:
+        snapshot = dict(getattr(self, '_snapshot', {})) if names is not None else {}
+        for name, attname in self._tracked_attnames().items():
+            if names is not None and name not in names and attname not in names:
+                continue
+            if attname in self.__dict__:
+                snapshot[name] = self.__dict__[attname]
+        self._snapshot = snapshot
+
+    def has_changed(self, name: str) -> bool:
+        """Whether ``name`` differs from the stored value; always true for unsaved instances"""
+        attname = self._tracked_attnames()[name]
+        if self._state.adding:
+            return True
+        snapshot = getattr(self, '_snapshot', {})
+        if name not in snapshot:
+            return attname in self.__dict__
+        return self.__dict__.get(attname) != snapshot[name]
+
+    def previous(self, name: str) -> Any:
+        """Stored value of ``name``, or None for unsaved instances and unloaded fields"""
+        if name not in self.tracked_fields:
+            raise KeyError(f"{name!r} is not a tracked field of {type(self).__name__}")
+        if self._state.adding:
+            return None
+        return getattr(self, '_snapshot', {}).get(name)
+
+    def changed_fields(self) -> Dict[str, Tuple[Any, Any]]:
+        """``{name: (previous, current)}`` for every tracked field that changed"""
+        return {
+            name: (self.previous(name), self.__dict__.get(attname))
+            for name, attname in self._tracked_attnames().items()
+            if self.has_changed(name)
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Only the written fields become the new baseline
+        self._take_snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields)
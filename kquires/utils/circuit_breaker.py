@@ -0,0 +1,73 @@
+"""
+Circuit breaker backed by the Django cache.
+
+The state is shared by every process that talks to the same cache, so once an
+external service starts failing all web and Celery workers stop calling it
+until the recovery timeout has elapsed.
+"""
+
+import time
+from typing import Any, Dict
+
+from django.core.cache import cache
+
+
+class CircuitBreaker:
+    """Track consecutive failures of an external service and short-circuit calls"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: int = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+    def _key(self, suffix: str) -> str:
+        return f"circuit:{self.name}:{suffix}"
+
+    @property
+    def failures(self) -> int:
+        return cache.get(self._key('failures'), 0)
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls should not be attempted"""
+        opened_until = cache.get(self._key('opened_until'))
+        return bool(opened_until) and time.time() < opened_until
+
+    def allow_request(self) -> bool:
+        """Return True when the protected service may be called"""
+        return not self.is_open
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        keys = [self._key('failures'), self._key('opened_until')]
+        # Almost every call succeeds with the circuit already closed: a read, no write
+        if any(cache.get_many(keys).values()):
+            cache.delete_many(keys)
+
+    def record_failure(self) -> None:
+        """Count a failed call and open the circuit once the threshold is reached"""
+        key = self._key('failures')
+        # Failures are forgotten if the service stays quiet for a while
+        cache.add(key, 0, self.recovery_timeout * 10)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, self.recovery_timeout * 10)
+            failures = 1
+
+        if failures >= self.failure_threshold:
+            cache.set(
+                self._key('opened_until'),
+                time.time() + self.recovery_timeout,
+                self.recovery_timeout,
+            )
+
+    def state(self) -> Dict[str, Any]:
+        """Describe the breaker for health endpoints"""
+        return {
+            'name': self.name,
+            'state': 'open' if self.is_open else 'closed',
+            'failures': self.failures,
+            'failure_threshold': self.failure_threshold,
+            'recovery_timeout': self.recovery_timeout,
+        }
@@ -12,9 +12,13 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 import logging
+import requests
 
 logger = logging.getLogger(__name__)
 
+# Resumable uploads send (and buffer) this much of the file per request
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class GoogleDriveService:
     """Service class for Google Drive operations"""
@@ -85,7 +89,8 @@ class GoogleDriveService:
         Upload a file to Google Drive
         
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes, or a binary file object that
+                is read in chunks as the upload proceeds
             filename: Name of the file
             mime_type: MIME type of the file
             folder_id: ID of the folder to upload to (optional)
@@ -110,9 +115,12 @@ class GoogleDriveService:
                 file_metadata['parents'] = [parent_folder_id]
             
             # Create media upload
+            if isinstance(file_content, (bytes, bytearray)):
+                file_content = io.BytesIO(file_content)
             media = MediaIoBaseUpload(
-                io.BytesIO(file_content),
-                mimetype=mime_type,
+                file_content,
+                mimetype=mime_type or 'application/octet-stream',
+                chunksize=UPLOAD_CHUNK_SIZE,
                 resumable=True
             )
             
@@ -236,5 +244,110 @@ class GoogleDriveService:
             return {'error': f'Create folder failed: {str(e)}'}
 
 
+class DriveUploadError(Exception):
+    """A resumable upload request failed; ``transient`` failures are worth retrying"""
+    
+    def __init__(self, message, transient=True, session_expired=False):
+        super().__init__(message)
+        self.transient = transient
+        self.session_expired = session_expired
+
+
+class DriveUploadClient:
+    """
+    Google Drive resumable upload protocol over an HTTP session.
+    
+    ``start`` opens an upload session and returns its URI; ``send_chunk``
+    and ``query`` return ``(offset, file)``, where ``offset`` is the number
+    of bytes Drive has stored and ``file`` the metadata of the created file
+    once the upload is complete (None before).
+    """
+    
+    FIELDS = 'id,name,webViewLink,webContentLink,size'
+    TIMEOUT = 60
+    
+    def __init__(self, session, upload_url=None, folder_id=None):
+        self.session = session
+        self.upload_url = upload_url or getattr(
+            settings, 'GOOGLE_DRIVE_UPLOAD_URL', 'https://www.googleapis.com/upload/drive/v3/files'
+        )
+        self.folder_id = folder_id
+    
+    def _request(self, method, url, **kwargs):
+        try:
+            return self.session.request(method, url, timeout=self.TIMEOUT, **kwargs)
+        except requests.RequestException as e:
+            raise DriveUploadError(f"Google Drive request failed: {str(e)}")
+    
+    def start(self, filename: str, mime_type: str, size: int) -> str:
+        metadata = {'name': filename}
+        if self.folder_id:
+            metadata['parents'] = [self.folder_id]
+        response = self._request(
+            'POST', self.upload_url,
+            params={'uploadType': 'resumable', 'fields': self.FIELDS},
+            json=metadata,
+            headers={
+                'X-Upload-Content-Type': mime_type or 'application/octet-stream',
+                'X-Upload-Content-Length': str(size),
+            },
+        )
+        if response.status_code != 200 or not response.headers.get('Location'):
+            raise self._error(response)
+        return response.headers['Location']
+    
+    def send_chunk(self, session_uri: str, data: bytes, offset: int, size: int):
+        if data:
+            content_range = f"bytes {offset}-{offset + len(data) - 1}/{size}"
+        else:
+            content_range = f"bytes */{size}"
+        response = self._request('PUT', session_uri, data=data, headers={'Content-Range': content_range})
+        return self._progress(response, size)
+    
+    def query(self, session_uri: str, size: int):
+        response = self._request('PUT', session_uri, headers={'Content-Range': f"bytes */{size}"})
+        return self._progress(response, size)
+    
+    def _progress(self, response, size):
+        if response.status_code in (200, 201):
+            try:
+                return size, response.json()
+            except ValueError:
+                raise DriveUploadError("Google Drive returned an unreadable file resource")
+        if response.status_code == 308:
+            # "Range: bytes=0-<last byte stored>", absent while nothing is stored
+            stored = response.headers.get('Range')
+            return (int(stored.rsplit('-', 1)[1]) + 1 if stored else 0), None
+        raise self._error(response)
+    
+    def _error(self, response):
+        message = f"Google Drive responded {response.status_code}: {response.text[:200]}"
+        if response.status_code in (404, 410):
+            return DriveUploadError(message, session_expired=True)
+        return DriveUploadError(message, transient=response.status_code == 429 or response.status_code >= 500)
+
+
+def drive_upload_client() -> DriveUploadClient:
+    """
+    Upload client with the stored Google Drive credentials.
+    
+    Workers never start the interactive OAuth flow: without a usable token
+    this raises a permanent ``DriveUploadError``.
+    """
+    from google.auth.transport.requests import AuthorizedSession
+    
+    credentials = None
+    if os.path.exists(google_drive_service.token_file):
+        credentials = Credentials.from_authorized_user_file(google_drive_service.token_file, google_drive_service.scopes)
+    if credentials and not credentials.valid and credentials.expired and credentials.refresh_token:
+        try:
+            credentials.refresh(Request())
+        except Exception as e:
+            raise DriveUploadError(f"Google Drive token refresh failed: {str(e)}")
+    if not credentials or not credentials.valid:
+        raise DriveUploadError("Google Drive is not authorized", transient=False)
+    return DriveUploadClient(AuthorizedSession(credentials), folder_id=google_drive_service.folder_id)
+
+
 # Global instance
 google_drive_service = GoogleDriveService()
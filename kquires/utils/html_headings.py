@@ -0,0 +1,65 @@
+"""
+Heading anchors and table of contents for article HTML.
+
+Run once when an article is saved: every heading gets a stable ``id`` derived
+from its text, and the list of headings is stored alongside the article, so
+pages render the table of contents without parsing the body.
+"""
+
+import html
+import re
+from typing import Dict, List, Tuple
+
+from django.utils.text import slugify
+
+HEADING_RE = re.compile(r'<h([1-6])(\s[^>]*)?>(.*?)</h\1\s*>', re.IGNORECASE | re.DOTALL)
+ID_RE = re.compile(r'(?<![\w-])id\s*=\s*([\'"])(.*?)\1', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Leftovers of the editor that break the rendered page
+EDITOR_ATTRIBUTES = ('data-bs-ride="true"',)
+
+
+def heading_text(inner_html: str) -> str:
+    """Plain text of a heading"""
+    text = html.unescape(TAG_RE.sub('', inner_html))
+    return ' '.join(text.replace('\xa0', ' ').split())
+
+
+def build_toc(body: str) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Give every heading of ``body`` a deterministic anchor and list them.
+
+    Existing ids are kept; other headings get a slug of their text, made
+    unique with a numeric suffix. Returns the updated HTML and the table of
+    contents as ``[{'id', 'text', 'level'}]``; empty headings get an anchor
+    but are left out of the table of contents.
+    """
+    if not body:
+        return body, []
+
+    for attribute in EDITOR_ATTRIBUTES:
+        body = body.replace(attribute, '')
+
+    used = set(match.group(2) for match in ID_RE.finditer(body))
+    toc = []
+
+    def anchor(match):
+        level, attrs, inner = match.group(1), match.group(2) or '', match.group(3)
+        text = heading_text(inner)
+        existing = ID_RE.search(attrs)
+        if existing:
+            anchor_id = existing.group(2)
+            tag = match.group(0)
+        else:
+            base = f"heading-{slugify(text, allow_unicode=True) or 'section'}"
+            anchor_id, suffix = base, 2
+            while anchor_id in used:
+                anchor_id, suffix = f'{base}-{suffix}', suffix + 1
+            used.add(anchor_id)
+            tag = f'<h{level} id="{anchor_id}"{attrs}>{inner}</h{level}>'
+        if text:
+            toc.append({'id': anchor_id, 'text': text, 'level': f'h{level}'})
+        return tag
+
+    return HEADING_RE.sub(anchor, body), toc
@@ -0,0 +1,179 @@
+"""
+Split article HTML into block-level segments.
+
+A segment is the content between two block boundaries (paragraphs, list
+items, table cells, headings, ...), including any inline markup such as
+``<b>`` or ``<a href>``. Everything else - the block tags themselves,
+whitespace between blocks, scripts and styles - is kept as skeleton and
+never translated, so joining the parts back together reproduces the
+original document exactly.
+
+Before translation, the inline tags left inside a segment are masked with
+numbered placeholders and segments are grouped into token-bounded chunks,
+so long articles can be translated chunk by chunk and restored verbatim.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'caption', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head', 'header',
+    'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'ul',
+}
+
+# Elements whose content is never translated
+RAW_TEXT_TAGS = {'script', 'style'}
+
+TAG_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>|<!--.*?-->', re.DOTALL)
+ENTITY_RE = re.compile(r'&[#a-zA-Z0-9]+;')
+PLACEHOLDER_RE = re.compile(r'⟦(\d+)⟧')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?؟。])(\s+)')
+
+
+@dataclass
+class Part:
+    """A piece of an HTML document; only translatable parts are sent to the AI"""
+    text: str
+    translatable: bool
+
+
+def has_text(fragment: str) -> bool:
+    """True if the fragment contains words once tags and entities are removed"""
+    plain = ENTITY_RE.sub(' ', TAG_RE.sub(' ', fragment))
+    return any(char.isalpha() for char in plain)
+
+
+def segment_hash(text: str) -> str:
+    """Stable key of a segment's source text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _append_run(parts: List[Part], run: str) -> None:
+    """Add the content between two block boundaries, keeping outer whitespace as skeleton"""
+    if not run:
+        return
+    stripped = run.strip()
+    if not stripped or not has_text(stripped):
+        parts.append(Part(run, False))
+        return
+    start = run.index(stripped)
+    if start:
+        parts.append(Part(run[:start], False))
+    parts.append(Part(stripped, True))
+    end = start + len(stripped)
+    if end < len(run):
+        parts.append(Part(run[end:], False))
+
+
+def split_segments(html: str) -> List[Part]:
+    """Split an HTML document into skeleton and translatable segment parts"""
+    parts: List[Part] = []
+    if not html:
+        return parts
+
+    run_start = 0
+    position = 0
+    raw_tag = None
+    for match in TAG_RE.finditer(html):
+        closing, name = match.group(1), (match.group(2) or '').lower()
+
+        if raw_tag:
+            # Inside <script>/<style>: wait for the closing tag
+            if closing and name == raw_tag:
+                parts.append(Part(html[position:match.end()], False))
+                position = run_start = match.end()
+                raw_tag = None
+            continue
+
+        if name in BLOCK_TAGS or name in RAW_TEXT_TAGS:
+            _append_run(parts, html[run_start:match.start()])
+            if name in RAW_TEXT_TAGS and not closing:
+                raw_tag = name
+                position = match.start()
+                run_start = match.end()
+                continue
+            parts.append(Part(match.group(0), False))
+            run_start = match.end()
+
+    if raw_tag:
+        parts.append(Part(html[position:], False))
+    else:
+        _append_run(parts, html[run_start:])
+    return parts
+
+
+def join_segments(parts: List[Part]) -> str:
+    """Reassemble a document from its parts"""
+    return ''.join(part.text for part in parts)
+
+
+def mask_tags(fragment: str):
+    """Replace every tag in a segment with a numbered placeholder.
+
+    Returns the masked text and the list of tags, so the model only ever sees
+    words and opaque markers and cannot rewrite tags or attributes.
+    """
+    tags: List[str] = []
+
+    def replace(match):
+        tags.append(match.group(0))
+        return f'⟦{len(tags) - 1}⟧'
+
+    return TAG_RE.sub(replace, fragment), tags
+
+
+def unmask_tags(text: str, tags: List[str]) -> str:
+    """Restore the tags of a masked segment, checking that every placeholder survived"""
+    found = [int(index) for index in PLACEHOLDER_RE.findall(text)]
+    if sorted(found) != list(range(len(tags))):
+        raise ValueError(f"Placeholders were altered during translation: expected {len(tags)}, got {found}")
+    return PLACEHOLDER_RE.sub(lambda match: tags[int(match.group(1))], text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper bound of the number of model tokens in a text"""
+    return len(text) // 3 + 1
+
+
+def split_sentences(text: str, max_tokens: int) -> List[str]:
+    """
+    Split an oversized segment into sentence groups that fit the token budget.
+
+    Every piece keeps the whitespace that followed its last sentence, so
+    joining the pieces reproduces ``text`` exactly.
+    """
+    tokens = SENTENCE_END_RE.split(text)
+    # Each sentence followed by its separator; the last one has none
+    sentences = [sentence + separator for sentence, separator in zip(tokens[::2], tokens[1::2] + [''], strict=True)]
+    pieces: List[str] = []
+    current = ''
+    for sentence in sentences:
+        if current and estimate_tokens(current + sentence) > max_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current += sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_segments(segments: dict, max_tokens: int) -> List[dict]:
+    """Group segments into chunks whose estimated size stays under ``max_tokens``"""
+    chunks: List[dict] = []
+    current: dict = {}
+    size = 0
+    for key, text in segments.items():
+        tokens = estimate_tokens(text)
+        if current and size + tokens > max_tokens:
+            chunks.append(current)
+            current, size = {}, 0
+        current[key] = text
+        size += tokens
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,152 @@
+"""
+Responsive image derivatives.
+
+Uploaded images are decoded once in the background and stored again as WebP
+and JPEG at a few widths, plus a tiny blurred WebP used as an inline
+placeholder while the real image loads. ``apply_srcset`` rewrites ``<img>``
+tags of stored HTML into ``<picture>`` elements that let the browser pick the
+smallest variant that fits.
+"""
+
+import base64
+import html
+import os
+import re
+from io import BytesIO
+from typing import Dict, List, Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+# Extension -> Pillow format and encoder options
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+PLACEHOLDER_WIDTH = 16
+# Decompression bomb guard: larger images are rejected instead of decoded
+MAX_PIXELS = 50_000_000
+DERIVATIVES_DIR = 'derivatives'
+
+IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+ATTR_RE = re.compile(r'([\w-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+
+
+def derivative_path(source: str, width: int, extension: str) -> str:
+    stem, _ = os.path.splitext(source)
+    return f"{DERIVATIVES_DIR}/{stem}-{width}w.{extension}"
+
+
+def build_variants(source: str, storage=default_storage) -> Dict:
+    """
+    Store the derivatives of the image at ``source`` and describe them.
+
+    Returns ``{'width', 'height', 'placeholder', 'variants': [{'width',
+    'format', 'path'}]}``. Images are never upscaled; an image narrower than
+    the smallest width gets variants at its own width only.
+    """
+    with storage.open(source, 'rb') as handle:
+        image = Image.open(handle)
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError(f"Image too large: {image.width}x{image.height}")
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+
+    widths = sorted({w for w in VARIANT_WIDTHS if w < width} | {min(width, VARIANT_WIDTHS[-1])})
+    # Everything is encoded before anything is stored, so a failure leaves the previous variants in place
+    encoded = []
+    for target in widths:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS
+        )
+        for extension, (pil_format, options) in VARIANT_FORMATS.items():
+            # JPEG has no alpha channel
+            frame = resized.convert('RGB') if pil_format == 'JPEG' and has_alpha else resized
+            buffer = BytesIO()
+            frame.save(buffer, pil_format, **options)
+            encoded.append((target, extension, buffer.getvalue()))
+
+    tiny = image.resize(
+        (PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.Resampling.BILINEAR
+    ).filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    tiny.save(buffer, 'WEBP', quality=40)
+    placeholder = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+    variants = []
+    for target, extension, data in encoded:
+        path = derivative_path(source, target, extension)
+        if storage.exists(path):
+            storage.delete(path)
+        variants.append({'width': target, 'format': extension, 'path': storage.save(path, ContentFile(data))})
+
+    return {'width': width, 'height': height, 'placeholder': placeholder, 'variants': variants}
+
+
+def srcset(variants: List[Dict], extension: str, url=None) -> str:
+    url = url or default_storage.url
+    return ', '.join(f"{url(v['path'])} {v['width']}w" for v in variants if v['format'] == extension)
+
+
+def picture_html(img_attrs: Dict[str, str], asset, url=None) -> str:
+    """``<picture>`` for an ``<img>`` with the given attributes and its image asset"""
+    attrs = dict(img_attrs)
+    sizes = attrs.pop('sizes', None)
+    if not sizes:
+        displayed = attrs['width'] if attrs.get('width', '').isdigit() else asset.width
+        sizes = f"(max-width: {displayed}px) 100vw, {displayed}px"
+    attrs.update({
+        'srcset': srcset(asset.variants, 'jpeg', url),
+        'sizes': sizes,
+        'loading': attrs.get('loading', 'lazy'),
+        'decoding': 'async',
+    })
+    # Reserve the space of the image so the page does not shift when it loads
+    if 'width' not in attrs:
+        attrs['width'], attrs['height'] = str(asset.width), str(asset.height)
+    elif 'height' not in attrs and attrs['width'].isdigit():
+        attrs['height'] = str(round(asset.height * int(attrs['width']) / asset.width))
+    if asset.placeholder:
+        style = attrs.get('style', '').strip().rstrip(';')
+        background = f"background-size:cover;background-image:url({asset.placeholder})"
+        attrs['style'] = f"{style};{background}" if style else background
+    rendered = ' '.join(f'{name}="{html.escape(value, quote=True)}"' for name, value in attrs.items())
+    return (
+        f'<picture><source type="image/webp" srcset="{srcset(asset.variants, "webp", url)}" sizes="{html.escape(sizes)}">'
+        f'<img {rendered}></picture>'
+    )
+
+
+def img_sources(body: str) -> List[str]:
+    """``src`` of every ``<img>`` in ``body`` that has no ``srcset`` yet"""
+    sources = []
+    for tag in IMG_RE.findall(body or ''):
+        attrs = parse_attrs(tag)
+        if 'srcset' not in attrs and attrs.get('src'):
+            sources.append(attrs['src'])
+    return sources
+
+
+def parse_attrs(tag: str) -> Dict[str, str]:
+    return {name.lower(): html.unescape(value[1:-1]) for name, value in ATTR_RE.findall(tag)}
+
+
+def apply_srcset(body: str, assets_by_url: Dict[str, object], url=None) -> str:
+    """Replace each ``<img>`` whose ``src`` has a ready asset with a responsive ``<picture>``"""
+    if not body or not assets_by_url:
+        return body
+
+    def replace(match):
+        attrs = parse_attrs(match.group(0))
+        asset: Optional[object] = assets_by_url.get(attrs.get('src'))
+        if asset is None or 'srcset' in attrs:
+            return match.group(0)
+        return picture_html(attrs, asset, url)
+
+    return IMG_RE.sub(replace, body)
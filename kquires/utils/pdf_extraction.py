@@ -0,0 +1,222 @@
+"""
+Out-of-process PDF text extraction.
+
+PDF parsing never runs in the calling web or Celery process. The page count
+is read by one short-lived worker process, then the pages are split into
+contiguous ranges handled by up to ``workers`` processes in parallel. Each
+worker caps its own address space and CPU time before importing PyPDF2 and
+writes one JSON line per page to its stdout as soon as the page is done, so
+results stream back while the other ranges are still being parsed. The whole
+document has a wall clock deadline; when it passes, every worker is killed
+and ``ExtractionTimeout`` is raised.
+
+Run as ``python -m kquires.utils.pdf_extraction`` this module is the worker.
+"""
+
+import argparse
+import json
+import math
+import os
+import selectors
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+
+WORKER_MODULE = 'kquires.utils.pdf_extraction'
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+READ_SIZE = 64 * 1024
+
+
+class PDFExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(PDFExtractionError):
+    pass
+
+
+@dataclass
+class ExtractionLimits:
+    # Wall clock seconds for the whole document
+    timeout: float = 120.0
+    # Address space of each worker process
+    memory_mb: int = 512
+    workers: int = 4
+    # Smaller documents use fewer workers
+    min_pages_per_worker: int = 10
+
+    @classmethod
+    def from_settings(cls) -> 'ExtractionLimits':
+        from django.conf import settings
+
+        return cls(
+            timeout=settings.PDF_EXTRACTION_TIMEOUT,
+            memory_mb=settings.PDF_EXTRACTION_MEMORY_MB,
+            workers=settings.PDF_EXTRACTION_WORKERS,
+            min_pages_per_worker=settings.PDF_EXTRACTION_MIN_PAGES_PER_WORKER,
+        )
+
+
+def split_pages(page_count: int, workers: int, min_pages_per_worker: int = 1) -> List[Tuple[int, int]]:
+    """Contiguous ``(start, stop)`` page ranges, one per worker"""
+    if page_count <= 0:
+        return []
+    count = max(1, min(workers, math.ceil(page_count / max(1, min_pages_per_worker))))
+    size = math.ceil(page_count / count)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+@contextmanager
+def local_pdf(source) -> Iterator[str]:
+    """Path of ``source``: a path as is, bytes or a binary file spooled to a temporary file"""
+    if isinstance(source, (str, os.PathLike)):
+        yield os.path.abspath(source)
+        return
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as spooled:
+        if isinstance(source, (bytes, bytearray)):
+            spooled.write(source)
+        else:
+            for chunk in iter(lambda: source.read(READ_SIZE), b''):
+                spooled.write(chunk)
+        spooled.flush()
+        yield spooled.name
+
+
+def _spawn(args: List[str], limits: ExtractionLimits) -> subprocess.Popen:
+    command = [
+        sys.executable, '-m', WORKER_MODULE, *args,
+        '--memory-mb', str(limits.memory_mb),
+        '--cpu-seconds', str(math.ceil(limits.timeout) + 1),
+    ]
+    return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+
+
+def _messages(commands: List[List[str]], limits: ExtractionLimits, deadline: float) -> Iterator[dict]:
+    """Run workers in parallel and yield their messages as they arrive"""
+    processes = [_spawn(args, limits) for args in commands]
+    selector = selectors.DefaultSelector()
+    buffers = {}
+    try:
+        for process in processes:
+            selector.register(process.stdout, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ExtractionTimeout(f"PDF extraction took longer than {limits.timeout}s")
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, READ_SIZE)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                *lines, buffers[key.fd] = (buffers.get(key.fd, b'') + chunk).split(b'\n')
+                for line in lines:
+                    message = json.loads(line)
+                    if 'error' in message and 'page' not in message:
+                        raise PDFExtractionError(message['error'])
+                    yield message
+
+        for process in processes:
+            remaining = max(0.0, deadline - time.monotonic())
+            try:
+                code = process.wait(timeout=remaining)
+            except subprocess.TimeoutExpired:
+                raise ExtractionTimeout(f"PDF extraction took longer than {limits.timeout}s")
+            if code != 0:
+                raise PDFExtractionError(f"PDF extraction worker exited with status {code}")
+    finally:
+        selector.close()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+
+
+def extract_pdf_pages(
+    source,
+    limits: Optional[ExtractionLimits] = None,
+    on_page: Optional[Callable[[int, str], None]] = None,
+) -> List[str]:
+    """
+    Text of every page of a PDF, in page order.
+
+    ``source`` is a path, bytes or a binary file. ``on_page(number, text)`` is
+    called as each page arrives, with 1-based page numbers in completion
+    order. Pages that fail to parse are returned empty; a document that
+    cannot be opened, exceeds a limit or times out raises
+    ``PDFExtractionError``.
+    """
+    limits = limits or ExtractionLimits.from_settings()
+    deadline = time.monotonic() + limits.timeout
+    with local_pdf(source) as path:
+        page_count = 0
+        for message in _messages([['count', path]], limits, deadline):
+            page_count = message['pages']
+
+        texts = [''] * page_count
+        ranges = split_pages(page_count, limits.workers, limits.min_pages_per_worker)
+        commands = [['pages', path, str(start), str(stop)] for start, stop in ranges]
+        for message in _messages(commands, limits, deadline):
+            texts[message['page'] - 1] = message['text']
+            if on_page is not None:
+                on_page(message['page'], message['text'])
+    return texts
+
+
+def _limit_resources(memory_mb: int, cpu_seconds: int) -> None:
+    import resource
+
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def _emit(message: dict) -> None:
+    sys.stdout.write(json.dumps(message) + '\n')
+    sys.stdout.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PDF text extraction worker")
+    parser.add_argument('mode', choices=['count', 'pages'])
+    parser.add_argument('path')
+    parser.add_argument('start', nargs='?', type=int, default=0)
+    parser.add_argument('stop', nargs='?', type=int)
+    parser.add_argument('--memory-mb', type=int, default=0)
+    parser.add_argument('--cpu-seconds', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    _limit_resources(args.memory_mb, args.cpu_seconds)
+    try:
+        from PyPDF2 import PdfReader
+
+        with open(args.path, 'rb') as stream:
+            reader = PdfReader(stream)
+            if args.mode == 'count':
+                _emit({'pages': len(reader.pages)})
+                return 0
+            stop = len(reader.pages) if args.stop is None else min(args.stop, len(reader.pages))
+            for index in range(args.start, stop):
+                try:
+                    _emit({'page': index + 1, 'text': reader.pages[index].extract_text() or ''})
+                except MemoryError:
+                    raise
+                except Exception as exc:
+                    _emit({'page': index + 1, 'text': '', 'error': str(exc)})
+    except MemoryError:
+        _emit({'error': f"PDF extraction exceeded {args.memory_mb} MB"})
+        return 1
+    except Exception as exc:
+        _emit({'error': f"Could not read PDF: {exc}"})
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
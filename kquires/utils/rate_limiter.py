@@ -0,0 +1,48 @@
+"""
+Request rate limiter backed by the Django cache.
+
+A fixed window counter shared by every process using the same cache, so web
+workers, Celery workers and management commands together never exceed the
+configured number of calls per period.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+class RateLimiter:
+    """Allow at most ``limit`` calls per ``period`` seconds; a limit of 0 disables it"""
+
+    def __init__(self, name: str, limit: int, period: int = 60):
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    def try_acquire(self) -> float:
+        """Take a slot in the current window; return 0 on success or the seconds to wait"""
+        if not self.limit:
+            return 0
+        now = time.time()
+        window = int(now // self.period)
+        key = f"ratelimit:{self.name}:{window}"
+        cache.add(key, 0, self.period * 2)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, self.period * 2)
+            count = 1
+        if count <= self.limit:
+            return 0
+        return (window + 1) * self.period - now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Block until a slot is free; return False if that takes longer than ``timeout``"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            time.sleep(wait)
@@ -0,0 +1,21 @@
+"""
+Access to the Redis server behind the default cache.
+
+Production caches live in Redis (django-redis); local and test settings use
+the in-memory cache, in which case ``get_redis`` returns None and callers fall
+back to the database.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_redis():
+    """Raw Redis client of the default cache, or None when the cache is not Redis"""
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
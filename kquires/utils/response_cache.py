@@ -0,0 +1,119 @@
+"""
+Response cache for read-heavy pages, purged by surrogate keys.
+
+Entries vary on the active language, the language cookie and the user's
+role flags, which are the only per-user inputs of the cached pages. Requests
+with pending flash messages are never served from or stored in the cache,
+since the messages are rendered into the page. Each entry is tagged with
+surrogate keys such as ``article:12`` or ``category:3``; ``purge_tags`` bumps
+the version of a tag, which invalidates every entry that carries it. The
+CSRF token is stored as a placeholder and filled in for every request, so a
+cached page never hands out another user's token.
+
+Responses also get ``Cache-Control`` and ``Surrogate-Key`` headers so the
+reverse proxy in front of the application can cache and purge them too.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.translation import get_language
+
+CSRF_PLACEHOLDER = 'CSRF-TOKEN-PLACEHOLDER'
+ROLE_FLAGS = ('is_admin', 'is_approval_manager', 'is_article_writer', 'is_manager', 'is_employee')
+
+
+def role_key(user) -> str:
+    """Cache variant of a user: anonymous, or the set of role flags"""
+    if not user.is_authenticated:
+        return 'anonymous'
+    return ''.join('1' if getattr(user, flag, False) else '0' for flag in ROLE_FLAGS)
+
+
+def response_cache_key(request, per_user=True) -> str:
+    variant = f"{request.get_full_path()}|{get_language()}"
+    if per_user:
+        variant = f"{variant}|{request.COOKIES.get('language', 'en')}|{role_key(request.user)}"
+    return f"respcache:page:{hashlib.sha256(variant.encode()).hexdigest()}"
+
+
+def has_messages(request) -> bool:
+    """Whether flash messages are waiting to be rendered for this request's session"""
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def _tag_key(tag: str) -> str:
+    return f"respcache:tag:{tag}"
+
+
+def tag_versions(tags) -> dict:
+    """Current version of every tag; tags that were never purged are at 0"""
+    found = cache.get_many([_tag_key(tag) for tag in tags])
+    return {tag: found.get(_tag_key(tag), 0) for tag in tags}
+
+
+def purge_tags(*tags) -> None:
+    """Invalidate every cached response tagged with one of ``tags``"""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        version = time.time_ns()
+        cache.set_many({_tag_key(tag): version for tag in tags}, timeout=None)
+
+
+def cache_response(timeout=300, tags=None, public=False):
+    """
+    Cache successful GET responses of a view.
+
+    ``tags(request, response, *args, **kwargs)`` returns the surrogate keys of a
+    freshly rendered response. ``public`` responses are identical for every
+    user and may be stored by shared caches; the others vary on language and
+    role and are private to the browser.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or has_messages(request):
+                return view(request, *args, **kwargs)
+
+            key = response_cache_key(request, per_user=not public)
+            entry = cache.get(key)
+            if entry is not None and tag_versions(entry['tags']) == entry['tags']:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            else:
+                started = time.time_ns()
+                response = view(request, *args, **kwargs)
+                context_data = getattr(response, 'context_data', None)
+                if context_data is not None and not response.is_rendered:
+                    context_data['csrf_token'] = CSRF_PLACEHOLDER
+                    response.render()
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    return response
+                if getattr(getattr(request, '_messages', None), 'used', False):
+                    # Messages added while rendering are part of this page only
+                    return response
+                entry = {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'tags': tag_versions([tag for tag in tags(request, response, *args, **kwargs) if tag] if tags else []),
+                }
+                # Content purged while it was being rendered may already be stale
+                if all(version < started for version in entry['tags'].values()):
+                    cache.set(key, entry, timeout)
+
+            if CSRF_PLACEHOLDER.encode() in response.content:
+                response.content = response.content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+            response['Surrogate-Key'] = ' '.join(entry['tags'])
+            if public:
+                patch_cache_control(response, public=True, max_age=timeout)
+            else:
+                patch_cache_control(response, private=True, max_age=0)
+                patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapped
+    return decorator
@@ -7,34 +7,7 @@ import json
 import re
 from typing import Dict, Any, Optional
 
-
-def detect_language(text: str) -> str:
-    """
-    Detect the language of the given text.
-    
-    Args:
-        text (str): The text to analyze
-        
-    Returns:
-        str: The detected language ('english' or 'arabic')
-    """
-    if not text:
-        return 'english'
-    
-    # Simple heuristic: check for Arabic characters
-    arabic_chars = sum(1 for char in text if '\u0600' <= char <= '\u06FF')
-    total_chars = len([char for char in text if char.isalpha()])
-    
-    if total_chars == 0:
-        return 'english'
-    
-    arabic_ratio = arabic_chars / total_chars
-    
-    # If more than 30% of characters are Arabic, consider it Arabic
-    if arabic_ratio > 0.3:
-        return 'arabic'
-    else:
-        return 'english'
+from .language_detection import detect_language, detect_languages  # noqa: F401
 
 
 def translate_text(text: str, source_lang: str, target_lang: str) -> Dict[str, Any]:
@@ -73,6 +46,9 @@ def clean_ai_json(text: str) -> str:
     """
     Clean AI-generated JSON text by extracting the actual content.
     
+    Applied when content is written (``Article.save``), so stored fields are
+    always plain text and read paths never need to parse them.
+    
     Args:
         text (str): The text that might contain JSON formatting
         
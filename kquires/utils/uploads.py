@@ -0,0 +1,139 @@
+"""
+Streaming storage of uploaded files.
+
+``store_upload`` pipes ``UploadedFile.chunks()`` into the storage while
+computing the SHA-256 and size of the bytes as they pass, so an upload is
+never held in memory as a whole. Later steps (text extraction, Google Drive)
+read the stored file through ``open_stored`` instead of a bytes copy.
+"""
+
+import errno
+import hashlib
+import mmap
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class HashingFile(File):
+    """File whose chunks update a SHA-256 digest and a byte count as they are read"""
+
+    def __init__(self, uploaded_file, max_size=None):
+        super().__init__(uploaded_file, name=uploaded_file.name)
+        self.digest = hashlib.sha256()
+        self.bytes_read = 0
+        self.max_size = max_size
+
+    def chunks(self, chunk_size=None):
+        for chunk in self.file.chunks(chunk_size or CHUNK_SIZE):
+            self.bytes_read += len(chunk)
+            if self.max_size is not None and self.bytes_read > self.max_size:
+                raise UploadTooLarge(f"Upload exceeds {self.max_size} bytes")
+            self.digest.update(chunk)
+            yield chunk
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+    name: str
+    content_type: str
+
+    @property
+    def url(self):
+        return default_storage.url(self.path)
+
+
+def store_upload(uploaded_file, directory, storage=default_storage, max_size=None) -> StoredUpload:
+    """
+    Save ``uploaded_file`` under ``directory`` with a unique name, in chunks.
+
+    Raises ``UploadTooLarge`` (and stores nothing) if more than ``max_size``
+    bytes arrive.
+    """
+    name = f"{uuid.uuid4().hex}_{get_valid_filename(os.path.basename(uploaded_file.name))}"
+    content = HashingFile(uploaded_file, max_size=max_size)
+    try:
+        path = storage.save(os.path.join(directory, name), content)
+    except UploadTooLarge:
+        storage.delete(os.path.join(directory, name))
+        raise
+    return StoredUpload(
+        path=path,
+        size=content.bytes_read,
+        sha256=content.digest.hexdigest(),
+        name=uploaded_file.name,
+        content_type=getattr(uploaded_file, 'content_type', '') or '',
+    )
+
+
+@contextmanager
+def open_stored(path, storage=default_storage, memory_map=False):
+    """
+    Open a stored file for reading.
+
+    With ``memory_map`` a local, non-empty file is mapped read-only, so the
+    bytes are paged in by the OS on demand rather than copied into memory.
+    """
+    with storage.open(path, 'rb') as handle:
+        if memory_map:
+            try:
+                fileno = handle.fileno()
+            except (AttributeError, OSError):
+                fileno = None
+            if fileno is not None and os.fstat(fileno).st_size:
+                with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+                return
+        yield handle
+
+
+def file_sha256(handle, chunk_size=CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: handle.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def append_file(source, target) -> int:
+    """
+    Append the whole of ``source`` to ``target`` (binary files) and return the bytes copied.
+
+    The bytes are copied inside the kernel with ``os.copy_file_range``, or
+    ``os.sendfile`` where that is not available, and only fall back to a
+    buffered copy when neither works for these files.
+    """
+    size = os.fstat(source.fileno()).st_size
+    target.flush()
+    copied = 0
+    try:
+        while copied < size:
+            if hasattr(os, 'copy_file_range'):
+                sent = os.copy_file_range(source.fileno(), target.fileno(), size - copied, offset_src=copied)
+            else:
+                sent = os.sendfile(target.fileno(), source.fileno(), copied, size - copied)
+            if not sent:
+                break
+            copied += sent
+    except OSError as exc:
+        if exc.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF):
+            raise
+        source.seek(copied)
+        target.seek(0, os.SEEK_END)
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+        copied = size
+    return copied